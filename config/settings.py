@@ -39,6 +39,7 @@ INSTALLED_APPS = [
     "django.contrib.staticfiles",
     "django_infra.feature_flags",
     "django_infra.exporter",
+    "django_infra.backfill",
 ]
 
 MIDDLEWARE = [
@@ -1,11 +1,15 @@
+import datetime
 from typing import List
 
 from django.db import models
-from rest_framework import pagination, parsers, viewsets
+from rest_framework import exceptions, pagination, parsers, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
 
 from django_infra.api.filters import Filter
 from django_infra.api.meta import FilteredPartialResponseModelViewSetMetaClass
 from django_infra.api.partial_response import OptimizedQuerySetAnnotationsMixin
+from django_infra.db.change_feed import InvalidCursor, changes_after
 
 
 class PaginatedViewMixin:
@@ -18,6 +22,44 @@ class PaginatedViewMixin:
     pagination_class.default_limit = 20
 
 
+class ChangeFeedMixin:
+    """Adds a `changes` list action paging through rows by `(modified_time, pk)`.
+
+    For views of `TimeTrackingModel` subclasses. Clients store the returned
+    `cursor` and send it back as `?cursor=` to receive only rows changed since,
+    `has_more` tells whether to poll again right away.
+    """
+
+    change_feed_page_size = 100
+    change_feed_max_page_size = 1000
+    change_feed_settle = datetime.timedelta(0)
+
+    @action(detail=False, methods=["get"])
+    def changes(self, request, *args, **kwargs):
+        try:
+            limit = int(request.query_params.get("limit", self.change_feed_page_size))
+        except ValueError:
+            raise exceptions.ValidationError({"limit": "A valid integer is required."})
+        limit = max(1, min(limit, self.change_feed_max_page_size))
+        try:
+            page = changes_after(
+                self.filter_queryset(self.get_queryset()),
+                cursor=request.query_params.get("cursor") or None,
+                limit=limit,
+                settle=self.change_feed_settle,
+            )
+        except InvalidCursor as e:
+            raise exceptions.ValidationError({"cursor": str(e)})
+        serializer = self.get_serializer(page.objects, many=True)
+        return Response(
+            {
+                "results": serializer.data,
+                "cursor": page.cursor,
+                "has_more": page.has_more,
+            }
+        )
+
+
 class FilteredPartialResponseModelViewSet(
     OptimizedQuerySetAnnotationsMixin,
     viewsets.ModelViewSet,
@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from .models import BulkOpRun
+
+
+@admin.register(BulkOpRun)
+class BulkOpRunAdmin(admin.ModelAdmin):
+    list_display = ("name", "operation", "state", "processed", "rate", "created_time")
+    list_filter = ("state", "operation")
+    search_fields = ("name",)
@@ -0,0 +1,87 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from django_infra.backfill.registry import backfills
+from django_infra.backfill.runs import RunInProgressError
+from django_infra.db.throttle import LoadThrottle
+
+
+class Command(BaseCommand):
+    help = (
+        "Run a registered backfill, pausing between batches on replication lag, "
+        "lock waits and dead tuples. Unfinished runs are resumed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", nargs="?", help="Registered backfill name.")
+        parser.add_argument(
+            "--list", action="store_true", help="List registered backfills."
+        )
+        parser.add_argument(
+            "--restart", action="store_true", help="Start over instead of resuming."
+        )
+        parser.add_argument(
+            "--no-throttle", action="store_true", help="Run at full speed."
+        )
+        parser.add_argument("--max-replication-lag", type=float, help="Seconds.")
+        parser.add_argument("--max-lock-waits", type=int)
+        parser.add_argument("--max-dead-tuples", type=int)
+        parser.add_argument(
+            "--sleep", type=float, dest="sleep_seconds", help="Seconds between batches."
+        )
+        parser.add_argument(
+            "--max-wait", type=float, help="Longest pause before continuing anyway."
+        )
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            default=None,
+            help="ANALYZE the backfilled tables when done.",
+        )
+        parser.add_argument(
+            "--vacuum",
+            action="store_true",
+            default=None,
+            help="VACUUM the backfilled tables when done.",
+        )
+
+    def handle(self, *args, **options):
+        if options["list"]:
+            for backfill in backfills.values():
+                self.stdout.write(f"{backfill.name}\t{backfill.description}")
+            return
+        name = options["name"]
+        if name not in backfills:
+            raise CommandError(
+                f"Unknown backfill {name!r}, choose from: {', '.join(sorted(backfills))}"
+            )
+        throttle = None
+        if not options["no_throttle"]:
+            throttle = LoadThrottle(
+                **{
+                    key: options[key]
+                    for key in (
+                        "max_replication_lag",
+                        "max_lock_waits",
+                        "max_dead_tuples",
+                        "sleep_seconds",
+                        "max_wait",
+                    )
+                    if options[key] is not None
+                }
+            )
+        try:
+            progress = backfills[name].run(
+                resume=not options["restart"],
+                throttle=throttle,
+                analyze=options["analyze"],
+                vacuum=options["vacuum"],
+            )
+        except RunInProgressError as e:
+            raise CommandError(str(e)) from e
+        paused = f", paused {throttle.paused:.1f}s" if throttle else ""
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{name}: {progress.processed} rows, {progress.changed} changed "
+                f"in {progress.elapsed:.1f}s{paused}"
+            )
+        )
@@ -0,0 +1,61 @@
+# Generated by Django 5.1.7 on 2026-10-19 05:56
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="BulkOpRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_time", models.DateTimeField(auto_now_add=True, null=True)),
+                ("modified_time", models.DateTimeField(auto_now=True, null=True)),
+                ("name", models.CharField(db_index=True, max_length=255)),
+                ("operation", models.CharField(blank=True, default="", max_length=64)),
+                (
+                    "state",
+                    models.CharField(
+                        choices=[
+                            ("running", "Running"),
+                            ("success", "Success"),
+                            ("fail", "Fail"),
+                        ],
+                        max_length=16,
+                    ),
+                ),
+                (
+                    "last_key",
+                    models.JSONField(
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                        null=True,
+                    ),
+                ),
+                ("total", models.BigIntegerField(default=0)),
+                ("processed", models.BigIntegerField(default=0)),
+                ("changed", models.BigIntegerField(default=0)),
+                ("batches", models.IntegerField(default=0)),
+                ("elapsed", models.FloatField(default=0.0)),
+                ("rate", models.FloatField(default=0.0)),
+                ("finished_time", models.DateTimeField(null=True)),
+                ("error_log", models.TextField(blank=True, default="")),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-19 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("backfill", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="bulkoprun",
+            name="deleted",
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
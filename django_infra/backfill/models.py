@@ -0,0 +1,79 @@
+import datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import Q, TextChoices
+from django.utils import timezone
+
+from django_infra.db.models import TimeTrackingModel, UpdatableModel
+
+
+class BulkOpRunState(TextChoices):
+    RUNNING = "running", "Running"
+    SUCCESS = "success", "Success"
+    FAIL = "fail", "Fail"
+
+
+# a running run without checkpoint for this long is considered dead.
+STALE_RUN_AFTER = datetime.timedelta(hours=1)
+
+
+class BulkOpRunQuerySet(models.QuerySet):
+    def resumable(self, name: str, stale_after: datetime.timedelta = STALE_RUN_AFTER):
+        """Failed runs of `name`, and runs whose process died, most recent first."""
+        stale = timezone.now() - stale_after
+        return (
+            self.filter(name=name)
+            .filter(
+                Q(state=BulkOpRunState.FAIL)
+                | Q(state=BulkOpRunState.RUNNING, modified_time__lt=stale)
+            )
+            .order_by("-created_time")
+        )
+
+    def running(self, name: str, stale_after: datetime.timedelta = STALE_RUN_AFTER):
+        """Runs of `name` checkpointed within `stale_after`, likely still running."""
+        stale = timezone.now() - stale_after
+        return self.filter(
+            name=name, state=BulkOpRunState.RUNNING, modified_time__gte=stale
+        )
+
+    def throughput(self):
+        """Aggregate rows and rates per operation, for capacity planning."""
+        return (
+            self.filter(state=BulkOpRunState.SUCCESS)
+            .values("operation")
+            .annotate(
+                runs=models.Count("id"),
+                rows=models.Sum("processed"),
+                changed=models.Sum("changed"),
+                seconds=models.Sum("elapsed"),
+                avg_rate=models.Avg("rate"),
+                min_rate=models.Min("rate"),
+                max_rate=models.Max("rate"),
+            )
+            .order_by("operation")
+        )
+
+
+class BulkOpRun(TimeTrackingModel, UpdatableModel):
+    """Persisted checkpoint and throughput record of a batched bulk operation."""
+
+    name = models.CharField(max_length=255, db_index=True)
+    operation = models.CharField(max_length=64, blank=True, default="")
+    state = models.CharField(max_length=16, choices=BulkOpRunState.choices)
+    last_key = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    total = models.BigIntegerField(default=0)
+    processed = models.BigIntegerField(default=0)
+    changed = models.BigIntegerField(default=0)
+    deleted = models.BigIntegerField(default=0)
+    batches = models.IntegerField(default=0)
+    elapsed = models.FloatField(default=0.0)
+    rate = models.FloatField(default=0.0)
+    finished_time = models.DateTimeField(null=True)
+    error_log = models.TextField(blank=True, default="")
+
+    objects = BulkOpRunQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.name} ({self.state})"
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import dataclasses
+import logging
+import typing
+
+from django.db import connections
+from django.db import models as dm
+from django.db import router, transaction
+
+from django_infra.backfill.runs import RunProgress, tracked_run
+from django_infra.db.throttle import LoadThrottle
+
+
+@dataclasses.dataclass(frozen=True)
+class Backfill:
+    """A named, resumable bulk operation run by the `run_backfill` command.
+
+    `func(progress=..., throttle=...)` must pass both to its bulk operation, so
+    the run is checkpointed and waits on the throttle between batches.
+    """
+
+    name: str
+    func: typing.Callable[..., typing.Any]
+    models: tuple[type[dm.Model], ...] = ()
+    operation: str = ""
+    analyze: bool = False
+    vacuum: bool = False
+    description: str = ""
+
+    def run(
+        self,
+        *,
+        resume: bool = True,
+        throttle: LoadThrottle = None,
+        analyze: bool = None,
+        vacuum: bool = None,
+    ) -> RunProgress:
+        with tracked_run(self.name, self.operation, resume=resume) as progress:
+            self.func(progress=progress, throttle=throttle)
+        analyze = self.analyze if analyze is None else analyze
+        vacuum = self.vacuum if vacuum is None else vacuum
+        if analyze or vacuum:
+            for model in self.models:
+                maintain_table(
+                    model, analyze=analyze, vacuum=vacuum, using=progress.using
+                )
+        return progress
+
+
+backfills: dict[str, Backfill] = {}
+
+
+def register_backfill(
+    name: str,
+    *,
+    models: typing.Sequence[type[dm.Model]] = (),
+    operation: str = "",
+    analyze: bool = False,
+    vacuum: bool = False,
+):
+    """Register a backfill function under `name`.
+
+    Backfills are collected from the `backfills` module of every installed app.
+
+    Example:
+        >>> # myapp/backfills.py
+        >>> @register_backfill("order_totals", models=[Order], analyze=True)
+        >>> def order_totals(progress, throttle):
+        >>>     bulk_update_queryset(
+        >>>         qs=Order.objects.with_computed_total(),
+        >>>         annotation_field_pairs=[("computed_total_annotation", "computed_total")],
+        >>>         progress=progress,
+        >>>         throttle=throttle,
+        >>>     )
+    """
+
+    def decorator(func):
+        if name in backfills:
+            raise ValueError(f"Backfill {name} is already registered.")
+        backfills[name] = Backfill(
+            name=name,
+            func=func,
+            models=tuple(models),
+            operation=operation or func.__name__,
+            analyze=analyze,
+            vacuum=vacuum,
+            description=(func.__doc__ or "").strip(),
+        )
+        return func
+
+    return decorator
+
+
+def maintain_table(
+    model: type[dm.Model], *, analyze=True, vacuum=False, using: str = None
+):
+    """`ANALYZE` and/or `VACUUM` the table of `model`, the latter outside of any transaction.
+
+    `using` defaults to the router's write alias of `model`.
+    """
+    using = using or router.db_for_write(model)
+    if vacuum and transaction.get_connection(using).in_atomic_block:
+        raise RuntimeError("VACUUM must run outside of a transaction.")
+    conn = connections[using]
+    table = conn.ops.quote_name(model._meta.db_table)
+    if vacuum:
+        sql = f"VACUUM (ANALYZE) {table}" if analyze else f"VACUUM {table}"
+    else:
+        sql = f"ANALYZE {table}"
+    logging.info(sql)
+    with conn.cursor() as cursor:
+        cursor.execute(sql)
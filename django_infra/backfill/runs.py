@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import contextlib
+import dataclasses
+import datetime
+import functools
+import time
+import typing
+
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from django_infra.backfill.models import STALE_RUN_AFTER, BulkOpRun, BulkOpRunState
+from django_infra.db.bulk_ops import BulkOpProgress
+
+
+@dataclasses.dataclass
+class RunProgress(BulkOpProgress):
+    """Bulk operation progress persisted to a `BulkOpRun` after every batch.
+
+    When the batches are written to the database holding the run, checkpoints
+    are written inside the batch transaction, so the stored `last_key` always
+    matches the data that was actually committed. Batches on another alias are
+    checkpointed once they commit, so a crash in between may repeat a batch.
+    """
+
+    run: BulkOpRun = None
+    # rows deleted by `sync_queryset_into(delete_missing=True)`.
+    deleted: int = 0
+
+    @classmethod
+    def from_run(cls, run: BulkOpRun) -> RunProgress:
+        return cls(
+            run=run,
+            processed=run.processed,
+            changed=run.changed,
+            deleted=run.deleted,
+            batches=run.batches,
+            start_time=time.time() - run.elapsed,
+            last_key=tuple(run.last_key) if run.last_key is not None else None,
+        )
+
+    def checkpoint(self):
+        values = dict(
+            last_key=self.last_key,
+            total=self.total,
+            processed=self.processed,
+            changed=self.changed,
+            deleted=self.deleted,
+            batches=self.batches,
+            elapsed=self.elapsed,
+            rate=self.rate,
+            modified_time=timezone.now(),
+        )
+        run_alias = router.db_for_write(BulkOpRun, instance=self.run)
+        if self.using is None or self.using == run_alias:
+            self.run.update(**values)
+        else:
+            # never ahead of the data: written after the batch's transaction commits.
+            transaction.on_commit(
+                functools.partial(self.run.update, **values), using=self.using
+            )
+
+    def heartbeat(self):
+        # only the checkpoint time, so a long server side run is not taken as stale.
+        BulkOpRun.objects.filter(pk=self.run.pk).update(modified_time=timezone.now())
+
+
+class RunInProgressError(RuntimeError):
+    """Another process is running the same named run."""
+
+
+def claim_run(
+    name: str, stale_after: datetime.timedelta = STALE_RUN_AFTER
+) -> BulkOpRun | None:
+    """Atomically mark the most recent resumable run of `name` as running.
+
+    The claim is a compare-and-set on the state and last checkpoint time, so two
+    processes resuming at once never both get the same run.
+    """
+    for run in BulkOpRun.objects.resumable(name, stale_after):
+        claimed = BulkOpRun.objects.filter(
+            pk=run.pk, state=run.state, modified_time=run.modified_time
+        ).update(
+            state=BulkOpRunState.RUNNING, error_log="", modified_time=timezone.now()
+        )
+        if claimed:
+            run.refresh_from_db()
+            return run
+    return None
+
+
+@contextlib.contextmanager
+def tracked_run(
+    name: str,
+    operation: str = "",
+    resume: bool = True,
+    stale_after: datetime.timedelta = STALE_RUN_AFTER,
+) -> typing.Iterator[RunProgress]:
+    """Track a bulk operation as a `BulkOpRun`, resuming unfinished runs of `name`.
+
+    A failed run, or a running one without checkpoint for `stale_after` (its
+    process died), is resumed. While another process is still running `name`,
+    `RunInProgressError` is raised instead of processing the same batches twice,
+    also without `resume`. The check and the claim hold a transaction level
+    advisory lock on `name`, so two processes starting at once cannot both pass.
+
+    Example:
+        >>> with tracked_run("order_totals", "bulk_update_queryset") as progress:
+        >>>     bulk_update_queryset(
+        >>>         qs=qs, annotation_field_pairs=pairs, progress=progress
+        >>>     )
+    """
+    run_alias = router.db_for_write(BulkOpRun)
+    with transaction.atomic(using=run_alias):
+        with connections[run_alias].cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", [name])
+        if BulkOpRun.objects.running(name, stale_after).exists():
+            raise RunInProgressError(f"{name} is already running.")
+        run = claim_run(name, stale_after) if resume else None
+        if run is None:
+            run = BulkOpRun.objects.create(
+                name=name, operation=operation, state=BulkOpRunState.RUNNING
+            )
+    progress = RunProgress.from_run(run)
+    try:
+        yield progress
+    except Exception as e:
+        # only the state is written, counters stay at the last committed checkpoint.
+        run.update(state=BulkOpRunState.FAIL, error_log=str(e))
+        raise
+    run.update(
+        state=BulkOpRunState.SUCCESS,
+        finished_time=timezone.now(),
+        elapsed=progress.elapsed,
+        rate=progress.rate,
+    )
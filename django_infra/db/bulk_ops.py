@@ -1,21 +1,183 @@
+from __future__ import annotations
+
+import dataclasses
+import functools
+import json
 import logging
+import re
+import threading
 import time
+import typing
+
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+from django.db import models as dm
+from django.db import router, transaction
+from django.db.models.deletion import Collector
+from django.db.models.expressions import RawSQL
+
+from django_infra.db.keyset import Keyset, KeysetAfter, KeysetUpTo
+from django_infra.db.throttle import LoadThrottle
+
+
+@dataclasses.dataclass
+class BulkOpProgress:
+    """Running counters for a batched bulk operation.
+
+    Attributes:
+        total (int): Rows matched by the queryset when the operation started.
+        processed (int): Rows handled so far (deleted, scanned for update, ...).
+        changed (int): Rows actually written, may be lower than `processed` when
+                       no-op writes are skipped.
+        batches (int): Number of committed batches.
+        start_time (float): Epoch seconds at which the operation started.
+        last_key (tuple, optional): Key of the last committed row, operations
+                                    given a progress with a key resume after it.
+        using (str, optional): Database alias the batches are written to, set by
+                               the bulk operation.
+    """
+
+    total: int = 0
+    processed: int = 0
+    changed: int = 0
+    batches: int = 0
+    start_time: float = dataclasses.field(default_factory=time.time)
+    last_key: tuple | None = None
+    using: str | None = None
+
+    @property
+    def elapsed(self) -> float:
+        return time.time() - self.start_time
 
-from django.db import connection, transaction
+    @property
+    def rate(self) -> float:
+        elapsed = self.elapsed
+        return self.processed / elapsed if elapsed > 0 else 0
+
+    def advance(self, processed: int, changed: int = None, last_key: tuple = None):
+        self.processed += processed
+        self.changed += processed if changed is None else changed
+        self.batches += 1
+        self.last_key = last_key
+
+    def checkpoint(self):
+        """Called inside each batch transaction once the batch has been applied.
+
+        No-op by default, override to persist progress atomically with the batch
+        (which requires writing it on the `using` alias).
+        """
+
+    def heartbeat(self):
+        """Called from another thread while a single long statement is running.
+
+        No-op by default, override to show the operation is still alive.
+        """
+
+    def log(self, verb: str):
+        percent = self.processed / self.total * 100 if self.total else 100
+        logging.info(
+            f"{verb} {self.processed} of {self.total} ({percent:.2f}%) - changed {self.changed} - elapsed {self.elapsed:.2f}s - {self.rate:.2f} rows/s"
+        )
+
+
+@dataclasses.dataclass(frozen=True)
+class ChangedRow:
+    """A row written by `bulk_update_queryset`.
+
+    Attributes:
+        key (tuple): Keyset key of the row, the primary key by default.
+        old (dict, optional): Updated field values before the write, by field name.
+        new (dict, optional): Updated field values after the write, by field name.
+    """
+
+    key: tuple
+    old: dict | None = None
+    new: dict | None = None
+
+
+def set_lock_timeout(cursor, lock_timeout):
+    """Set a transaction local `lock_timeout` (e.g. '5s' or 5000 ms)."""
+    if lock_timeout is None:
+        return
+    cursor.execute("SELECT set_config('lock_timeout', %s, true)", [str(lock_timeout)])
+
+
+def _write_alias(qs, using: str = None, model: type[dm.Model] = None) -> str:
+    """`using`, else the alias set on `qs` with `.using()`, else the router's write alias."""
+    return using or qs._db or router.db_for_write(model or qs.model)
+
+
+def _start_progress(progress: BulkOpProgress | None, qs, keyset: Keyset):
+    progress = progress or BulkOpProgress()
+    progress.using = qs.db
+    progress.total = progress.processed + keyset.after(qs, progress.last_key).count()
+    return progress
+
+
+def _batch_summary_sql(keyset: Keyset, written: str) -> str:
+    """Summarise a `batch` CTE and the CTE `written` from it in a single row.
+
+    Columns: rows in batch, rows written, then the last key of the batch.
+    """
+    columns = ", ".join(f"last_key.{column}" for column in keyset.columns)
+    return f"""
+    SELECT scanned.n, changed.n, {columns}
+    FROM (SELECT count(*) AS n FROM batch) AS scanned
+    CROSS JOIN (SELECT count(*) AS n FROM {written}) AS changed
+    LEFT JOIN ({keyset.last_key_sql("batch")}) AS last_key ON true
+    """
 
 
-def bulk_update_queryset(*, qs, annotation_field_pairs, batch_size=100_000):
+def bulk_update_queryset(
+    *,
+    qs,
+    annotation_field_pairs,
+    batch_size=100_000,
+    skip_unchanged=False,
+    key_fields=None,
+    progress: BulkOpProgress = None,
+    server_side=False,
+    using=None,
+    throttle: LoadThrottle = None,
+    on_changed: typing.Callable[[list[ChangedRow]], typing.Any] = None,
+    changed_values=False,
+) -> BulkOpProgress:
     """
     Updates queryset fields based on annotations in bulk using a PostgreSQL set update.
-    This function avoids offset-based slicing by batching based on primary keys.
-    It ensures deterministic and performant execution by progressively iterating
-    over primary key ranges.
+    This function avoids offset-based slicing by batching based on a keyset
+    (primary key by default). It ensures deterministic and performant execution
+    by progressively iterating over key ranges.
 
     Args:
         qs (QuerySet): Base queryset to update.
         annotation_field_pairs (list[tuple[str, str]]): List of tuples pairing annotation names
                                                         with the fields to update.
         batch_size (int, optional): Number of rows per batch. Defaults to 100,000.
+        skip_unchanged (bool, optional): Only write rows where at least one field
+                                         `IS DISTINCT FROM` its annotation, so re-runs
+                                         of an applied backfill write nothing.
+        key_fields (list[str], optional): Unique, non-null fields to batch on, defaults
+                                          to the (possibly composite) primary key.
+        progress (BulkOpProgress, optional): Progress to update, a progress with a
+                                             `last_key` resumes after that key.
+        server_side (bool, optional): Run the batching loop inside Postgres as a `DO`
+                                      block committing after each batch, avoiding a
+                                      round trip per batch. Must be called outside
+                                      of a transaction.
+        using (str, optional): Database alias, defaults to the alias of the queryset
+                               (`.using()`), then to the router's write alias.
+        throttle (LoadThrottle, optional): Waited on between batches, pausing while
+                                           replicas lag or the database is loaded.
+                                           Not available with `server_side`.
+        on_changed (callable, optional): Called with the `ChangedRow`s of each batch,
+                                         taken from the `RETURNING` clause of its
+                                         UPDATE, once the batch transaction commits.
+                                         Not available with `server_side`.
+        changed_values (bool, optional): Also pass the old and new values of the
+                                         updated fields to `on_changed`.
+
+    Returns:
+        BulkOpProgress: `processed` counts scanned rows, `changed` counts written rows.
 
     Usage example:
         >>> bulk_update_queryset(
@@ -23,55 +185,675 @@ def bulk_update_queryset(*, qs, annotation_field_pairs, batch_size=100_000):
                 annotation_field_pairs=[('_annotation', 'field')]
             )
     """
-    qs = qs.order_by(qs.model._meta.pk.name)
     model = qs.model
-    pk_name = model._meta.pk.name
-    total = qs.count()
-    start_time = time.time()
-    updated = 0
+    if server_side and (throttle or on_changed):
+        raise ValueError("Server side batches cannot be throttled or captured.")
+    if changed_values and not on_changed:
+        raise ValueError("changed_values requires on_changed.")
+    using = _write_alias(qs, using)
+    qs = qs.using(using)
+    keyset = Keyset.for_model(model, key_fields)
+    progress = _start_progress(progress, qs, keyset)
+    statement = functools.partial(
+        _bulk_update_sql,
+        qs=qs,
+        keyset=keyset,
+        annotation_field_pairs=annotation_field_pairs,
+        batch_size=batch_size,
+        skip_unchanged=skip_unchanged,
+        using=using,
+        capture=bool(on_changed),
+        capture_values=changed_values,
+    )
+    if server_side:
+        return _run_server_side(
+            statement=statement,
+            keyset=keyset,
+            progress=progress,
+            verb="Updated",
+            using=using,
+        )
+
+    while True:
+        with transaction.atomic(using=using):
+            sql, params = statement(last_key=progress.last_key)
+            with connections[using].cursor() as cursor:
+                cursor.execute(sql, params)
+                if on_changed:
+                    # → summary row repeated for each changed row
+                    rows = cursor.fetchall()
+                else:
+                    # → 1‑row result, no large transfer
+                    rows = [cursor.fetchone()]
+            batch_scanned, batch_updated, *last_key = rows[0][: 2 + len(keyset.fields)]
+            if batch_scanned:
+                progress.advance(batch_scanned, batch_updated, tuple(last_key))
+                progress.checkpoint()
+            if on_changed and batch_updated:
+                changed = _changed_rows(
+                    rows, model, keyset, annotation_field_pairs, changed_values, using
+                )
+                transaction.on_commit(
+                    functools.partial(on_changed, changed), using=using
+                )
+
+        if batch_scanned == 0:
+            break
+        progress.log("Updated")
+        if throttle:
+            throttle.wait(using=using, model=model)
+    return progress
+
+
+async def abulk_update_queryset(
+    *,
+    qs,
+    annotation_field_pairs,
+    batch_size=100_000,
+    skip_unchanged=False,
+    key_fields=None,
+    progress: BulkOpProgress = None,
+    using=None,
+) -> BulkOpProgress:
+    """
+    Async `bulk_update_queryset`, running batches on a dedicated psycopg
+    `AsyncConnection` to the `using` alias so the event loop is never blocked.
+
+    Statements are identical to the sync version. Several aliases (or disjoint
+    querysets) can be driven concurrently from one event loop. `progress.checkpoint`
+    runs in a thread after each batch commits, as it may use the ORM.
+
+    Usage example:
+        >>> await asyncio.gather(
+                *[
+                    abulk_update_queryset(
+                        qs=MyModel.objects.annotate(_annotation=...),
+                        annotation_field_pairs=[('_annotation', 'field')],
+                        using=alias,
+                    )
+                    for alias in ("shard_1", "shard_2")
+                ]
+            )
+    """
+    import psycopg
+    from asgiref.sync import sync_to_async
+
+    model = qs.model
+    using = _write_alias(qs, using)
+    qs = qs.using(using)
+    keyset = Keyset.for_model(model, key_fields)
+    progress = progress or BulkOpProgress()
+    progress.using = using
+    statement = functools.partial(
+        _bulk_update_sql,
+        qs=qs,
+        keyset=keyset,
+        annotation_field_pairs=annotation_field_pairs,
+        batch_size=batch_size,
+        skip_unchanged=skip_unchanged,
+        using=using,
+    )
+    conn = connections[using]
+    conn_params = conn.get_connection_params()
+    server_side_binding = conn.settings_dict["OPTIONS"].get("server_side_binding")
+    conn_params["cursor_factory"] = (
+        psycopg.AsyncCursor if server_side_binding else psycopg.AsyncClientCursor
+    )
+    async with await psycopg.AsyncConnection.connect(
+        autocommit=True, **conn_params
+    ) as aconn:
+        await aconn.execute(conn.ops.set_time_zone_sql(), [conn.timezone_name])
+        count_sql, count_params = (
+            keyset.after(qs, progress.last_key)
+            .values(*keyset.names)
+            .query.get_compiler(using=using)
+            .as_sql()
+        )
+        cursor = await aconn.execute(
+            f"SELECT count(*) FROM ({count_sql}) AS counted", count_params
+        )
+        (remaining,) = await cursor.fetchone()
+        progress.total = progress.processed + remaining
+
+        while True:
+            sql, params = statement(last_key=progress.last_key)
+            async with aconn.transaction():
+                cursor = await aconn.execute(sql, params)
+                batch_scanned, batch_updated, *last_key = await cursor.fetchone()
+            if batch_scanned == 0:
+                break
+            progress.advance(batch_scanned, batch_updated, tuple(last_key))
+            await sync_to_async(progress.checkpoint)()
+            progress.log("Updated")
+    return progress
+
 
+def _bulk_update_sql(
+    *,
+    qs,
+    keyset: Keyset,
+    annotation_field_pairs,
+    batch_size,
+    skip_unchanged,
+    last_key,
+    using,
+    capture=False,
+    capture_values=False,
+):
+    """`UPDATE ... FROM batch` statement for the batch after `last_key`.
+
+    Returns the `_batch_summary_sql` row, with `capture` the summary is repeated
+    for each updated row followed by its key, then old and new values of the
+    updated fields with `capture_values`.
+    """
+    model = qs.model
     annotation_keys = [ann for ann, field in annotation_field_pairs]
+    column_pairs = [
+        (ann, model._meta.get_field(field).column)
+        for ann, field in annotation_field_pairs
+    ]
+    set_clause = ", ".join(f"{column} = batch.{ann}" for ann, column in column_pairs)
+    changed_clause = ""
+    if skip_unchanged:
+        changed_clause = "AND ({})".format(
+            " OR ".join(
+                f"t.{column} IS DISTINCT FROM batch.{ann}"
+                for ann, column in column_pairs
+            )
+        )
 
-    last_pk = None
-    while True:
-        with transaction.atomic():
-            batch_filter = {f"{pk_name}__gt": last_pk} if last_pk else {}
-            batch_qs = qs.filter(**batch_filter).values(pk_name, *annotation_keys)[
-                :batch_size
-            ]
-            compiler = batch_qs.query.get_compiler(using="default")
-            sub_sql, sub_params = compiler.as_sql()
-
-            set_clause = ", ".join(
-                f"{field} = batch.{ann}" for ann, field in annotation_field_pairs
+    returning = ["1"]
+    old_values = []
+    if capture:
+        returning = [
+            f"t.{column} AS _key_{i}" for i, column in enumerate(keyset.columns)
+        ]
+    if capture_values:
+        # the batch reads the old values in the same snapshot the update runs in.
+        old_values = [
+            field
+            for ann, field in annotation_field_pairs
+            if model._meta.get_field(field).column not in keyset.columns
+        ]
+        returning += [
+            f"batch.{column} AS _old_{i}"
+            for i, (ann, column) in enumerate(column_pairs)
+        ]
+        returning += [
+            f"t.{column} AS _new_{i}" for i, (ann, column) in enumerate(column_pairs)
+        ]
+
+    batch_qs = keyset.batch(qs, last_key, batch_size, *annotation_keys, *old_values)
+    compiler = batch_qs.query.get_compiler(using=using)
+    sub_sql, sub_params = compiler.as_sql()
+    summary_sql = _batch_summary_sql(keyset, "upd")
+    if capture:
+        summary_sql = f"""
+    SELECT summary.*, upd.*
+    FROM ({summary_sql}) AS summary
+    LEFT JOIN upd ON true
+    """
+
+    sql = f"""
+    WITH batch AS ({sub_sql}),
+    upd AS (
+        UPDATE {model._meta.db_table} AS t
+        SET {set_clause}
+        FROM batch
+        WHERE {keyset.join_sql("t", "batch")}
+        {changed_clause}
+        RETURNING {", ".join(returning)}
+    )
+    {summary_sql}
+    """
+    return sql, sub_params
+
+
+def _changed_rows(rows, model, keyset, annotation_field_pairs, with_values, using):
+    """`ChangedRow`s from the result rows of a capturing `_bulk_update_sql`."""
+    fields = [model._meta.get_field(field) for ann, field in annotation_field_pairs]
+    conn = connections[using]
+
+    def from_db(field, value):
+        if hasattr(field, "from_db_value"):
+            return field.from_db_value(value, None, conn)
+        return value
+
+    offset = 2 + len(keyset.fields)
+    changed = []
+    for row in rows:
+        key, values = (
+            row[offset : offset + len(keyset.fields)],
+            row[offset + len(keyset.fields) :],
+        )
+        if key[0] is None:
+            continue
+        if not with_values:
+            changed.append(ChangedRow(key=tuple(key)))
+            continue
+        old, new = values[: len(fields)], values[len(fields) :]
+        changed.append(
+            ChangedRow(
+                key=tuple(key),
+                old={f.name: from_db(f, v) for f, v in zip(fields, old)},
+                new={f.name: from_db(f, v) for f, v in zip(fields, new)},
             )
+        )
+    return changed
+
+
+SERVER_SIDE_NOTICE = re.compile(r"scanned=(\d+) changed=(\d+) last_key=(.*)$")
+# seconds between `progress.heartbeat()` calls while a `DO` block runs.
+SERVER_SIDE_HEARTBEAT = 60
+
+
+def _beat(progress: BulkOpProgress, stop: threading.Event):
+    try:
+        while not stop.wait(SERVER_SIDE_HEARTBEAT):
+            try:
+                progress.heartbeat()
+            except Exception:
+                logging.exception("Bulk operation heartbeat failed")
+    finally:
+        connections.close_all()
+
+
+def _run_server_side(*, statement, keyset, progress, verb, using):
+    """Run every batch of `statement` inside a single `DO` block.
+
+    The loop, and a COMMIT per batch, execute in Postgres, saving a client round
+    trip and transaction setup per batch. Each committed batch is reported back
+    with `RAISE NOTICE` and applied to `progress`; `progress.checkpoint()` runs
+    once the block ends (or fails), as the connection is busy until then.
+    Meanwhile a thread calls `progress.heartbeat()` every `SERVER_SIDE_HEARTBEAT`
+    seconds on its own connection.
+    """
+    conn = connections[using]
+    if conn.in_atomic_block:
+        raise RuntimeError(
+            "Server side batching commits every batch, it cannot run in a transaction."
+        )
+    conn.ensure_connection()
+    variables = [f"_key_{i}" for i in range(len(keyset.fields))]
+    first_sql = conn.ops.compose_sql(*statement(last_key=progress.last_key))
+    next_sql = conn.ops.compose_sql(
+        *statement(last_key=[RawSQL(f"${i + 1}", []) for i in range(len(variables))])
+    )
+    declarations = "\n".join(
+        f"{variable} {field.rel_db_type(conn)};"
+        for variable, field in zip(variables, keyset.fields)
+    )
+    into = ", ".join(["_scanned", "_changed", *variables])
+    block = f"""
+    DO $bulk_op$
+    DECLARE
+        _scanned bigint;
+        _changed bigint;
+        {declarations}
+    BEGIN
+        EXECUTE {conn.ops.compose_sql("%s", [first_sql])} INTO {into};
+        WHILE _scanned > 0 LOOP
+            COMMIT;
+            RAISE NOTICE 'scanned=% changed=% last_key=%',
+                _scanned, _changed, json_build_array({", ".join(variables)});
+            EXECUTE {conn.ops.compose_sql("%s", [next_sql])} INTO {into}
+                USING {", ".join(variables)};
+        END LOOP;
+    END
+    $bulk_op$;
+    """
+
+    def on_notice(message):
+        match = SERVER_SIDE_NOTICE.search(message.strip())
+        if not match:
+            return
+        scanned, changed, last_key = match.groups()
+        progress.advance(int(scanned), int(changed), tuple(json.loads(last_key)))
+        progress.log(verb)
+
+    def notice_handler(diagnostic):
+        on_notice(diagnostic.message_primary)
+
+    raw_connection = conn.connection
+    # psycopg 3 streams notices while the block runs, psycopg 2 collects them.
+    streams_notices = hasattr(raw_connection, "add_notice_handler")
+    if streams_notices:
+        raw_connection.add_notice_handler(notice_handler)
+    stop = threading.Event()
+    heartbeat = threading.Thread(target=_beat, args=(progress, stop), daemon=True)
+    heartbeat.start()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(block)
+    finally:
+        stop.set()
+        heartbeat.join()
+        if streams_notices:
+            raw_connection.remove_notice_handler(notice_handler)
+        else:
+            for notice in raw_connection.notices:
+                on_notice(notice)
+            del raw_connection.notices[:]
+        progress.checkpoint()
+    return progress
 
-            sql = f"""
-            WITH batch AS ({sub_sql}),
-            upd AS (
-                UPDATE {model._meta.db_table} AS t
-                SET {set_clause}
-                FROM batch
-                WHERE t.{pk_name} = batch.{pk_name}
-                RETURNING t.{pk_name}
+
+def bulk_delete_queryset(
+    *,
+    qs,
+    batch_size=10_000,
+    lock_timeout=None,
+    sleep_seconds=0.0,
+    raw=None,
+    key_fields=None,
+    progress: BulkOpProgress = None,
+    using=None,
+    throttle: LoadThrottle = None,
+) -> BulkOpProgress:
+    """
+    Deletes queryset rows in key ordered batches, one transaction per batch.
+
+    Unlike `qs.delete()` the full set of objects is never collected in memory, and
+    each batch only holds locks for its own key range.
+
+    Two modes are available:
+      - raw: a single `DELETE ... USING batch RETURNING` statement per batch.
+        Only valid when Django would not need to run anything in Python on
+        delete, i.e. no signal receivers, no cascading relations and no
+        generic relations (see `Collector.can_fast_delete`).
+      - orm: each batch of keys is deleted through the Django collector,
+        so cascades and signals behave exactly as with `qs.delete()`.
+
+    Args:
+        qs (QuerySet): Rows to delete.
+        batch_size (int, optional): Number of rows per batch. Defaults to 10,000.
+        lock_timeout (str | int, optional): Postgres `lock_timeout` applied to each
+                                            batch transaction, e.g. '2s'.
+        sleep_seconds (float, optional): Pause between batches to let replicas
+                                         and autovacuum catch up.
+        raw (bool, optional): Force raw (True) or orm (False) mode. By default raw
+                              mode is used whenever it is safe.
+        key_fields (list[str], optional): Unique, non-null fields to batch on, defaults
+                                          to the (possibly composite) primary key.
+        progress (BulkOpProgress, optional): Progress to update, a progress with a
+                                             `last_key` resumes after that key.
+        using (str, optional): Database alias, defaults to the alias of the queryset
+                               (`.using()`), then to the router's write alias.
+        throttle (LoadThrottle, optional): Waited on between batches, pausing while
+                                           replicas lag or the database is loaded.
+
+    Raises:
+        ValueError: If raw mode is requested for a model that cannot be fast deleted.
+
+    Usage example:
+        >>> bulk_delete_queryset(
+                qs=MyModel.objects.filter(created__lt=cutoff),
+                lock_timeout="2s",
+                sleep_seconds=0.1,
             )
-            SELECT max({pk_name}) AS max_pk, count(*) AS n_updated
-            FROM upd;
-            """
+    """
+    model = qs.model
+    keyset = Keyset.for_model(model, key_fields)
+    using = _write_alias(qs, using)
+    qs = qs.using(using)
+    can_fast_delete = Collector(using=using, origin=qs).can_fast_delete(qs)
+    if raw is None:
+        raw = can_fast_delete
+    elif raw and not can_fast_delete:
+        raise ValueError(
+            f"{model.__name__} has cascades or delete signals, raw deletes would skip them."
+        )
+    progress = _start_progress(progress, qs, keyset)
 
-            with connection.cursor() as cursor:
-                cursor.execute(sql, sub_params)
-                row = cursor.fetchone()  # → 1‑row result, no large transfer
-                last_pk, batch_updated = row if row else (None, 0)
+    while True:
+        batch_qs = keyset.batch(qs, progress.last_key, batch_size)
+        with transaction.atomic(using=using):
+            with connections[using].cursor() as cursor:
+                set_lock_timeout(cursor, lock_timeout)
+            if raw:
+                batch_deleted, last_key = _raw_delete_batch(
+                    batch_qs=batch_qs, keyset=keyset, using=using
+                )
+            else:
+                keys = [keyset.key_of(row) for row in batch_qs]
+                batch_deleted, last_key = len(keys), keys[-1] if keys else None
+                if keys:
+                    model._base_manager.using(using).filter(
+                        keyset.q_for_keys(keys)
+                    ).delete()
+            if batch_deleted:
+                progress.advance(batch_deleted, last_key=last_key)
+                progress.checkpoint()
 
-        if batch_updated == 0:
+        if batch_deleted == 0:
             break
-        updated += batch_updated
-        elapsed = time.time() - start_time
-        rate = updated / elapsed if elapsed > 0 else 0
-        logging.info(
-            f"Updated {updated} of {total} ({updated / total * 100:.2f}%) - elapsed {elapsed:.2f}s - {rate:.2f} rows/s"
+        progress.log("Deleted")
+        if sleep_seconds:
+            time.sleep(sleep_seconds)
+        if throttle:
+            throttle.wait(using=using, model=model)
+    return progress
+
+
+def _raw_delete_batch(*, batch_qs, keyset, using):
+    model = batch_qs.model
+    try:
+        sub_sql, sub_params = batch_qs.query.get_compiler(using=using).as_sql()
+    except EmptyResultSet:
+        return 0, None
+    sql = f"""
+    WITH batch AS ({sub_sql}),
+    del AS (
+        DELETE FROM {model._meta.db_table} AS t
+        USING batch
+        WHERE {keyset.join_sql("t", "batch")}
+        RETURNING 1
+    )
+    {_batch_summary_sql(keyset, "del")};
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql, sub_params)
+        _, batch_deleted, *last_key = cursor.fetchone()
+    return batch_deleted, tuple(last_key)
+
+
+@dataclasses.dataclass
+class SyncProgress(BulkOpProgress):
+    """Progress of `sync_queryset_into`, `changed` counts inserted or updated rows."""
+
+    deleted: int = 0
+
+
+def sync_queryset_into(
+    model,
+    source_qs,
+    key_fields,
+    field_map,
+    delete_missing=False,
+    *,
+    batch_size=10_000,
+    use_merge=None,
+    progress: SyncProgress = None,
+    using=None,
+    throttle: LoadThrottle = None,
+) -> SyncProgress:
+    """
+    Synchronise the rows of `model` with `source_qs`, writing only the differences.
+
+    The source is walked in key ranges of `batch_size` rows, one transaction per
+    range. Each range is applied with a single `MERGE` (Postgres 15+), or an
+    `INSERT ... ON CONFLICT DO UPDATE` on older servers, which inserts missing
+    rows and updates only rows with at least one value `IS DISTINCT FROM` the
+    source. With `delete_missing`, target rows of the same key range that are
+    absent from the source are deleted in the same transaction, so readers never
+    see a truncated table.
+
+    Args:
+        model (type[Model]): Target model, `key_fields` must be unique together on it.
+        source_qs (QuerySet): Source rows.
+        key_fields (list[str]): Target fields identifying a row.
+        field_map (dict[str, str | Expression]): Target field to source field name or
+                                                 expression. Key fields missing from
+                                                 the map are read from the source
+                                                 field of the same name.
+        delete_missing (bool, optional): Delete target rows absent from the source.
+        batch_size (int, optional): Source rows per key range. Defaults to 10,000.
+        use_merge (bool, optional): Force `MERGE` (True) or the upsert fallback
+                                    (False), by default `MERGE` when available.
+        progress (SyncProgress, optional): Progress to update or resume.
+        using (str, optional): Database alias, defaults to the alias of the queryset
+                               (`.using()`), then to the router's write alias.
+        throttle (LoadThrottle, optional): Waited on between key ranges.
+
+    Usage example:
+        >>> sync_queryset_into(
+                CustomerReport,
+                Customer.objects.annotate(order_count=Count("orders")),
+                key_fields=["customer"],
+                field_map={"customer": "pk", "orders": "order_count"},
+                delete_missing=True,
+            )
+    """
+    using = _write_alias(source_qs, using, model)
+    source_qs = source_qs.using(using)
+    conn = connections[using]
+    if use_merge is None:
+        use_merge = conn.pg_version >= 150000
+    targets = list(dict.fromkeys([*key_fields, *field_map]))
+    sources = {
+        target: dm.F(source) if isinstance(source, str) else source
+        for target, source in {**{key: key for key in key_fields}, **field_map}.items()
+    }
+    source = source_qs.annotate(
+        **{f"_sync_{target}": sources[target] for target in targets}
+    )
+    source_keys = [f"_sync_{key}" for key in key_fields]
+    columns = {target: model._meta.get_field(target).column for target in targets}
+    progress = progress or SyncProgress()
+    progress.using = using
+    progress.total = (
+        progress.processed
+        + _key_range(source, source_keys, progress.last_key, None).count()
+    )
+
+    while True:
+        upper = (
+            _key_range(source, source_keys, progress.last_key, None)
+            .order_by(*source_keys)
+            .values_list(*source_keys)[batch_size - 1 : batch_size]
+            .first()
+        )
+        with transaction.atomic(using=using):
+            range_qs = _key_range(source, source_keys, progress.last_key, upper)
+            values_qs = range_qs.values(*[f"_sync_{target}" for target in targets])
+            batch_changed = 0
+            try:
+                sql, params = values_qs.query.get_compiler(using=using).as_sql()
+            except EmptyResultSet:
+                sql, params = None, None
+            if sql:
+                statement = _merge_sql if use_merge else _upsert_sql
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        statement(model, sql, key_fields, targets, columns), params
+                    )
+                    batch_changed = cursor.rowcount
+            batch_deleted = 0
+            if delete_missing:
+                batch_deleted = _delete_missing(
+                    model=model,
+                    range_qs=range_qs,
+                    key_fields=key_fields,
+                    last_key=progress.last_key,
+                    upper=upper,
+                    using=using,
+                )
+            batch_scanned = batch_size if upper else progress.total - progress.processed
+            progress.deleted += batch_deleted
+            progress.advance(
+                max(batch_scanned, 0),
+                batch_changed,
+                progress.last_key if upper is None else upper,
+            )
+            progress.checkpoint()
+        progress.log("Synced")
+        if upper is None:
+            break
+        if throttle:
+            throttle.wait(using=using, model=model)
+    return progress
+
+
+def _key_range(qs, key_names, after, up_to):
+    if after is not None:
+        qs = qs.filter(KeysetAfter(key_names, after))
+    if up_to is not None:
+        qs = qs.filter(KeysetUpTo(key_names, up_to))
+    return qs
+
+
+def _merge_sql(model, source_sql, key_fields, targets, columns):
+    values = [target for target in targets if target not in key_fields]
+    on = " AND ".join(f"t.{columns[key]} = s._sync_{key}" for key in key_fields)
+    matched = ""
+    if values:
+        distinct = " OR ".join(
+            f"t.{columns[v]} IS DISTINCT FROM s._sync_{v}" for v in values
+        )
+        assignments = ", ".join(f"{columns[v]} = s._sync_{v}" for v in values)
+        matched = f"WHEN MATCHED AND ({distinct}) THEN UPDATE SET {assignments}"
+    return f"""
+    MERGE INTO {model._meta.db_table} AS t
+    USING ({source_sql}) AS s
+    ON {on}
+    {matched}
+    WHEN NOT MATCHED THEN
+        INSERT ({", ".join(columns[target] for target in targets)})
+        VALUES ({", ".join(f"s._sync_{target}" for target in targets)})
+    """
+
+
+def _upsert_sql(model, source_sql, key_fields, targets, columns):
+    values = [target for target in targets if target not in key_fields]
+    conflict = "DO NOTHING"
+    if values:
+        distinct = " OR ".join(
+            f"t.{columns[v]} IS DISTINCT FROM EXCLUDED.{columns[v]}" for v in values
+        )
+        assignments = ", ".join(f"{columns[v]} = EXCLUDED.{columns[v]}" for v in values)
+        conflict = f"DO UPDATE SET {assignments} WHERE {distinct}"
+    return f"""
+    INSERT INTO {model._meta.db_table} AS t
+        ({", ".join(columns[target] for target in targets)})
+    SELECT {", ".join(f"s._sync_{target}" for target in targets)}
+    FROM ({source_sql}) AS s
+    ON CONFLICT ({", ".join(columns[key] for key in key_fields)}) {conflict}
+    """
+
+
+def _delete_missing(*, model, range_qs, key_fields, last_key, upper, using):
+    """Delete target rows in the key range (last_key, upper] absent from the source."""
+    missing = _key_range(
+        model._base_manager.using(using), key_fields, last_key, upper
+    ).exclude(
+        dm.Exists(
+            range_qs.filter(**{f"_sync_{key}": dm.OuterRef(key) for key in key_fields})
+        )
+    )
+    keyset = Keyset.for_model(model, key_fields)
+    sub_sql, sub_params = (
+        missing.values(*key_fields).query.get_compiler(using=using).as_sql()
+    )
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"""
+            DELETE FROM {model._meta.db_table} AS t
+            USING ({sub_sql}) AS batch
+            WHERE {keyset.join_sql("t", "batch")}
+            """,
+            sub_params,
         )
+        return cursor.rowcount
 
 
 # def annotate_defaults(qs, model_cls, provided_fields):
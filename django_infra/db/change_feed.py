@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import dataclasses
+import datetime
+import json
+import typing
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models as dm
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from django_infra.db.keyset import Keyset
+
+
+class InvalidCursor(ValueError):
+    """A change feed cursor that cannot be decoded for the model."""
+
+
+def change_feed_index(name: str, pk_name: str = "id") -> dm.Index:
+    """Composite `(modified_time, pk)` index backing the change feed of a model.
+
+    Example:
+        >>> class Meta:
+        >>>     indexes = [change_feed_index("order_changes_idx")]
+    """
+    return dm.Index(fields=["modified_time", pk_name], name=name)
+
+
+def change_feed_keyset(model: type[dm.Model]) -> Keyset:
+    return Keyset.for_model(model, ["modified_time", model._meta.pk.name])
+
+
+def encode_cursor(key: tuple) -> str:
+    """Opaque, url safe cursor for a `(modified_time, pk)` key."""
+    modified_time, pk = key
+    # isoformat keeps microseconds, which DjangoJSONEncoder would truncate.
+    payload = json.dumps(
+        [modified_time.isoformat(), pk], cls=DjangoJSONEncoder, separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(model: type[dm.Model], cursor: str) -> tuple:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        modified_time, pk = json.loads(base64.urlsafe_b64decode(padded))
+        modified_time = parse_datetime(modified_time)
+        pk = model._meta.pk.to_python(pk)
+    except (binascii.Error, ValueError, TypeError, ValidationError) as e:
+        raise InvalidCursor(f"Invalid change feed cursor {cursor!r}") from e
+    if modified_time is None:
+        raise InvalidCursor(f"Invalid change feed cursor {cursor!r}")
+    return modified_time, pk
+
+
+@dataclasses.dataclass
+class ChangePage:
+    """Rows changed after a cursor, `cursor` resumes after the last of them."""
+
+    objects: list[dm.Model]
+    cursor: str | None
+    has_more: bool
+
+
+def changes_after(
+    qs: dm.QuerySet,
+    cursor: str | None = None,
+    limit: int = 1000,
+    settle: datetime.timedelta = datetime.timedelta(0),
+) -> ChangePage:
+    """One page of rows of a `TimeTrackingModel` queryset ordered by `(modified_time, pk)`.
+
+    Rows are walked with a row value comparison on the composite key, so each page
+    is an index range scan (see `change_feed_index`) whatever the table size.
+    A row modified again after being returned shows up again later in the feed.
+    Rows without `modified_time` are never returned.
+
+    Only writes that bump `modified_time` are seen: `save()` and `bulk_apply` do,
+    but `QuerySet.update()`, `bulk_update_queryset`, `sync_queryset_into` and
+    `update(bypass_orm=True)` do not unless `modified_time` is one of the fields
+    they write.
+
+    Args:
+        qs (QuerySet): Rows to follow.
+        cursor (str, optional): Cursor of the previous page, `None` to start over.
+        limit (int): Maximum rows per page.
+        settle (timedelta): Only return rows modified longer ago than this, so rows
+                            of transactions still in flight are not skipped.
+    """
+    keyset = change_feed_keyset(qs.model)
+    key = decode_cursor(qs.model, cursor) if cursor else None
+    qs = qs.filter(modified_time__isnull=False)
+    if settle:
+        qs = qs.filter(modified_time__lt=timezone.now() - settle)
+    objects = list(keyset.after(keyset.order(qs), key)[: limit + 1])
+    has_more = len(objects) > limit
+    objects = objects[:limit]
+    if objects:
+        last = objects[-1]
+        cursor = encode_cursor((last.modified_time, last.pk))
+    return ChangePage(objects=objects, cursor=cursor, has_more=has_more)
+
+
+def iter_changes(
+    qs: dm.QuerySet,
+    cursor: str | None = None,
+    batch_size: int = 1000,
+    settle: datetime.timedelta = datetime.timedelta(0),
+) -> typing.Iterator[ChangePage]:
+    """Yield `changes_after` pages until the feed is caught up.
+
+    Example:
+        >>> for page in iter_changes(Order.objects.all(), cursor=stored_cursor):
+        >>>     sync(page.objects)
+        >>>     stored_cursor = page.cursor
+    """
+    while True:
+        page = changes_after(qs, cursor, batch_size, settle)
+        if page.objects:
+            yield page
+        if not page.has_more:
+            return
+        cursor = page.cursor
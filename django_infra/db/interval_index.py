@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import datetime
+import typing
+
+from django.db import models as dm
+
+from django_infra.db.models.schedule import ScheduleCode
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError(
+        "django_infra.db.interval_index requires numpy, "
+        "install it with `pip install django-infra[interval]`."
+    ) from e
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.UTC)
+MICROSECOND = datetime.timedelta(microseconds=1)
+# unbounded ends, outside of any datetime.
+NEG_INF = np.iinfo(np.int64).min
+POS_INF = np.iinfo(np.int64).max
+
+
+def to_micros(moment: datetime.datetime | None, default: int) -> int:
+    if moment is None:
+        return default
+    return (moment - EPOCH) // MICROSECOND
+
+
+class ScheduleIntervalIndex:
+    """
+    In-process snapshot of a `ScheduleQuerySet`, for hot "what is active at t"
+    lookups that should not reach Postgres.
+
+    Schedules are kept as NumPy arrays of start/end microseconds sorted by start,
+    so a lookup is a binary search for the schedules started before the bound and
+    a vectorised comparison of their ends. `codes_at`/`active_at` follow
+    `ScheduleCodeCase` (a null date is never ACTIVE), `overlapping` follows the
+    `&&` operator of the period (a null date is unbounded, empty periods never
+    overlap).
+
+    `refresh()` re-reads only rows whose `modified_time` (see `TimeTrackingModel`)
+    moved since the last load. Deleted rows are only dropped by `load()`.
+
+    Example:
+        >>> index = ScheduleIntervalIndex(Booking.objects.filter(room=room))
+        >>> index.active_at(timezone.now())
+        >>> index.refresh()
+    """
+
+    def __init__(
+        self,
+        qs: dm.QuerySet,
+        *,
+        schedule_ref: str = "",
+        settle: datetime.timedelta = datetime.timedelta(0),
+    ):
+        prefix = f"{schedule_ref}__" if schedule_ref else ""
+        self.qs = qs
+        self.start_ref = f"{prefix}start_date"
+        self.end_ref = f"{prefix}end_date"
+        self.settle = settle
+        self.tracked = any(
+            field.name == "modified_time" for field in qs.model._meta.concrete_fields
+        )
+        self.watermark: datetime.datetime | None = None
+        # pk -> modified_time of the rows already applied within `settle` of the
+        # watermark, read again by `refresh()` but not applied twice.
+        self.seen: dict[typing.Any, datetime.datetime] = {}
+        self.load()
+
+    def __len__(self):
+        return len(self.pks)
+
+    def _rows(self, qs) -> list[tuple]:
+        fields = ["pk", self.start_ref, self.end_ref]
+        if self.tracked:
+            fields.append("modified_time")
+        return list(qs.values_list(*fields))
+
+    def _settled(self, modified: dict[typing.Any, datetime.datetime]) -> dict:
+        since = self.watermark - self.settle
+        return {pk: moment for pk, moment in modified.items() if moment >= since}
+
+    def load(self):
+        """Replace the snapshot with the current rows of the queryset."""
+        rows = self._rows(self.qs)
+        if self.tracked:
+            modified = {row[0]: row[3] for row in rows if row[3] is not None}
+            self.watermark = max(modified.values(), default=self.watermark)
+            self.seen = self._settled(modified) if self.watermark else {}
+        self._build([row[:3] for row in rows])
+
+    def refresh(self) -> int:
+        """Apply the rows modified since the last load or refresh.
+
+        Rows modified within `settle` of the watermark are read again, so rows of
+        transactions committing late are not missed. Falls back to `load()` for
+        models without `modified_time`.
+
+        Returns:
+            int: Number of modified rows applied.
+        """
+        if not self.tracked or self.watermark is None:
+            self.load()
+            return len(self)
+        modified = self.qs.model._base_manager.filter(
+            modified_time__gte=self.watermark - self.settle
+        ).values_list("pk", "modified_time")
+        changed = {pk: moment for pk, moment in modified if self.seen.get(pk) != moment}
+        if not changed:
+            return 0
+        self.watermark = max(self.watermark, *changed.values())
+        self.seen = self._settled({**self.seen, **changed})
+        # rows modified out of the queryset's filter leave the index.
+        rows = self._rows(self.qs.filter(pk__in=list(changed)))
+        self._merge(changed, [row[:3] for row in rows])
+        return len(changed)
+
+    @staticmethod
+    def _micros(rows: list[tuple]) -> tuple[list, np.ndarray, np.ndarray]:
+        pks = [pk for pk, _, _ in rows]
+        lo = np.array([to_micros(start, NEG_INF) for _, start, _ in rows], np.int64)
+        hi = np.array([to_micros(end, POS_INF) for _, _, end in rows], np.int64)
+        return pks, lo, hi
+
+    def _build(self, rows: list[tuple]):
+        """Sort `(pk, start, end)` rows by start."""
+        pks, lo, hi = self._micros(rows)
+        order = np.argsort(lo, kind="stable")
+        self.pks = np.array(pks)[order] if pks else np.array(pks, dtype=object)
+        self.lo, self.hi = lo[order], hi[order]
+        self._positions = None
+
+    def _merge(self, removed: typing.Iterable, rows: list[tuple]):
+        """Drop the `removed` pks and insert `(pk, start, end)` rows in start order."""
+        stale = [self.positions[pk] for pk in removed if pk in self.positions]
+        pks = np.delete(self.pks, stale)
+        lo, hi = np.delete(self.lo, stale), np.delete(self.hi, stale)
+        if not len(pks):
+            self._build(rows)
+            return
+        new_pks, new_lo, new_hi = self._micros(rows)
+        order = np.argsort(new_lo, kind="stable")
+        new_lo, new_hi = new_lo[order], new_hi[order]
+        at = np.searchsorted(lo, new_lo, side="right")
+        self.pks = np.insert(pks, at, np.array(new_pks, dtype=pks.dtype)[order])
+        self.lo, self.hi = np.insert(lo, at, new_lo), np.insert(hi, at, new_hi)
+        self._positions = None
+
+    @property
+    def positions(self) -> dict[typing.Any, int]:
+        """pk -> position in the arrays, built on first use after a change."""
+        if self._positions is None:
+            self._positions = dict(zip(self.pks.tolist(), range(len(self.pks))))
+        return self._positions
+
+    def active_at(self, moment: datetime.datetime) -> np.ndarray:
+        """Primary keys of the schedules ACTIVE at `moment`."""
+        t = to_micros(moment, 0)
+        started = np.searchsorted(self.lo, t, side="right")
+        lo, hi = self.lo[:started], self.hi[:started]
+        return self.pks[:started][(lo != NEG_INF) & (hi != POS_INF) & (hi > t)]
+
+    def overlapping(
+        self, start: datetime.datetime | None, end: datetime.datetime | None
+    ) -> np.ndarray:
+        """Primary keys of the schedules whose period overlaps `[start, end)`."""
+        start, end = to_micros(start, NEG_INF), to_micros(end, POS_INF)
+        if start >= end:
+            return self.pks[:0]
+        started = np.searchsorted(self.lo, end, side="left")
+        lo, hi = self.lo[:started], self.hi[:started]
+        return self.pks[:started][(hi > start) & (lo < hi)]
+
+    def codes_at(self, moment: datetime.datetime) -> np.ndarray:
+        """ScheduleCode values at `moment`, aligned with `self.pks`."""
+        return self._codes(self.lo, self.hi, to_micros(moment, 0))
+
+    def code_of(self, pk: typing.Any, moment: datetime.datetime) -> ScheduleCode:
+        """ScheduleCode of one schedule at `moment`, KeyError if not indexed."""
+        position = self.positions[pk]
+        at = slice(position, position + 1)
+        (code,) = self._codes(self.lo[at], self.hi[at], to_micros(moment, 0))
+        return ScheduleCode(code)
+
+    @staticmethod
+    def _codes(lo: np.ndarray, hi: np.ndarray, t: int) -> np.ndarray:
+        bounded = (lo != NEG_INF) & (hi != POS_INF)
+        active = bounded & (lo <= t) & (hi > t)
+        future = (lo != NEG_INF) & (lo > t)
+        return np.where(
+            active,
+            ScheduleCode.ACTIVE.value,
+            np.where(future, ScheduleCode.FUTURE.value, ScheduleCode.EXPIRED.value),
+        )
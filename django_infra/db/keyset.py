@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import dataclasses
+import functools
+import operator
+import typing
+
+from django.db import models as dm
+from django.db.models.expressions import Expression
+
+
+class KeysetAfter(Expression):
+    """Boolean expression `(key_1, key_2, ...) > (%s, %s, ...)`.
+
+    Row value comparisons let Postgres walk a (composite) btree index directly,
+    for any orderable key type (integers, UUIDs, strings, dates, ...). Values
+    may also be expressions, e.g. placeholders of a server side statement.
+
+    >>> qs.filter(KeysetAfter(["tenant_id", "id"], (3, 1042)))
+    """
+
+    conditional = True
+    output_field = dm.BooleanField()
+    comparison = ">"
+
+    def __init__(self, fields: typing.Sequence[str], values: typing.Sequence):
+        if len(fields) != len(values):
+            raise ValueError(f"Key {values} does not match key fields {fields}")
+        super().__init__()
+        self.fields = [
+            field if hasattr(field, "resolve_expression") else dm.F(field)
+            for field in fields
+        ]
+        self.values = list(values)
+
+    def get_source_expressions(self):
+        return self.fields
+
+    def set_source_expressions(self, exprs):
+        self.fields = list(exprs)
+
+    def resolve_expression(
+        self, query=None, allow_joins=True, reuse=None, summarize=False, for_save=False
+    ):
+        c = self.copy()
+        c.is_summary = summarize
+        c.fields = [
+            field.resolve_expression(query, allow_joins, reuse, summarize, for_save)
+            for field in self.fields
+        ]
+        return c
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params, rhs, rhs_params = [], [], [], []
+        for field, value in zip(self.fields, self.values):
+            field_sql, field_params = compiler.compile(field)
+            if not hasattr(value, "resolve_expression"):
+                value = dm.Value(value, output_field=field.output_field)
+            value_sql, value_params = compiler.compile(value)
+            lhs.append(field_sql)
+            lhs_params.extend(field_params)
+            rhs.append(value_sql)
+            rhs_params.extend(value_params)
+        params = (*lhs_params, *rhs_params)
+        if len(lhs) == 1:
+            return f"{lhs[0]} {self.comparison} {rhs[0]}", params
+        return f"({', '.join(lhs)}) {self.comparison} ({', '.join(rhs)})", params
+
+
+class KeysetUpTo(KeysetAfter):
+    """Boolean expression `(key_1, key_2, ...) <= (%s, %s, ...)`."""
+
+    comparison = "<="
+
+
+@dataclasses.dataclass(frozen=True)
+class Keyset:
+    """Unique, ordered key used to walk a queryset in batches without OFFSET.
+
+    Supports any orderable, non-null key type and composite keys: by default the
+    primary key fields (including Django 5.2 `CompositePrimaryKey` components),
+    or any unique combination of fields given explicitly. Keys are always
+    represented as tuples, `None` meaning "before the first row".
+
+    Example:
+        >>> keyset = Keyset.for_model(MyModel)
+        >>> for rows in keyset.iter_batches(MyModel.objects.all(), 1000, "field"):
+        >>>     ...
+    """
+
+    fields: tuple[dm.Field, ...]
+
+    @classmethod
+    def for_model(
+        cls, model: type[dm.Model], field_names: typing.Sequence[str] = None
+    ) -> Keyset:
+        meta = model._meta
+        if field_names:
+            fields = tuple(meta.get_field(name) for name in field_names)
+        else:
+            fields = tuple(getattr(meta, "pk_fields", None) or [meta.pk])
+        return cls(fields=fields)
+
+    @property
+    def names(self) -> tuple[str, ...]:
+        return tuple(field.name for field in self.fields)
+
+    @property
+    def columns(self) -> tuple[str, ...]:
+        return tuple(field.column for field in self.fields)
+
+    def order(self, qs: dm.QuerySet) -> dm.QuerySet:
+        return qs.order_by(*self.names)
+
+    def after(self, qs: dm.QuerySet, key: tuple | None) -> dm.QuerySet:
+        """Filter qs to rows strictly after `key`, `None` leaves qs untouched."""
+        if key is None:
+            return qs
+        return qs.filter(KeysetAfter(self.names, key))
+
+    def batch(
+        self, qs: dm.QuerySet, key: tuple | None, batch_size: int, *values: str
+    ) -> dm.QuerySet:
+        """Values queryset of the next `batch_size` rows after `key`.
+
+        Key columns come first (named after `columns`), followed by `values`.
+        """
+        return self.after(self.order(qs), key).values(*self.names, *values)[:batch_size]
+
+    def key_of(self, row: dict) -> tuple:
+        """Extract the key from a row of `batch`."""
+        return tuple(row[name] for name in self.names)
+
+    def q_for_keys(self, keys: typing.Iterable[tuple]) -> dm.Q:
+        """Q matching exactly the given keys."""
+        keys = list(keys)
+        if not keys:
+            return dm.Q(pk__in=[])
+        if len(self.fields) == 1:
+            return dm.Q(**{f"{self.names[0]}__in": [key[0] for key in keys]})
+        return functools.reduce(
+            operator.or_, (dm.Q(**dict(zip(self.names, key))) for key in keys)
+        )
+
+    def iter_batches(
+        self,
+        qs: dm.QuerySet,
+        batch_size: int,
+        *values: str,
+        key: tuple | None = None,
+    ) -> typing.Iterator[list[dict]]:
+        """Yield lists of value rows in key order, one query per batch."""
+        while True:
+            rows = list(self.batch(qs, key, batch_size, *values))
+            if not rows:
+                return
+            yield rows
+            key = self.key_of(rows[-1])
+
+    def join_sql(self, left: str, right: str) -> str:
+        """SQL condition joining two relations exposing the key columns."""
+        return " AND ".join(
+            f"{left}.{column} = {right}.{column}" for column in self.columns
+        )
+
+    def last_key_sql(self, relation: str) -> str:
+        """SQL selecting the greatest key of a relation exposing the key columns."""
+        columns = ", ".join(self.columns)
+        descending = ", ".join(f"{column} DESC" for column in self.columns)
+        return f"SELECT {columns} FROM {relation} ORDER BY {descending} LIMIT 1"
@@ -1,28 +1,55 @@
 from django_infra.db.models.schedule import (
+    DatabaseNow,
     LookupOverrideMixin,
     PeriodScheduleMixin,
     ScheduleCode,
     ScheduleCodeCase,
+    ScheduleCodeSeries,
     ScheduleMixin,
+    ScheduleStatusMixin,
 )
 from django_infra.db.models.tracking import (
     TimeTrackingModel,
     TrackingMixin,
+    UserTrackingManager,
     UserTrackingMixin,
+    UserTrackingQuerySet,
+)
+from django_infra.db.models.updatable import (
+    DatabaseUpdateResult,
+    UpdatableModel,
+    coalesce_updates,
+)
+from django_infra.db.models.versioned import (
+    VersionConflictError,
+    VersionedManager,
+    VersionedMixin,
+    VersionedQuerySet,
 )
-from django_infra.db.models.updatable import UpdatableModel
 
 __all__ = [
     # Updatable
     "UpdatableModel",
+    "coalesce_updates",
+    "DatabaseUpdateResult",
+    # Versioned
+    "VersionedMixin",
+    "VersionConflictError",
+    "VersionedQuerySet",
+    "VersionedManager",
     # Tracking
     "TimeTrackingModel",
     "UserTrackingMixin",
     "TrackingMixin",
+    "UserTrackingQuerySet",
+    "UserTrackingManager",
     # Schedule
+    "DatabaseNow",
     "ScheduleCode",
     "ScheduleCodeCase",
+    "ScheduleCodeSeries",
     "ScheduleMixin",
+    "ScheduleStatusMixin",
     "PeriodScheduleMixin",
     "LookupOverrideMixin",
 ]
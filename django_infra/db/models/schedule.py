@@ -3,6 +3,7 @@ from __future__ import annotations
 import abc
 import datetime
 import logging
+import typing
 from functools import partial
 from typing import TYPE_CHECKING
 
@@ -11,7 +12,11 @@ if TYPE_CHECKING:
 
 import pytz
 from django.contrib.postgres.constraints import ExclusionConstraint
-from django.contrib.postgres.fields import DateTimeRangeField, RangeOperators
+from django.contrib.postgres.fields import (
+    ArrayField,
+    DateTimeRangeField,
+    RangeOperators,
+)
 from django.contrib.postgres.indexes import GistIndex
 from django.db import models as dm
 from django.db.models import TextChoices
@@ -64,12 +69,50 @@ class LookupOverrideMixin:
         return None
 
 
+NOW_GRANULARITIES = ("second", "minute", "hour", "day", "week", "month", "year")
+
+
+class DatabaseNow(dm.Func):
+    """
+    The current time evaluated by Postgres, `statement_timestamp()`, optionally
+    truncated to `granularity` in the current time zone.
+
+    Unlike a `timezone.now()` literal, the SQL and params stay identical between
+    queries (within a `granularity` window), so prepared statements, query result
+    caches and views can reuse them.
+    """
+
+    output_field = dm.DateTimeField()
+
+    def __init__(self, granularity: str = None, **extra):
+        if granularity is not None and granularity not in NOW_GRANULARITIES:
+            raise ValueError(
+                f"Unknown granularity {granularity}, choose from {NOW_GRANULARITIES}"
+            )
+        self.granularity = granularity
+        super().__init__(**extra)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        if self.granularity is None:
+            return "statement_timestamp()", []
+        from django.utils import timezone
+
+        # the 3 argument form keeps timestamptz, unlike Trunc's AT TIME ZONE.
+        return "date_trunc(%s, statement_timestamp(), %s)", [
+            self.granularity,
+            timezone.get_current_timezone_name(),
+        ]
+
+
 class ScheduleCodeCase(LookupOverrideMixin, Case):
     """
     Custom Case expression for ScheduleCode that optimizes WHERE clause filtering.
 
     When used in SELECT (annotation), it returns the normal CASE expression.
     When used in WHERE (filtering), it converts to efficient date comparisons.
+
+    With `db_now`, the current time is `DatabaseNow(granularity)` instead of a
+    `timezone.now()` literal, in both the CASE and the rewritten lookups.
     """
 
     class Exact(Exact):
@@ -136,10 +179,18 @@ class ScheduleCodeCase(LookupOverrideMixin, Case):
         start_ref: str = "start_date",
         end_ref: str = "end_date",
         current_date=None,
+        db_now: bool = False,
+        granularity: str = None,
         **kwargs,
     ):
         from django.utils import timezone
 
+        if db_now:
+            if current_date is not None:
+                raise ValueError("current_date cannot be given with db_now.")
+            current_date = DatabaseNow(granularity)
+        elif granularity is not None:
+            raise ValueError("granularity requires db_now.")
         current_date = current_date or timezone.now()
         self.start_ref = start_ref
         self.end_ref = end_ref
@@ -179,6 +230,75 @@ class ScheduleCodeCase(LookupOverrideMixin, Case):
         return dm.Q()
 
 
+class ScheduleCodeSeries(dm.Func):
+    """
+    Array of the ScheduleCode of a row at each of many timestamps, in order.
+
+    The timestamps are joined to the row as `unnest` of an array parameter, or as
+    `generate_series(start, end, step)` (both ends inclusive), so a whole timeline
+    is evaluated by a single query with the same rules as ScheduleCodeCase.
+    """
+
+    def __init__(
+        self,
+        start_ref: str = "start_date",
+        end_ref: str = "end_date",
+        timestamps: typing.Sequence[datetime.datetime] = None,
+        *,
+        start: datetime.datetime = None,
+        end: datetime.datetime = None,
+        step: datetime.timedelta = None,
+        **extra,
+    ):
+        series = (start, end, step)
+        with_series = any(value is not None for value in series)
+        if (timestamps is None) != with_series or (with_series and None in series):
+            raise ValueError(
+                "ScheduleCodeSeries requires either timestamps or start, end and step."
+            )
+        self.timestamps = None if timestamps is None else list(timestamps)
+        self.series = series
+        extra.setdefault("output_field", ArrayField(dm.CharField()))
+        super().__init__(dm.F(start_ref), dm.F(end_ref), **extra)
+
+    def series_sql(self):
+        if self.timestamps is not None:
+            return "unnest(%s::timestamptz[])", [self.timestamps]
+        return "generate_series(%s::timestamptz, %s::timestamptz, %s)", list(
+            self.series
+        )
+
+    def as_sql(self, compiler, connection, **extra_context):
+        start_sql, start_params = compiler.compile(self.source_expressions[0])
+        end_sql, end_params = compiler.compile(self.source_expressions[1])
+        series_sql, series_params = self.series_sql()
+        sql = (
+            f"ARRAY(SELECT CASE "
+            f"WHEN {start_sql} <= ts.at AND {end_sql} > ts.at THEN %s "
+            f"WHEN {start_sql} > ts.at THEN %s ELSE %s END "
+            f"FROM {series_sql} WITH ORDINALITY AS ts(at, n) ORDER BY ts.n)"
+        )
+        params = [
+            *start_params,
+            *end_params,
+            ScheduleCode.ACTIVE.value,
+            *start_params,
+            ScheduleCode.FUTURE.value,
+            ScheduleCode.EXPIRED.value,
+            *series_params,
+        ]
+        return sql, params
+
+    def bounds(self) -> tuple[datetime.datetime, datetime.datetime] | None:
+        """First and last timestamp evaluated, None without timestamps."""
+        if self.timestamps is None:
+            start, end, _ = self.series
+            return (start, end) if start <= end else None
+        if not self.timestamps:
+            return None
+        return min(self.timestamps), max(self.timestamps)
+
+
 MIN_DATE = datetime.datetime(1900, 1, 1, tzinfo=pytz.UTC)
 MAX_DATE = datetime.datetime(9000, 1, 1, tzinfo=pytz.UTC)
 
@@ -217,6 +337,47 @@ class ScheduleMixin(dm.Model):
         ordering = ["start_date", "end_date"]
 
 
+class ScheduleStatusMixin(ScheduleMixin):
+    """
+    Opt-in stored ScheduleCode, so it can be indexed, ordered on and aggregated.
+
+    The status is computed on save; transitions caused by time passing are applied
+    by `ScheduleQuerySet.refresh_schedule_status`, to be run periodically. Between
+    runs the stored status lags behind `ScheduleCodeCase`.
+    """
+
+    schedule_status = dm.CharField(
+        max_length=16, choices=ScheduleCode.choices, null=True, db_index=True
+    )
+
+    class Meta:
+        abstract = True
+        ordering = ["start_date", "end_date"]
+
+    def get_schedule_code(self, at: datetime.datetime = None) -> ScheduleCode:
+        """Python evaluation of ScheduleCodeCase for this instance."""
+        from django.utils import timezone
+
+        at = at or timezone.now()
+        if self.start_date is not None and self.start_date > at:
+            return ScheduleCode.FUTURE
+        if (
+            self.start_date is not None
+            and self.end_date is not None
+            and self.start_date <= at < self.end_date
+        ):
+            return ScheduleCode.ACTIVE
+        return ScheduleCode.EXPIRED
+
+    def save(self, *args, update_fields=None, **kwargs):
+        self.schedule_status = self.get_schedule_code().value
+        if update_fields is not None and (
+            {"start_date", "end_date"} & set(update_fields)
+        ):
+            update_fields = {*update_fields, "schedule_status"}
+        return super().save(*args, update_fields=update_fields, **kwargs)
+
+
 class PeriodScheduleMixin(ScheduleMixin):
     """Extended schedule mixin that includes a generated period field for overlap detection."""
 
@@ -16,6 +16,54 @@ class TimeTrackingModel(dm.Model):
         abstract = True
 
 
+def get_current_user_id():
+    """Primary key of the request user according to crum, `None` when unknown."""
+    try:
+        from crum import get_current_user
+    except ImportError:
+        return None
+    user = get_current_user()
+    if user is None or not getattr(user, "is_authenticated", False):
+        return None
+    return user.pk
+
+
+class UserTrackingQuerySet(dm.QuerySet):
+    """Fills `created_by`/`modified_by` with the current user on bulk writes.
+
+    Only `*_id` attributes are touched, so users are never loaded.
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        user_id = get_current_user_id()
+        objs = list(objs)
+        if user_id is not None:
+            for obj in objs:
+                if obj.created_by_id is None:
+                    obj.created_by_id = user_id
+                if obj.modified_by_id is None:
+                    obj.modified_by_id = user_id
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        user_id = get_current_user_id()
+        objs = list(objs)
+        if user_id is not None:
+            for obj in objs:
+                obj.modified_by_id = user_id
+            fields = list(dict.fromkeys([*fields, "modified_by"]))
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def update(self, **kwargs):
+        user_id = get_current_user_id()
+        if user_id is not None and not {"modified_by", "modified_by_id"} & set(kwargs):
+            kwargs["modified_by_id"] = user_id
+        return super().update(**kwargs)
+
+
+UserTrackingManager = dm.Manager.from_queryset(UserTrackingQuerySet)
+
+
 class UserTrackingMixin(dm.Model):
     created_by = dm.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -32,24 +80,24 @@ class UserTrackingMixin(dm.Model):
         null=True,
     )
 
+    objects = UserTrackingManager()
+
     def save(self, *args, **kwargs):
-        """Best effort attempt to set modified_by/created_by using crum."""
-        try:
-            from crum import get_current_user
-        except ImportError:
-            return super().save(*args, **kwargs)
-
-        creating = self.id is None
-        a_user_is_null = None in {self.created_by, self.modified_by}
-        current_user = get_current_user()
-        # attempt resolve any None fields
-        if a_user_is_null and current_user:
-            self.created_by = self.created_by or current_user
-            self.modified_by = self.modified_by or current_user
-        # best effort to update modifying user.
-        if not creating and current_user != self.modified_by:
-            self.modified_by = self.modified_by or current_user
-        if a_user_is_null:
+        """Best effort attempt to set modified_by/created_by using crum.
+
+        Works on `created_by_id`/`modified_by_id` only, so no user is loaded.
+        """
+        user_id = get_current_user_id()
+        if user_id is not None:
+            if self.created_by_id is None:
+                self.created_by_id = user_id
+            if not self._state.adding or self.modified_by_id is None:
+                self.modified_by_id = user_id
+            fields = set(kwargs.get("update_fields") or ())
+            # an empty update_fields skips the save, keep it that way.
+            if fields and not fields & {"modified_by", "modified_by_id"}:
+                kwargs["update_fields"] = [*kwargs["update_fields"], "modified_by"]
+        if None in {self.created_by_id, self.modified_by_id}:
             logger.info("Creator or modifier is still null: %s", self)
 
         return super().save(*args, **kwargs)
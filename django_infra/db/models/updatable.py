@@ -1,5 +1,99 @@
-from django.db import DEFAULT_DB_ALIAS
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import copy
+import dataclasses
+import functools
+import typing
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import DEFAULT_DB_ALIAS, connections
 from django.db import models as dm
+from django.db import router, transaction
+
+_MUTABLE_TYPES = (dict, list, set)
+
+
+class _UpdateBuffer:
+    """`update()` changes merged per (model, database, pk) until flushed."""
+
+    def __init__(self):
+        self.rows: dict[tuple, tuple[UpdatableModel, dict]] = {}
+
+    def add(self, instance: UpdatableModel, fields: list[str]):
+        key = (type(instance), instance._state.db, instance.pk)
+        _, changes = self.rows.get(key, (instance, {}))
+        changes.update({field: getattr(instance, field) for field in fields})
+        # the latest instance is written, carrying the changes of earlier ones.
+        self.rows[key] = (instance, changes)
+
+    def flush(self, batched=False, batch_size=1_000):
+        rows, self.rows = self.rows, {}
+        groups: dict[tuple, dict[tuple[str, ...], list[UpdatableModel]]] = {}
+        for (model, db, _), (instance, changes) in rows.items():
+            for field, value in changes.items():
+                setattr(instance, field, value)
+            if not batched:
+                instance.save(update_fields=instance._with_auto_now(list(changes)))
+                continue
+            model_groups = groups.setdefault((model, db), {})
+            model_groups.setdefault(tuple(sorted(changes)), []).append(instance)
+        for (model, db), model_groups in groups.items():
+            model._bulk_write(
+                model_groups, [db or router.db_for_write(model)], batch_size
+            )
+
+
+@dataclasses.dataclass
+class DatabaseUpdateResult:
+    """Outcome of `UpdatableModel.update` on one database alias."""
+
+    alias: str
+    rows: int = 0
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+_update_buffer: contextvars.ContextVar[_UpdateBuffer | None] = contextvars.ContextVar(
+    "update_buffer", default=None
+)
+
+
+@contextlib.contextmanager
+def coalesce_updates(batched=False, on_commit=False, using=None, batch_size=1_000):
+    """Buffer `UpdatableModel.update()` writes and merge them per row.
+
+    Instances are updated in memory right away, the database is written when the
+    block exits (or, with `on_commit`, once the current transaction of `using`
+    commits): one `save(update_fields=...)` per row, or with `batched` one
+    `bulk_apply` style statement per model and changed-field set, without signals.
+    Buffered writes are dropped if the block raises. Nested blocks join the
+    outermost one. Works as a decorator too. Versioned models are written right
+    away, keeping their compare-and-set.
+
+    Example:
+        >>> with coalesce_updates():
+        >>>     inst.update(field='a')
+        >>>     inst.update(field_2='b')  # a single UPDATE of field and field_2
+    """
+    if _update_buffer.get() is not None:
+        yield _update_buffer.get()
+        return
+    buffer = _UpdateBuffer()
+    token = _update_buffer.set(buffer)
+    try:
+        yield buffer
+    finally:
+        _update_buffer.reset(token)
+    flush = functools.partial(buffer.flush, batched=batched, batch_size=batch_size)
+    if on_commit:
+        transaction.on_commit(flush, using=using)
+    else:
+        flush()
 
 
 class UpdatableModel(dm.Model):
@@ -15,18 +109,106 @@ class UpdatableModel(dm.Model):
         inst.update(field='new_val', field_2='other_val')
         inst.update(field='new_val', field_2='other_val', bypass_orm=True)
         inst.update(field='new_val', field_2='other_val', commit=False)
+
+    Setting `track_changes = True` on a subclass snapshots the field values loaded
+    from the database, `save()` then only writes changed fields (plus `auto_now`
+    fields) and skips the query entirely when nothing changed:
+        class MyModel(UpdatableModel):
+            track_changes = True
+
+        inst = MyModel.objects.get(pk=1)
+        inst.field = 'new_val'
+        inst.save()  # UPDATE ... SET field = 'new_val'
     """
 
+    track_changes = False
+    # whether `coalesce_updates()` may buffer `update()` writes.
+    _coalesce_updates = True
+
     class Meta:
         abstract = True
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if cls.track_changes:
+            instance._take_snapshot()
+        return instance
+
+    def _take_snapshot(self, fields=None):
+        """Store loaded values as a tuple aligned with `concrete_fields`.
+
+        With `fields`, only those entries of an existing snapshot are replaced.
+        Mutable values (dicts, lists, sets) are copied, as they may be modified in place.
+        """
+        concrete_fields = self._meta.concrete_fields
+        current = tuple(
+            copy.deepcopy(value) if isinstance(value, _MUTABLE_TYPES) else value
+            for value in (
+                self.__dict__.get(f.attname, dm.DEFERRED) for f in concrete_fields
+            )
+        )
+        if fields is not None:
+            previous = self.__dict__.get("_loaded_values") or (
+                (dm.DEFERRED,) * len(concrete_fields)
+            )
+            current = tuple(
+                new if f.name in fields or f.attname in fields else old
+                for f, old, new in zip(concrete_fields, previous, current)
+            )
+        self._loaded_values = current
+
+    def get_dirty_fields(self) -> list[str]:
+        """Names of loaded fields that differ from their database snapshot.
+
+        Without a snapshot every loaded field is considered changed.
+        """
+        snapshot = self.__dict__.get("_loaded_values")
+        concrete_fields = self._meta.concrete_fields
+        if snapshot is None:
+            snapshot = (dm.DEFERRED,) * len(concrete_fields)
+        dirty = []
+        for field, old in zip(concrete_fields, snapshot):
+            new = self.__dict__.get(field.attname, dm.DEFERRED)
+            if new is dm.DEFERRED:
+                continue
+            if old is dm.DEFERRED or old != new:
+                dirty.append(field.name)
+        return dirty
+
+    def _changed_update_fields(self) -> list[str] | None:
+        """`update_fields` for a tracked save, `None` to save every field."""
+        pk_names = {f.name for f in getattr(self._meta, "pk_fields", [self._meta.pk])}
+        dirty = self.get_dirty_fields()
+        if not dirty:
+            return []
+        if pk_names & set(dirty):
+            return None
+        return self._with_auto_now(dirty)
+
+    @classmethod
+    def _with_auto_now(cls, fields: list[str]) -> list[str]:
+        """`fields` followed by the `auto_now` fields, which Django only refreshes
+        when they are part of `update_fields`."""
+        auto_now = [
+            f.name
+            for f in cls._meta.concrete_fields
+            if getattr(f, "auto_now", False) and f.name not in fields
+        ]
+        return [*fields, *auto_now]
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        if self.track_changes:
+            self._take_snapshot(fields)
+
     def update(
         self,
         bypass_orm=False,
         commit=True,
         databases: list = None,
         **fields,
-    ) -> None:
+    ) -> list[DatabaseUpdateResult] | None:
         """Update one or more fields on the model instance.
 
         Parameters:
@@ -35,8 +217,17 @@ class UpdatableModel(dm.Model):
             commit (bool): If True, saves changes to the database after updating the instance.
                            If False, updates the instance without saving to the database.
             databases (list, optional): A list of database aliases to use when bypassing the ORM.
+                                        Aliases are updated concurrently, except those
+                                        inside an atomic block of the calling thread.
             **fields: Field names and their new values.
 
+        Returns:
+            list[DatabaseUpdateResult] | None: With `databases`, the updated row count or
+                                               the error of each alias, in order.
+
+        Committed saves also write `auto_now` fields such as `modified_time`.
+        Inside `coalesce_updates()` committed changes are buffered and merged per row.
+
         Raises:
             RuntimeError: If databases are specified without setting bypass_orm to True.
         """
@@ -46,9 +237,7 @@ class UpdatableModel(dm.Model):
             )
         if bypass_orm:
             if databases:
-                for db in databases or list():
-                    self.__class__.objects.using(db).filter(pk=self.pk).update(**fields)
-                return
+                return self._update_databases(databases, fields)
             self.__class__.objects.filter(pk=self.pk).update(**fields)
             return
         modified_fields = []
@@ -62,13 +251,172 @@ class UpdatableModel(dm.Model):
                     modified_fields.append(field)
 
         if modified_fields:
-            self.save(update_fields=modified_fields)
+            buffer = _update_buffer.get()
+            if buffer is not None and self.pk is not None and self._coalesce_updates:
+                buffer.add(self, modified_fields)
+                return
+            self.save(update_fields=self._with_auto_now(modified_fields))
+
+    def _update_databases(self, databases, fields) -> list[DatabaseUpdateResult]:
+        def run(db):
+            try:
+                rows = (
+                    self.__class__.objects.using(db).filter(pk=self.pk).update(**fields)
+                )
+                return DatabaseUpdateResult(alias=db, rows=rows)
+            except Exception as e:
+                return DatabaseUpdateResult(alias=db, error=e)
+
+        def run_in_thread(db):
+            try:
+                return run(db)
+            finally:
+                connections.close_all()
+
+        # a worker thread has its own connection, outside the caller's transaction.
+        in_atomic = {
+            db
+            for db in databases
+            if db in connections.settings and connections[db].in_atomic_block
+        }
+        results = {}
+        with ThreadPoolExecutor(max_workers=len(databases)) as pool:
+            futures = {
+                db: pool.submit(run_in_thread, db)
+                for db in databases
+                if db not in in_atomic
+            }
+            for db in in_atomic:
+                results[db] = run(db)
+            for db, future in futures.items():
+                results[db] = future.result()
+        return [results[db] for db in databases]
+
+    @classmethod
+    def bulk_apply(
+        cls,
+        instances_with_changes: typing.Iterable[tuple[UpdatableModel, dict]],
+        commit=True,
+        databases: list = None,
+        batch_size=1_000,
+    ) -> int:
+        """Apply `update(**changes)` to many instances with few queries.
+
+        Changed values are set on the instances, then instances are grouped by
+        their set of changed fields and each group is written by a single
+        `UPDATE ... FROM (VALUES ...)` per `batch_size` rows. `auto_now` fields
+        are refreshed. Like `QuerySet.bulk_update`, no model signals are sent.
+
+        Parameters:
+            instances_with_changes: Pairs of an instance and its field values.
+            commit (bool): If False, updates the instances and sends `pre_save`
+                           (as `save(commit=False)`) without writing to the database.
+            databases (list, optional): Database aliases to write to, defaults to the
+                                        router's write alias.
+            batch_size (int): Rows per statement.
+
+        Returns:
+            int: Number of instances with at least one changed field.
+
+        Example:
+            >>> MyModel.bulk_apply([(inst, {"field": "new_val"}) for inst in instances])
+        """
+        groups: dict[tuple[str, ...], list[UpdatableModel]] = {}
+        for instance, changes in instances_with_changes:
+            modified_fields = []
+            for field, new_value in changes.items():
+                if getattr(instance, field) != new_value:
+                    setattr(instance, field, new_value)
+                    modified_fields.append(field)
+            if modified_fields:
+                groups.setdefault(tuple(sorted(modified_fields)), []).append(instance)
+
+        if not commit:
+            for field_names, instances in groups.items():
+                for instance in instances:
+                    instance.save(commit=False, update_fields=list(field_names))
+            return sum(len(instances) for instances in groups.values())
+        cls._bulk_write(groups, databases or [router.db_for_write(cls)], batch_size)
+        return sum(len(instances) for instances in groups.values())
+
+    @classmethod
+    def _bulk_write(
+        cls,
+        groups: dict[tuple[str, ...], list[UpdatableModel]],
+        databases: list,
+        batch_size: int,
+    ):
+        """Write the current values of each group's fields, one statement per batch."""
+        meta = cls._meta
+        auto_now = [f for f in meta.concrete_fields if getattr(f, "auto_now", False)]
+        for instances in groups.values():
+            for instance in instances:
+                for field in auto_now:
+                    field.pre_save(instance, add=False)
+
+        for db in databases:
+            with transaction.atomic(using=db):
+                for field_names, instances in groups.items():
+                    fields = [meta.get_field(name) for name in field_names]
+                    fields += [f for f in auto_now if f not in fields]
+                    for start in range(0, len(instances), batch_size):
+                        cls._bulk_apply_batch(
+                            instances[start : start + batch_size], fields, db
+                        )
+
+        if cls.track_changes:
+            for field_names, instances in groups.items():
+                for instance in instances:
+                    instance._take_snapshot(
+                        [*field_names, *(field.name for field in auto_now)]
+                    )
+
+    @classmethod
+    def _bulk_apply_batch(cls, instances, fields, db):
+        """`UPDATE ... FROM (VALUES ...)` of `fields`, values cast to column types."""
+        meta = cls._meta
+        conn = connections[db]
+        qn = conn.ops.quote_name
+        pk_fields = list(getattr(meta, "pk_fields", None) or [meta.pk])
+        columns = [*pk_fields, *fields]
+        row_sql = "({})".format(
+            ", ".join(f"%s::{field.cast_db_type(conn)}" for field in columns)
+        )
+        params = [
+            field.get_db_prep_save(getattr(instance, field.attname), conn)
+            for instance in instances
+            for field in columns
+        ]
+        set_clause = ", ".join(
+            [
+                *(f"{qn(field.column)} = v.{qn(field.column)}" for field in fields),
+                *cls._bulk_set_sql(fields, qn),
+            ]
+        )
+        join_clause = " AND ".join(
+            f"t.{qn(field.column)} = v.{qn(field.column)}" for field in pk_fields
+        )
+        sql = (
+            f"UPDATE {qn(meta.db_table)} AS t SET {set_clause} "
+            f"FROM (VALUES {', '.join([row_sql] * len(instances))}) "
+            f"AS v({', '.join(qn(field.column) for field in columns)}) "
+            f"WHERE {join_clause}"
+        )
+        with conn.cursor() as cursor:
+            cursor.execute(sql, params)
+
+    @classmethod
+    def _bulk_set_sql(cls, fields, qn) -> list[str]:
+        """Extra `column = expression` assignments of `_bulk_apply_batch`, the
+        target table is aliased `t`."""
+        return []
 
     def save(self, *args, commit=True, **kwargs):
         """Save the model instance.
 
         If commit is False, triggers the pre-save signal without writing to the database.
-        Otherwise, performs a standard save.
+        Otherwise, performs a standard save, limited to the changed fields when
+        `track_changes` is set and no `update_fields` are given.
         """
         if not commit:
             dm.signals.pre_save.send(
@@ -79,4 +427,21 @@ class UpdatableModel(dm.Model):
                 update_fields=kwargs.get("update_fields"),
             )
             return
+        if not self.track_changes:
+            return super().save(*args, **kwargs)
+
+        tracked = (
+            not args
+            and kwargs.get("update_fields") is None
+            and not kwargs.get("force_insert")
+            and not self._state.adding
+            and kwargs.get("using", self._state.db) == self._state.db
+            and "_loaded_values" in self.__dict__
+        )
+        if tracked:
+            update_fields = self._changed_update_fields()
+            if update_fields == []:
+                return
+            kwargs["update_fields"] = update_fields
         super().save(*args, **kwargs)
+        self._take_snapshot(kwargs.get("update_fields"))
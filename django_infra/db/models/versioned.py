@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import contextlib
+
+from django.db import models as dm
+from django.db import router, transaction
+
+from django_infra.db.models.updatable import UpdatableModel
+
+
+class VersionConflictError(RuntimeError):
+    """The row was changed by someone else since the instance was loaded."""
+
+
+class VersionedQuerySet(dm.QuerySet):
+    """Increments `version` on `update()`, so instances loaded before see a conflict."""
+
+    def update(self, **kwargs):
+        kwargs.setdefault("version", dm.F("version") + 1)
+        return super().update(**kwargs)
+
+
+VersionedManager = dm.Manager.from_queryset(VersionedQuerySet)
+
+
+class VersionedMixin(UpdatableModel):
+    """Optimistic concurrency control through an integer `version` column.
+
+    Every update is a compare-and-set `UPDATE ... WHERE pk = %s AND version = %s`
+    incrementing the version, so no row lock is held between reading and writing.
+    A save that loses the race raises `VersionConflictError`, while `update()`
+    calls `on_version_conflict` (refreshing the instance by default) and retries up
+    to `version_retries` times. Values of `update()` may be callables receiving the
+    instance, they are evaluated again after each refresh.
+
+    `bypass_orm` updates, `bulk_apply` and `objects.update()` do not check versions,
+    but still increment them. Custom querysets should extend `VersionedQuerySet`.
+    `coalesce_updates()` does not buffer these updates, merged writes could not
+    detect a conflict.
+
+    Examples:
+        inst.update(state='done')
+        inst.update(counter=lambda inst: inst.counter + 1)
+    """
+
+    version = dm.PositiveIntegerField(default=0)
+
+    version_retries = 3
+    _coalesce_updates = False
+
+    objects = VersionedManager()
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def _bulk_set_sql(cls, fields, qn) -> list[str]:
+        version_field = cls._meta.get_field("version")
+        if version_field in fields:
+            return []
+        column = qn(version_field.column)
+        return [f"{column} = t.{column} + 1"]
+
+    @classmethod
+    def _bulk_write(cls, groups, databases, batch_size):
+        super()._bulk_write(groups, databases, batch_size)
+        for field_names, instances in groups.items():
+            if "version" in field_names:
+                continue
+            for instance in instances:
+                instance.version += 1
+                if cls.track_changes:
+                    instance._take_snapshot(["version"])
+
+    def on_version_conflict(self, attempt: int):
+        """Called before retrying a conflicting `update()`."""
+        self.refresh_from_db()
+
+    def update(
+        self,
+        bypass_orm=False,
+        commit=True,
+        databases: list = None,
+        **fields,
+    ):
+        if bypass_orm or not commit:
+            return super().update(
+                bypass_orm=bypass_orm, commit=commit, databases=databases, **fields
+            )
+        using = router.db_for_write(type(self), instance=self)
+        for attempt in range(self.version_retries + 1):
+            values = {
+                field: value(self) if callable(value) else value
+                for field, value in fields.items()
+            }
+            # a savepoint keeps a conflict from breaking the caller's transaction.
+            savepoint = (
+                transaction.atomic(using=using)
+                if transaction.get_connection(using).in_atomic_block
+                else contextlib.nullcontext()
+            )
+            previous = {field: getattr(self, field) for field in values}
+            try:
+                with savepoint:
+                    return super().update(**values)
+            except VersionConflictError:
+                # undo the unsaved values, so a retry without refresh still writes.
+                for field, value in previous.items():
+                    setattr(self, field, value)
+                if attempt == self.version_retries:
+                    raise
+                self.on_version_conflict(attempt)
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        version_field = self._meta.get_field("version")
+        values = [value for value in values if value[0] is not version_field]
+        values.append((version_field, None, dm.F(version_field.attname) + 1))
+        updated = super()._do_update(
+            base_qs.filter(version=self.version),
+            using,
+            pk_val,
+            values,
+            update_fields,
+            forced_update,
+        )
+        if updated:
+            self.version += 1
+            if self.track_changes:
+                self._take_snapshot(["version"])
+        elif base_qs.filter(pk=pk_val).exists():
+            raise VersionConflictError(
+                f"{self._meta.label} {pk_val} is no longer at version {self.version}."
+            )
+        return updated
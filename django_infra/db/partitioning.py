@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import datetime
+import logging
+import re
+
+from django.db import connections
+from django.db import models as dm
+from django.db import router
+from django.db.backends.ddl_references import Statement
+from django.db.migrations.exceptions import IrreversibleError
+from django.db.migrations.operations.base import Operation
+from django.utils import timezone
+
+PARTITION_KEY = "created_time"
+INTERVALS = ("day", "week", "month", "year")
+PARTITION_UPPER_BOUND = re.compile(r"TO \('([^']+)'\)")
+
+
+class PartitionByCreatedTime(Operation):
+    """Recreate the (empty) table of a `TimeTrackingModel` range partitioned on `created_time`.
+
+    Place it right after the model's `CreateModel`. The primary key becomes
+    `(pk, created_time)`, as Postgres requires the partition key in unique
+    constraints, and a default partition catches rows outside of every range.
+    Indexes and foreign keys of the model are created on the partitioned table,
+    where Postgres cascades them to each partition. The model cannot have other
+    unique constraints nor be referenced by foreign keys, and `created_time` must
+    not be nullable. Reversing it recreates the table unpartitioned, as long as
+    it holds no rows.
+
+    Example:
+        >>> operations = [
+        >>>     migrations.CreateModel(name="Event", fields=[...]),
+        >>>     PartitionByCreatedTime("Event"),
+        >>> ]
+    """
+
+    reversible = True
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            partition_table(schema_editor, model)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            unpartition_table(schema_editor, model)
+
+    def describe(self):
+        return f"Partition {self.model_name} by range of {PARTITION_KEY}"
+
+    @property
+    def migration_name_fragment(self):
+        return f"partition_{self.model_name.lower()}"
+
+    def deconstruct(self):
+        return self.__class__.__name__, [self.model_name], {}
+
+
+def partition_table(schema_editor, model: type[dm.Model]):
+    meta = model._meta
+    unique = [field.name for field in meta.local_concrete_fields if field.unique] + [
+        constraint.name
+        for constraint in meta.total_unique_constraints
+        if PARTITION_KEY not in constraint.fields
+    ]
+    if unique != [meta.pk.name] or meta.unique_together:
+        raise ValueError(
+            f"{meta.label} can only be partitioned without unique constraints "
+            f"excluding {PARTITION_KEY}: {unique}"
+        )
+    if any(relation.field.db_constraint for relation in meta.related_objects):
+        raise ValueError(f"{meta.label} is referenced by foreign keys.")
+    if meta.get_field(PARTITION_KEY).null:
+        raise ValueError(f"{meta.label}.{PARTITION_KEY} cannot be nullable.")
+
+    qn = schema_editor.quote_name
+    table = meta.db_table
+    template = f"{table}__unpartitioned"
+    # indexes and foreign keys still pending for the table are created below.
+    schema_editor.deferred_sql = [
+        sql
+        for sql in schema_editor.deferred_sql
+        if not (isinstance(sql, Statement) and sql.references_table(table))
+    ]
+    schema_editor.execute(f"ALTER TABLE {qn(table)} RENAME TO {qn(template)}")
+    schema_editor.execute(
+        f"CREATE TABLE {qn(table)} (LIKE {qn(template)} INCLUDING DEFAULTS "
+        f"INCLUDING IDENTITY INCLUDING GENERATED INCLUDING CONSTRAINTS "
+        f"INCLUDING COMMENTS) PARTITION BY RANGE ({qn(PARTITION_KEY)})"
+    )
+    schema_editor.execute(f"DROP TABLE {qn(template)}")
+    schema_editor.execute(
+        f"ALTER TABLE {qn(table)} ADD PRIMARY KEY "
+        f"({qn(meta.pk.column)}, {qn(PARTITION_KEY)})"
+    )
+    schema_editor.execute(
+        f"CREATE TABLE {qn(f'{table}_default')} PARTITION OF {qn(table)} DEFAULT"
+    )
+    for field in meta.local_concrete_fields:
+        if field.remote_field and field.db_constraint:
+            schema_editor.execute(
+                schema_editor._create_fk_sql(
+                    model, field, "_fk_%(to_table)s_%(to_column)s"
+                )
+            )
+    for sql in schema_editor._model_indexes_sql(model):
+        schema_editor.execute(sql)
+
+
+def unpartition_table(schema_editor, model: type[dm.Model]):
+    qn = schema_editor.quote_name
+    meta = model._meta
+    if not schema_editor.collect_sql:
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(f"SELECT EXISTS (SELECT FROM {qn(meta.db_table)})")
+            (has_rows,) = cursor.fetchone()
+        if has_rows:
+            raise IrreversibleError(
+                f"{meta.label} has rows, unpartitioning its table would drop them."
+            )
+    # the attached partitions are dropped with it.
+    schema_editor.execute(f"DROP TABLE {qn(meta.db_table)}")
+    schema_editor.create_model(model)
+
+
+def floor_to_interval(moment: datetime.datetime, interval: str) -> datetime.datetime:
+    """Start of the `interval` containing `moment`, in the current time zone."""
+    moment = timezone.localtime(moment).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    if interval == "day":
+        return moment
+    if interval == "week":
+        return moment - datetime.timedelta(days=moment.weekday())
+    if interval == "month":
+        return moment.replace(day=1)
+    if interval == "year":
+        return moment.replace(month=1, day=1)
+    raise ValueError(f"Unknown partition interval {interval}, choose from {INTERVALS}")
+
+
+def next_interval(start: datetime.datetime, interval: str) -> datetime.datetime:
+    if interval == "day":
+        end = start + datetime.timedelta(days=1)
+    elif interval == "week":
+        end = start + datetime.timedelta(days=7)
+    elif interval == "month":
+        end = (start.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+    elif interval == "year":
+        end = start.replace(year=start.year + 1)
+    else:
+        raise ValueError(
+            f"Unknown partition interval {interval}, choose from {INTERVALS}"
+        )
+    return end
+
+
+def create_partitions(
+    model: type[dm.Model],
+    *,
+    interval: str = "month",
+    ahead: int = 3,
+    start: datetime.datetime = None,
+    using: str = None,
+) -> list[str]:
+    """Create the missing partitions from the interval of `start` (now) to `ahead` intervals after.
+
+    Run it regularly (e.g. daily) so rows never land in the default partition;
+    a range cannot be created once the default partition holds rows of it.
+
+    Returns:
+        list[str]: Names of the partitions created.
+    """
+    using = using or router.db_for_write(model)
+    conn = connections[using]
+    qn = conn.ops.quote_name
+    table = model._meta.db_table
+    lower = floor_to_interval(start or timezone.now(), interval)
+    created = []
+    with conn.cursor() as cursor:
+        for _ in range(ahead + 1):
+            upper = next_interval(lower, interval)
+            name = f"{table}_p{lower:%Y%m%d}"
+            cursor.execute("SELECT to_regclass(quote_ident(%s)) IS NULL", [name])
+            (missing,) = cursor.fetchone()
+            if missing:
+                # DDL takes no bind parameters, the bounds are inlined as literals.
+                bounds = conn.ops.compose_sql(
+                    "FOR VALUES FROM (%s) TO (%s)", [lower, upper]
+                )
+                cursor.execute(
+                    f"CREATE TABLE {qn(name)} PARTITION OF {qn(table)} {bounds}"
+                )
+                logging.info(f"Created partition {name} [{lower}, {upper})")
+                created.append(name)
+            lower = upper
+    return created
+
+
+def retire_partitions(
+    model: type[dm.Model],
+    *,
+    older_than: datetime.datetime,
+    drop: bool = True,
+    using: str = None,
+) -> list[str]:
+    """Detach, and drop unless `drop` is False, partitions ending before `older_than`.
+
+    Retention becomes a catalog operation instead of a `DELETE` scanning and
+    bloating the table. The default partition is never retired.
+
+    Returns:
+        list[str]: Names of the retired partitions.
+    """
+    using = using or router.db_for_write(model)
+    conn = connections[using]
+    qn = conn.ops.quote_name
+    table = model._meta.db_table
+    retired = []
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname, pg_get_expr(child.relpartbound, child.oid) "
+            "FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = quote_ident(%s)::regclass",
+            [table],
+        )
+        for name, bound in cursor.fetchall():
+            match = PARTITION_UPPER_BOUND.search(bound)
+            if match is None:
+                continue
+            cursor.execute("SELECT %s::timestamptz <= %s", [match.group(1), older_than])
+            (expired,) = cursor.fetchone()
+            if not expired:
+                continue
+            cursor.execute(f"ALTER TABLE {qn(table)} DETACH PARTITION {qn(name)}")
+            if drop:
+                cursor.execute(f"DROP TABLE {qn(name)}")
+            logging.info(f"Retired partition {name} {bound}")
+            retired.append(name)
+    return retired
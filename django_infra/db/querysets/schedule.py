@@ -1,18 +1,31 @@
 from __future__ import annotations
 
 import datetime
+import typing
 
 from django.contrib.postgres.fields import DateTimeRangeField
+from django.core.exceptions import EmptyResultSet
+from django.db import NotSupportedError, connections
 from django.db import models as dm
-from django.db.models.expressions import RawSQL
+from django.db import router
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
+from django.db.models.expressions import RawSQL, RowRange
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import GreaterThan, LessThan
 from django.utils import timezone
 
+from django_infra.db.bulk_ops import BulkOpProgress, bulk_update_queryset
 from django_infra.db.models.schedule import (
+    DatabaseNow,
     ScheduleCodeCase,
+    ScheduleCodeSeries,
     nest_end_date,
     nest_period,
     nest_start_date,
 )
+from django_infra.db.throttle import LoadThrottle
+
+OVERLAP_STRATEGIES = ("exists", "window")
 
 
 class ScheduleQuerySet(dm.QuerySet):
@@ -55,8 +68,24 @@ class ScheduleQuerySet(dm.QuerySet):
         date_time=None,
         schedule_ref: str = "",
         annotation_name="within_schedule",
+        db_now: bool = False,
+        granularity: str = None,
     ):
-        current_date = date_time or timezone.now()
+        """
+        Annotate `annotation_name` (is `date_time` within the schedule) and its
+        ScheduleCode as `<annotation_name>_code`.
+
+        With `db_now`, "now" is evaluated by Postgres (see `DatabaseNow`), optionally
+        truncated to `granularity`, so repeated queries are identical.
+        """
+        if db_now:
+            if date_time is not None:
+                raise ValueError("date_time cannot be given with db_now.")
+            current_date = DatabaseNow(granularity)
+        elif granularity is not None:
+            raise ValueError("granularity requires db_now.")
+        else:
+            current_date = date_time or timezone.now()
 
         # Use start_date and end_date directly (faster than period field)
         start_ref = nest_start_date(ref=schedule_ref)
@@ -80,10 +109,214 @@ class ScheduleQuerySet(dm.QuerySet):
             }
         )
 
-    def with_within_schedule(self, date_time=None, annotation_name="within_schedule"):
+    def with_within_schedule(
+        self,
+        date_time=None,
+        annotation_name="within_schedule",
+        db_now: bool = False,
+        granularity: str = None,
+    ):
         """Annotate self with a parameter stating if date is within schedule range."""
         return self.annotate_within_schedule(
-            qs=self, date_time=date_time, annotation_name=annotation_name
+            qs=self,
+            date_time=date_time,
+            annotation_name=annotation_name,
+            db_now=db_now,
+            granularity=granularity,
+        )
+
+    @staticmethod
+    def annotate_schedule_codes_at(
+        *,
+        qs,
+        timestamps: typing.Sequence[datetime.datetime] = None,
+        start: datetime.datetime = None,
+        end: datetime.datetime = None,
+        step: datetime.timedelta = None,
+        schedule_ref: str = "",
+        annotation_name: str = "schedule_codes",
+        overlapping_only: bool = False,
+    ):
+        """
+        Annotate the ScheduleCode of each row at many points in time, in one query.
+
+        `annotation_name` holds a list of codes aligned with `timestamps`, or with
+        `start, start + step, ...` up to `end` inclusive. With `overlapping_only`,
+        rows whose schedule does not overlap the first to last timestamp (they are
+        FUTURE or EXPIRED at every point) are filtered out on the indexed
+        start_date/end_date columns.
+        """
+        start_ref = nest_start_date(ref=schedule_ref)
+        end_ref = nest_end_date(ref=schedule_ref)
+        codes = ScheduleCodeSeries(
+            start_ref, end_ref, timestamps, start=start, end=end, step=step
+        )
+        if overlapping_only:
+            bounds = codes.bounds()
+            if bounds is None:
+                return qs.none()
+            first, last = bounds
+            qs = qs.filter(**{f"{start_ref}__lte": last, f"{end_ref}__gt": first})
+        return qs.annotate(**{annotation_name: codes})
+
+    def with_schedule_codes_at(
+        self,
+        timestamps: typing.Sequence[datetime.datetime] = None,
+        *,
+        start: datetime.datetime = None,
+        end: datetime.datetime = None,
+        step: datetime.timedelta = None,
+        annotation_name: str = "schedule_codes",
+        overlapping_only: bool = False,
+    ):
+        """Annotate self with the schedule codes at each timestamp of a timeline.
+
+        Examples:
+            qs.with_schedule_codes_at([t1, t2, t3])
+            qs.with_schedule_codes_at(start=t1, end=t2, step=timedelta(hours=1))
+        """
+        return self.annotate_schedule_codes_at(
+            qs=self,
+            timestamps=timestamps,
+            start=start,
+            end=end,
+            step=step,
+            annotation_name=annotation_name,
+            overlapping_only=overlapping_only,
+        )
+
+    def occupancy(
+        self,
+        start: datetime.datetime,
+        end: datetime.datetime,
+        step: datetime.timedelta,
+        *,
+        sum_field: str = None,
+        schedule_ref: str = "",
+    ) -> list[tuple[datetime.datetime, typing.Any]]:
+        """
+        Count (or sum `sum_field` of) the schedules active during each bucket.
+
+        The window `[start, end)` is split by `generate_series` into `[bucket,
+        bucket + step)` buckets, each joined to the periods overlapping it (`&&`),
+        so a whole dashboard is a single query. A schedule active at any moment of
+        a bucket counts for that bucket. Like `ScheduleCodeCase`, a schedule with a
+        null start or end date is never active.
+
+        Returns:
+            list[tuple[datetime, int | Decimal]]: Bucket start and its total.
+        """
+        qs = self._filter_overlapping(start, end, schedule_ref).order_by()
+        qs = qs.filter(
+            **{
+                f"{nest_start_date(ref=schedule_ref)}__isnull": False,
+                f"{nest_end_date(ref=schedule_ref)}__isnull": False,
+            }
+        )
+        # selected by alias, Django places model columns before annotations.
+        qs = qs.annotate(_occupancy_period=self._period_expression(schedule_ref))
+        if sum_field:
+            qs = qs.annotate(_occupancy_value=dm.F(sum_field))
+            qs = qs.values_list("_occupancy_period", "_occupancy_value")
+            total = "COALESCE(sum(s._occupancy_value), 0)"
+        else:
+            qs = qs.values_list("_occupancy_period")
+            total = "count(s._occupancy_period)"
+        try:
+            inner, inner_params = qs.query.get_compiler(using=self.db).as_sql()
+        except EmptyResultSet:
+            # nothing can match, every bucket is empty.
+            join, join_params, total = "", [], "0"
+        else:
+            join = f"""
+            LEFT JOIN ({inner}) AS s
+                ON s._occupancy_period && tstzrange(b.bucket, b.bucket + %s, '[)')
+            """
+            join_params = [*inner_params, step]
+        sql = f"""
+            SELECT b.bucket, {total}
+            FROM generate_series(%s::timestamptz, %s::timestamptz, %s) AS b(bucket)
+            {join}
+            WHERE b.bucket < %s
+            GROUP BY b.bucket
+            ORDER BY b.bucket
+        """
+        params = [start, end, step, *join_params, end]
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    def refresh_schedule_status(
+        self,
+        *,
+        since: datetime.datetime = None,
+        now: datetime.datetime = None,
+        batch_size: int = 10_000,
+        progress: BulkOpProgress = None,
+        throttle: LoadThrottle = None,
+    ) -> BulkOpProgress:
+        """
+        Apply the ScheduleCode transitions to the stored `schedule_status` of a
+        `ScheduleStatusMixin` model.
+
+        With `since` (the `now` of the previous run), only rows whose start_date or
+        end_date crossed `(since, now]` are read, as ranges of the start/end btree
+        indexes. Without it every row is checked, e.g. after a bulk `update()` of
+        the dates or for the first run. Rows already holding the right status are
+        not written.
+
+        Example:
+            >>> now = timezone.now()
+            >>> Booking.objects.refresh_schedule_status(since=last_run, now=now)
+            >>> last_run = now
+        """
+        now = now or timezone.now()
+        qs = self
+        if since is not None:
+            qs = qs.filter(
+                dm.Q(start_date__gt=since, start_date__lte=now)
+                | dm.Q(end_date__gt=since, end_date__lte=now)
+            )
+        qs = qs.annotate(_schedule_status=ScheduleCodeCase(current_date=now))
+        return bulk_update_queryset(
+            qs=qs,
+            annotation_field_pairs=[("_schedule_status", "schedule_status")],
+            batch_size=batch_size,
+            skip_unchanged=True,
+            progress=progress,
+            using=self._db or router.db_for_write(self.model),
+            throttle=throttle,
+        )
+
+    def _period_expression(self, schedule_ref: str = ""):
+        """`tstzrange` of start/end, unbounded on null and empty if inverted."""
+        start_ref = nest_start_date(ref=schedule_ref)
+        end_ref = nest_end_date(ref=schedule_ref)
+        return dm.Case(
+            dm.When(
+                **{f"{start_ref}__gt": dm.F(end_ref)},
+                then=RawSQL(
+                    "'empty'::tstzrange", [], output_field=DateTimeRangeField()
+                ),
+            ),
+            default=dm.Func(
+                dm.F(start_ref),
+                dm.F(end_ref),
+                dm.Value("[)"),
+                function="tstzrange",
+                output_field=DateTimeRangeField(),
+            ),
+        )
+
+    def _filter_overlapping(
+        self, start: datetime.datetime, end: datetime.datetime, schedule_ref: str = ""
+    ):
+        """Rows whose schedule overlaps `[start, end)`, on the start/end indexes."""
+        start_ref = nest_start_date(ref=schedule_ref)
+        end_ref = nest_end_date(ref=schedule_ref)
+        return self.filter(
+            dm.Q(**{f"{start_ref}__lt": end}) | dm.Q(**{f"{start_ref}__isnull": True}),
+            dm.Q(**{f"{end_ref}__gt": start}) | dm.Q(**{f"{end_ref}__isnull": True}),
         )
 
 
@@ -91,9 +324,35 @@ class PeriodScheduleQuerySet(ScheduleQuerySet):
     """Extended queryset for models with period field, adding overlap detection methods."""
 
     @staticmethod
-    def annotate_has_overlap(*, qs, schedule_ref: str = "", partition_by: str = ""):
+    def annotate_has_overlap(
+        *,
+        qs,
+        schedule_ref: str = "",
+        partition_by: str = "",
+        strategy: str = "exists",
+    ):
+        """
+        Annotate `has_overlap`, whether the period of a row overlaps the period of
+        another row of `qs` (with the same `partition_by` value).
+
+        * `strategy="exists"` - a correlated EXISTS on the GiST index per row, best
+          when only a few rows are selected.
+        * `strategy="window"` - a single sorted pass over the whole queryset, best
+          to check whole tables (see `window_has_overlap`).
+        """
         period_ref = nest_period(ref=schedule_ref)
 
+        if strategy == "window":
+            return qs.annotate(
+                has_overlap=PeriodScheduleQuerySet.window_has_overlap(
+                    period_ref=period_ref, partition_by=partition_by
+                )
+            )
+        if strategy != "exists":
+            raise ValueError(
+                f"Unknown overlap strategy {strategy}, choose from {OVERLAP_STRATEGIES}"
+            )
+
         subquery = qs.filter(
             ~dm.Q(pk=dm.OuterRef("pk")),
             **{f"{period_ref}__overlap": dm.OuterRef(period_ref)},
@@ -103,8 +362,218 @@ class PeriodScheduleQuerySet(ScheduleQuerySet):
 
         return qs.annotate(has_overlap=dm.Exists(subquery))
 
-    def with_has_overlap(self):
-        return PeriodScheduleQuerySet.annotate_has_overlap(qs=self)
+    def with_has_overlap(self, partition_by: str = "", strategy: str = "exists"):
+        return PeriodScheduleQuerySet.annotate_has_overlap(
+            qs=self, partition_by=partition_by, strategy=strategy
+        )
+
+    @staticmethod
+    def window_has_overlap(*, period_ref: str = "period", partition_by: str = ""):
+        """
+        Overlap flag computed with window functions instead of a subquery per row.
+
+        Rows of each partition are sorted by lower bound (then pk). A row overlaps
+        an earlier row when the running max of the earlier upper bounds is after its
+        lower bound, and a later row when the next lower bound is before its upper
+        bound. Unbounded ends count as infinite and empty periods never overlap,
+        like the `&&` operator. Rows with a null `partition_by` value never overlap,
+        like the equality of the EXISTS strategy.
+        """
+        lower = Coalesce(
+            dm.Func(
+                dm.F(period_ref), function="lower", output_field=dm.DateTimeField()
+            ),
+            RawSQL("'-infinity'::timestamptz", [], output_field=dm.DateTimeField()),
+        )
+        upper = Coalesce(
+            dm.Func(
+                dm.F(period_ref), function="upper", output_field=dm.DateTimeField()
+            ),
+            RawSQL("'infinity'::timestamptz", [], output_field=dm.DateTimeField()),
+        )
+        non_empty = ~dm.Q(**{f"{period_ref}__isempty": True})
+        partition = [dm.F(partition_by)] if partition_by else None
+        # ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+        before = RowRange(start=None, end=-1)
+
+        earlier_upper = dm.Window(
+            dm.Max(upper, filter=non_empty),
+            partition_by=partition,
+            order_by=[lower.asc(), dm.F("pk").asc()],
+            frame=before,
+        )
+        # the rows preceding in reverse order are the ones following in order.
+        later_lower = dm.Window(
+            dm.Min(lower, filter=non_empty),
+            partition_by=partition,
+            order_by=[lower.desc(), dm.F("pk").desc()],
+            frame=before,
+        )
+        null_partition = [
+            dm.When(**{f"{partition_by}__isnull": True, "then": dm.Value(False)})
+        ]
+        return dm.Case(
+            *(null_partition if partition_by else []),
+            dm.When(~non_empty, then=dm.Value(False)),
+            dm.When(GreaterThan(earlier_upper, lower), then=dm.Value(True)),
+            dm.When(LessThan(later_lower, upper), then=dm.Value(True)),
+            default=dm.Value(False),
+            output_field=dm.BooleanField(),
+        )
+
+    def _period_expression(self, schedule_ref: str = ""):
+        return dm.F(nest_period(ref=schedule_ref))
+
+    def _filter_overlapping(
+        self, start: datetime.datetime, end: datetime.datetime, schedule_ref: str = ""
+    ):
+        # on the GiST index of period.
+        return self.filter(
+            **{f"{nest_period(ref=schedule_ref)}__overlap": (start, end)}
+        )
+
+    def coalesced(
+        self,
+        partition_by: str = "",
+        *,
+        schedule_ref: str = "",
+        chunk_size: int = 2000,
+        use_range_agg: bool = None,
+    ) -> typing.Iterator[tuple[typing.Any, DateTimeTZRange]]:
+        """
+        Stream the union of the periods of each `partition_by` value, ordered.
+
+        Overlapping and adjacent periods are merged, yielding `(key, period)` tuples
+        (`key` is None without `partition_by`) from a server side cursor, in chunks of
+        `chunk_size` rows. Postgres 14+ merges with `range_agg`, older servers (or
+        `use_range_agg=False`) with a gaps-and-islands window over periods sorted by
+        lower bound.
+        """
+        period_ref = nest_period(ref=schedule_ref)
+        qs = self.filter(**{f"{period_ref}__isempty": False})
+        source, params = self._periods_sql(qs, partition_by, period_ref)
+
+        connection = connections[self.db]
+        if use_range_agg is None:
+            use_range_agg = connection.pg_version >= 140000
+        if use_range_agg:
+            sql = (
+                f"SELECT p.key, unnest(range_agg(p.period)) FROM {source} AS p "
+                f"GROUP BY 1 ORDER BY 1, 2"
+            )
+        else:
+            # a period starting after every earlier upper bound starts an island,
+            # sorted first among equal periods so the running sum numbers islands.
+            sql = f"""
+                SELECT key, tstzrange(
+                    NULLIF(min(lo), '-infinity'), NULLIF(max(hi), 'infinity'), '[)'
+                )
+                FROM (
+                    SELECT key, lo, hi, sum(starts) OVER (
+                        PARTITION BY key ORDER BY lo, hi, starts DESC
+                        ROWS UNBOUNDED PRECEDING
+                    ) AS island
+                    FROM (
+                        SELECT key, lo, hi, CASE WHEN lo <= max(hi) OVER (
+                            PARTITION BY key ORDER BY lo, hi
+                            ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+                        ) THEN 0 ELSE 1 END AS starts
+                        FROM (
+                            SELECT p.key,
+                                COALESCE(lower(p.period), '-infinity') AS lo,
+                                COALESCE(upper(p.period), 'infinity') AS hi
+                            FROM {source} AS p
+                        ) bounds
+                    ) starts
+                ) islands
+                GROUP BY key, island
+                ORDER BY key, min(lo)
+            """
+
+        return self._stream(sql, params, chunk_size)
+
+    def free_slots(
+        self,
+        start: datetime.datetime,
+        end: datetime.datetime,
+        *,
+        min_duration: datetime.timedelta = None,
+        partition_by: str = "",
+        schedule_ref: str = "",
+        chunk_size: int = 2000,
+    ) -> typing.Iterator[tuple[typing.Any, DateTimeTZRange]]:
+        """
+        Stream the free intervals of each `partition_by` value within `[start, end)`.
+
+        Yields `(key, slot)` tuples ordered by key and time, where `slot` is a part
+        of the window covered by no period, lasting at least `min_duration`. The busy
+        periods are found with `&&` on the GiST index (see `get_default_indexes`) and
+        subtracted from the window as a multirange, which requires Postgres 14+.
+        Every distinct non null `partition_by` value of the queryset is searched, so
+        a value without any period in the window is free for the whole window. An
+        empty queryset has no value to search with `partition_by` and yields nothing,
+        without it the whole window is free.
+        """
+        connection = connections[self.db]
+        if connection.pg_version < 140000:
+            raise NotSupportedError("free_slots requires Postgres 14+ multiranges.")
+        period_ref = nest_period(ref=schedule_ref)
+        busy = self.filter(**{f"{period_ref}__overlap": (start, end)})
+        if partition_by:
+            busy = busy.filter(**{f"{partition_by}__isnull": False})
+            keys = self.filter(**{f"{partition_by}__isnull": False})
+            keys = keys.order_by().values_list(partition_by).distinct()
+            try:
+                keys_sql, keys_params = keys.query.get_compiler(using=self.db).as_sql()
+            except EmptyResultSet:
+                return iter(())
+            keys_sql = f"({keys_sql}) AS k(key)"
+        else:
+            keys_sql, keys_params = "(SELECT NULL AS key) AS k", []
+        busy_sql, busy_params = self._periods_sql(busy, partition_by, period_ref)
+        join = "b.key = k.key" if partition_by else "true"
+
+        sql = f"""
+            SELECT key, slot FROM (
+                SELECT k.key, unnest(
+                    tstzmultirange(tstzrange(%s, %s, '[)'))
+                    - COALESCE(range_agg(b.period), '{{}}'::tstzmultirange)
+                ) AS slot
+                FROM {keys_sql} LEFT JOIN {busy_sql} AS b ON {join}
+                GROUP BY k.key
+            ) slots
+            WHERE upper(slot) - lower(slot) >= %s
+            ORDER BY key, slot
+        """
+        params = [
+            start,
+            end,
+            *keys_params,
+            *busy_params,
+            min_duration or datetime.timedelta(0),
+        ]
+        return self._stream(sql, params, chunk_size)
+
+    def _periods_sql(self, qs, partition_by: str, period_ref: str):
+        """Subquery of `qs` selecting `key` (NULL without `partition_by`) and `period`."""
+        qs = qs.order_by()
+        if partition_by:
+            qs = qs.values_list(partition_by, period_ref)
+        else:
+            qs = qs.values_list(period_ref)
+        try:
+            inner, params = qs.query.get_compiler(using=self.db).as_sql()
+        except EmptyResultSet:
+            return "(SELECT NULL AS key, NULL::tstzrange AS period WHERE false)", []
+        if partition_by:
+            return f"(SELECT s.key, s.period FROM ({inner}) AS s(key, period))", params
+        return f"(SELECT NULL AS key, s.period FROM ({inner}) AS s(period))", params
+
+    def _stream(self, sql: str, params, chunk_size: int) -> typing.Iterator[tuple]:
+        with connections[self.db].chunked_cursor() as cursor:
+            cursor.execute(sql, params)
+            while rows := cursor.fetchmany(chunk_size):
+                yield from rows
 
     @staticmethod
     def annotate_range_has_overlap(
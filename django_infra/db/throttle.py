@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import dataclasses
+import logging
+import time
+
+from django.db import connections
+from django.db import models as dm
+
+
+@dataclasses.dataclass
+class LoadThrottle:
+    """Pause batched writes while the database is under pressure.
+
+    Bulk operations call `wait` between batches (after the batch committed). It
+    sleeps `sleep_seconds` and then polls the server until replication lag, lock
+    waits and dead tuples of the written table are all below their thresholds,
+    for at most `max_wait` seconds. A threshold of `None` disables that check.
+
+    Replication lag is only visible to roles with `pg_monitor` (or
+    `pg_read_all_stats`); without it a warning is logged and the lag check is
+    skipped.
+
+    Example:
+        >>> throttle = LoadThrottle(max_replication_lag=5, max_dead_tuples=2_000_000)
+        >>> bulk_update_queryset(qs=qs, annotation_field_pairs=pairs, throttle=throttle)
+        >>> throttle.paused  # seconds spent waiting
+    """
+
+    max_replication_lag: float | None = 10.0
+    max_lock_waits: int | None = 5
+    max_dead_tuples: int | None = None
+    sleep_seconds: float = 0.0
+    poll_interval: float = 1.0
+    max_wait: float = 300.0
+    paused: float = dataclasses.field(default=0.0, init=False)
+    _warned_hidden_lag: bool = dataclasses.field(default=False, init=False, repr=False)
+
+    def pressure(self, *, using: str, model: type[dm.Model]) -> list[str]:
+        """Reasons to pause, empty when the database is healthy."""
+        reasons = []
+        with connections[using].cursor() as cursor:
+            if self.max_replication_lag is not None:
+                # replay_lag is NULL once an idle standby has caught up, and in
+                # every column but pid (state included) when lacking privileges.
+                cursor.execute(
+                    "SELECT COALESCE(EXTRACT(EPOCH FROM max(replay_lag)), 0), "
+                    "count(*) FILTER (WHERE state IS NULL) "
+                    "FROM pg_stat_replication"
+                )
+                lag, hidden = cursor.fetchone()
+                if hidden and not self._warned_hidden_lag:
+                    self._warned_hidden_lag = True
+                    logging.warning(
+                        f"Replication lag of {hidden} standby(s) is hidden, "
+                        "grant pg_monitor to throttle on it"
+                    )
+                if lag > self.max_replication_lag:
+                    reasons.append(f"replication lag {float(lag):.1f}s")
+            if self.max_lock_waits is not None:
+                cursor.execute(
+                    "SELECT count(*) FROM pg_stat_activity "
+                    "WHERE wait_event_type = 'Lock' AND datname = current_database()"
+                )
+                (lock_waits,) = cursor.fetchone()
+                if lock_waits > self.max_lock_waits:
+                    reasons.append(f"{lock_waits} lock waits")
+            if self.max_dead_tuples is not None:
+                cursor.execute(
+                    "SELECT n_dead_tup FROM pg_stat_user_tables "
+                    "WHERE relid = %s::regclass",
+                    [connections[using].ops.quote_name(model._meta.db_table)],
+                )
+                row = cursor.fetchone()
+                if row and row[0] > self.max_dead_tuples:
+                    reasons.append(f"{row[0]} dead tuples")
+        return reasons
+
+    def wait(self, *, using: str, model: type[dm.Model]):
+        start = time.monotonic()
+        if self.sleep_seconds:
+            time.sleep(self.sleep_seconds)
+        while reasons := self.pressure(using=using, model=model):
+            waited = time.monotonic() - start
+            if waited >= self.max_wait:
+                logging.warning(
+                    f"Throttle gave up after {waited:.0f}s: {', '.join(reasons)}"
+                )
+                break
+            logging.info(f"Throttling {model.__name__}: {', '.join(reasons)}")
+            time.sleep(min(self.poll_interval, self.max_wait - waited))
+        self.paused += time.monotonic() - start
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.7 on 2026-10-19 06:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tests_test_api", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChangeFeedTestModel",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_time", models.DateTimeField(auto_now_add=True, null=True)),
+                ("modified_time", models.DateTimeField(auto_now=True, null=True)),
+                ("name", models.CharField(blank=True, default="", max_length=100)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["modified_time", "id"],
+                        name="changefeed_test_changes_idx",
+                    )
+                ],
+            },
+        ),
+    ]
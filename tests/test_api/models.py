@@ -1,6 +1,7 @@
 from django.db import models as dm
 
-from django_infra.db.models import UpdatableModel
+from django_infra.db.change_feed import change_feed_index
+from django_infra.db.models import TimeTrackingModel, UpdatableModel
 
 
 class M2MTestModel(dm.Model):
@@ -34,3 +35,11 @@ class TestModelRelations(dm.Model):
 
     class Meta:
         app_label = __package__.replace(".", "_")
+
+
+class ChangeFeedTestModel(TimeTrackingModel):
+    name = dm.CharField(max_length=100, default="", blank=True)
+
+    class Meta:
+        app_label = __package__.replace(".", "_")
+        indexes = [change_feed_index("changefeed_test_changes_idx")]
@@ -7,10 +7,16 @@ from django_infra.api import filters
 from django_infra.api.field_handlers import HandledFieldsMixin, handle_fields
 from django_infra.api.serializers import RequestDrivenFieldsSerializer
 from django_infra.api.views import (
+    ChangeFeedMixin,
     FilteredPartialResponseModelViewSet,
     PaginatedViewMixin,
 )
-from tests.test_api.models import FKTestModel, M2MTestModel, TestModelRelations
+from tests.test_api.models import (
+    ChangeFeedTestModel,
+    FKTestModel,
+    M2MTestModel,
+    TestModelRelations,
+)
 
 
 class FKModelSerializer(serializers.ModelSerializer):
@@ -140,6 +146,12 @@ class HandledFieldsTestView(
         return queryset.select_related("fk_model")
 
 
+class ChangeFeedTestView(ChangeFeedMixin, FilteredPartialResponseModelViewSet):
+    permission_classes = []
+    authentication_classes = []
+    model = ChangeFeedTestModel
+
+
 class TestFilters:
     def test_view_filter(self, db):
         baker.make(
@@ -225,3 +237,37 @@ class TestFilters:
 
         assert response.status_code == status.HTTP_200_OK
         assert len(response.data.get("results")) == 1
+
+
+class TestChangeFeed:
+    def get(self, query=""):
+        request = APIRequestFactory().get(f"/changes/{query}")
+        return ChangeFeedTestView.as_view({"get": "changes"})(request)
+
+    def test_pages_resume_after_cursor(self, db):
+        objs = baker.make(ChangeFeedTestModel, _quantity=3)
+        response = self.get("?limit=2")
+        assert response.status_code == status.HTTP_200_OK
+        assert [row["id"] for row in response.data["results"]] == [
+            objs[0].pk,
+            objs[1].pk,
+        ]
+        assert response.data["has_more"] is True
+
+        cursor = response.data["cursor"]
+        objs[0].name = "changed"
+        objs[0].save()
+        response = self.get(f"?limit=2&cursor={cursor}")
+        assert [row["id"] for row in response.data["results"]] == [
+            objs[2].pk,
+            objs[0].pk,
+        ]
+        assert response.data["has_more"] is False
+
+        cursor = response.data["cursor"]
+        response = self.get(f"?cursor={cursor}")
+        assert response.data == {"results": [], "cursor": cursor, "has_more": False}
+
+    def test_invalid_cursor(self, db):
+        response = self.get("?cursor=not-a-cursor")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.7 on 2026-10-19 05:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="BackfillTestModel",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("value", models.IntegerField(default=0)),
+                ("updated_value", models.IntegerField(null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,11 @@
+from django.db import models as dm
+
+from django_infra.db.models import UpdatableModel
+
+
+class BackfillTestModel(UpdatableModel):
+    value = dm.IntegerField(default=0)
+    updated_value = dm.IntegerField(null=True)
+
+    class Meta:
+        app_label = __package__.replace(".", "_")
@@ -0,0 +1,90 @@
+from unittest.mock import patch
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import models as dm
+from model_bakery import baker
+
+from django_infra.backfill.models import BulkOpRun, BulkOpRunState
+from django_infra.backfill.registry import Backfill, backfills, register_backfill
+from django_infra.db.bulk_ops import bulk_update_queryset
+from tests.test_backfill.models import BackfillTestModel
+
+
+@pytest.fixture
+def registered():
+    throttles = []
+
+    @register_backfill("test_values", models=[BackfillTestModel], analyze=True)
+    def test_values(progress, throttle):
+        """Copy value + 10 into updated_value."""
+        throttles.append(throttle)
+        bulk_update_queryset(
+            qs=BackfillTestModel.objects.annotate(_value_plus_ten=dm.F("value") + 10),
+            annotation_field_pairs=[("_value_plus_ten", "updated_value")],
+            batch_size=2,
+            progress=progress,
+            throttle=throttle,
+        )
+
+    yield throttles
+    backfills.pop("test_values")
+
+
+class TestRunBackfill:
+    def test_duplicate_name_is_refused(self, registered):
+        with pytest.raises(ValueError):
+            register_backfill("test_values")(lambda progress, throttle: None)
+
+    def test_list(self, registered, capsys):
+        call_command("run_backfill", "--list")
+        assert (
+            "test_values\tCopy value + 10 into updated_value."
+            in capsys.readouterr().out
+        )
+
+    def test_unknown_backfill(self, db):
+        with pytest.raises(CommandError):
+            call_command("run_backfill", "missing")
+
+    def test_run_throttled_and_analyzed(self, registered, transactional_db, capsys):
+        baker.make(BackfillTestModel, value=1, _quantity=3)
+        call_command(
+            "run_backfill", "test_values", "--max-replication-lag", "30", "--vacuum"
+        )
+        (throttle,) = registered
+        assert throttle.max_replication_lag == 30
+        assert throttle.max_lock_waits == 5
+        run = BulkOpRun.objects.get(name="test_values")
+        assert run.state == BulkOpRunState.SUCCESS
+        assert (run.processed, run.batches, run.operation) == (3, 2, "test_values")
+        assert not BackfillTestModel.objects.exclude(updated_value=11).exists()
+        assert "test_values: 3 rows, 3 changed" in capsys.readouterr().out
+
+    def test_run_without_throttle(self, registered, db):
+        call_command("run_backfill", "test_values", "--no-throttle")
+        assert registered == [None]
+
+    def test_analyze_on_written_alias(self, db):
+        def copy_values(progress, throttle):
+            bulk_update_queryset(
+                qs=BackfillTestModel.objects.using("default").annotate(
+                    _value_plus_ten=dm.F("value") + 10
+                ),
+                annotation_field_pairs=[("_value_plus_ten", "updated_value")],
+                progress=progress,
+            )
+
+        def db_for_write(model, **hints):
+            # the router points to an alias that does not exist here.
+            return "replica_primary" if model is BackfillTestModel else "default"
+
+        backfill = Backfill("copy_values", copy_values, models=(BackfillTestModel,))
+        with (
+            patch("django.db.router.db_for_write", side_effect=db_for_write),
+            patch("django_infra.backfill.registry.maintain_table") as maintain,
+        ):
+            backfill.run(analyze=True)
+        maintain.assert_called_once_with(
+            BackfillTestModel, analyze=True, vacuum=False, using="default"
+        )
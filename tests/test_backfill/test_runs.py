@@ -0,0 +1,188 @@
+import datetime
+from unittest.mock import patch
+
+import pytest
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connection, connections
+from django.db import models as dm
+from django.utils import timezone
+from model_bakery import baker
+
+from django_infra.backfill.models import BulkOpRun, BulkOpRunQuerySet, BulkOpRunState
+from django_infra.backfill.runs import RunInProgressError, RunProgress, tracked_run
+from django_infra.db.bulk_ops import (
+    bulk_delete_queryset,
+    bulk_update_queryset,
+    sync_queryset_into,
+)
+from tests.test_backfill.models import BackfillTestModel
+
+PAIRS = [("_value_plus_ten", "updated_value")]
+
+
+def backfill_qs():
+    return BackfillTestModel.objects.annotate(_value_plus_ten=dm.F("value") + 10)
+
+
+class TestTrackedRun:
+    def test_successful_run_is_recorded(self, db):
+        objs = baker.make(BackfillTestModel, value=1, _quantity=5)
+        with tracked_run("totals", "bulk_update_queryset") as progress:
+            bulk_update_queryset(
+                qs=backfill_qs(),
+                annotation_field_pairs=PAIRS,
+                batch_size=2,
+                progress=progress,
+            )
+        run = BulkOpRun.objects.get(name="totals")
+        assert run.state == BulkOpRunState.SUCCESS
+        assert (run.total, run.processed, run.changed, run.batches) == (5, 5, 5, 3)
+        assert run.last_key == [objs[-1].pk]
+        assert run.finished_time is not None
+
+    def test_failed_run_resumes_from_checkpoint(self, db):
+        baker.make(BackfillTestModel, value=1, _quantity=5)
+        checkpoint = RunProgress.checkpoint
+        calls = []
+
+        def failing_checkpoint(progress):
+            calls.append(progress.last_key)
+            if len(calls) == 2:
+                raise RuntimeError("connection lost")
+            checkpoint(progress)
+
+        with patch.object(RunProgress, "checkpoint", failing_checkpoint):
+            with pytest.raises(RuntimeError):
+                with tracked_run("totals") as progress:
+                    bulk_update_queryset(
+                        qs=backfill_qs(),
+                        annotation_field_pairs=PAIRS,
+                        batch_size=2,
+                        progress=progress,
+                    )
+        run = BulkOpRun.objects.get(name="totals")
+        assert run.state == BulkOpRunState.FAIL
+        assert run.processed == 2
+        # the failed batch was rolled back together with its checkpoint.
+        assert BackfillTestModel.objects.filter(updated_value__isnull=True).count() == 3
+
+        with tracked_run("totals") as progress:
+            assert progress.last_key == tuple(run.last_key)
+            bulk_update_queryset(
+                qs=backfill_qs(),
+                annotation_field_pairs=PAIRS,
+                batch_size=2,
+                skip_unchanged=True,
+                progress=progress,
+            )
+        run.refresh_from_db()
+        assert run.state == BulkOpRunState.SUCCESS
+        assert (run.total, run.processed, run.changed) == (5, 5, 5)
+        assert not BackfillTestModel.objects.filter(updated_value__isnull=True).exists()
+
+    def test_delete_resume_total(self, db):
+        baker.make(BackfillTestModel, _quantity=4)
+        with tracked_run("purge") as progress:
+            bulk_delete_queryset(
+                qs=BackfillTestModel.objects.all(), batch_size=3, progress=progress
+            )
+        run = BulkOpRun.objects.get(name="purge")
+        assert (run.total, run.processed, run.batches) == (4, 4, 2)
+
+    def test_sync_deletions_are_recorded(self, db):
+        kept = baker.make(BackfillTestModel, value=1, _quantity=3)
+        baker.make(BackfillTestModel, value=2)
+        with tracked_run("dedupe", "sync_queryset_into") as progress:
+            sync_queryset_into(
+                BackfillTestModel,
+                BackfillTestModel.objects.filter(value=1),
+                key_fields=["id"],
+                field_map={"id": "pk", "value": "value"},
+                delete_missing=True,
+                progress=progress,
+            )
+        run = BulkOpRun.objects.get(name="dedupe")
+        assert (run.processed, run.changed, run.deleted) == (3, 0, 1)
+        assert set(BackfillTestModel.objects.all()) == set(kept)
+
+    @pytest.mark.parametrize("resume", [True, False])
+    def test_running_run_is_not_taken_over(self, db, resume):
+        run = baker.make(
+            BulkOpRun, name="totals", state=BulkOpRunState.RUNNING, last_key=[3]
+        )
+        with pytest.raises(RunInProgressError):
+            with tracked_run("totals", resume=resume):
+                pytest.fail("a running run must not be resumed")
+        run.refresh_from_db()
+        assert run.state == BulkOpRunState.RUNNING
+        assert run.last_key == [3]
+        assert BulkOpRun.objects.count() == 1
+
+    def test_stale_running_run_is_resumed(self, db):
+        run = baker.make(
+            BulkOpRun, name="totals", state=BulkOpRunState.RUNNING, last_key=[3]
+        )
+        BulkOpRun.objects.filter(pk=run.pk).update(
+            modified_time=timezone.now() - datetime.timedelta(hours=2)
+        )
+        with tracked_run("totals") as progress:
+            assert progress.run.pk == run.pk
+            assert progress.last_key == (3,)
+        run.refresh_from_db()
+        assert run.state == BulkOpRunState.SUCCESS
+
+    def test_run_claimed_concurrently_is_not_resumed(self, db):
+        run = baker.make(BulkOpRun, name="totals", state=BulkOpRunState.FAIL)
+        # another process claims the run between the lookup and the claim.
+        BulkOpRun.objects.filter(pk=run.pk).update(state=BulkOpRunState.RUNNING)
+        with (
+            patch.object(
+                BulkOpRunQuerySet, "running", return_value=BulkOpRun.objects.none()
+            ),
+            patch.object(BulkOpRunQuerySet, "resumable", return_value=[run]),
+        ):
+            with tracked_run("totals") as progress:
+                assert progress.run.pk != run.pk
+        run.refresh_from_db()
+        assert run.state == BulkOpRunState.RUNNING
+
+    def test_start_waits_for_concurrent_start(self, db):
+        other = connections.create_connection(DEFAULT_DB_ALIAS)
+        try:
+            with other.cursor() as cursor:
+                # another process is between its running check and its create.
+                cursor.execute("SELECT pg_advisory_lock(hashtext('totals'))")
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL lock_timeout = '100ms'")
+            with pytest.raises(OperationalError, match="lock timeout"):
+                with tracked_run("totals", resume=False):
+                    pytest.fail("the run must wait for the lock")
+        finally:
+            other.close()
+        assert not BulkOpRun.objects.filter(name="totals").exists()
+
+    def test_heartbeat_keeps_run_from_going_stale(self, db):
+        with tracked_run("totals") as progress:
+            BulkOpRun.objects.filter(pk=progress.run.pk).update(
+                modified_time=timezone.now() - datetime.timedelta(hours=2)
+            )
+            assert BulkOpRun.objects.resumable("totals").exists()
+            progress.heartbeat()
+            assert BulkOpRun.objects.running("totals").exists()
+            assert not BulkOpRun.objects.resumable("totals").exists()
+
+    def test_throughput(self, db):
+        baker.make(
+            BulkOpRun,
+            operation="bulk_update_queryset",
+            state=BulkOpRunState.SUCCESS,
+            processed=100,
+            rate=10.0,
+            _quantity=2,
+        )
+        baker.make(
+            BulkOpRun, operation="bulk_update_queryset", state=BulkOpRunState.FAIL
+        )
+        (row,) = BulkOpRun.objects.throughput()
+        assert row["runs"] == 2
+        assert row["rows"] == 200
+        assert row["avg_rate"] == 10.0
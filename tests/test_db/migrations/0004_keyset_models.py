@@ -0,0 +1,60 @@
+# Generated by Django 5.1.7 on 2026-10-19 05:53
+
+import uuid
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tests_test_db", "0003_order_status"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CharKeyTestModel",
+            fields=[
+                (
+                    "key",
+                    models.CharField(max_length=32, primary_key=True, serialize=False),
+                ),
+                ("value", models.IntegerField(default=0)),
+                ("updated_value", models.IntegerField(null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="UUIDKeyTestModel",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4, primary_key=True, serialize=False
+                    ),
+                ),
+                ("value", models.IntegerField(default=0)),
+                ("updated_value", models.IntegerField(null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="CompositeKeyTestModel",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("tenant", models.IntegerField()),
+                ("number", models.IntegerField()),
+                ("value", models.IntegerField(default=0)),
+                ("updated_value", models.IntegerField(null=True)),
+            ],
+            options={
+                "unique_together": {("tenant", "number")},
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.7 on 2026-10-19 06:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tests_test_db", "0004_keyset_models"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CustomerReport",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("customer_key", models.IntegerField(unique=True)),
+                ("name", models.CharField(max_length=100)),
+                ("order_count", models.IntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.7 on 2026-10-19 06:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tests_test_db", "0005_customerreport"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TrackedTestModel",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_time", models.DateTimeField(auto_now_add=True, null=True)),
+                ("modified_time", models.DateTimeField(auto_now=True, null=True)),
+                ("name", models.CharField(blank=True, default="", max_length=100)),
+                ("value", models.IntegerField(default=0)),
+                ("payload", models.JSONField(default=dict)),
+            ],
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.7 on 2026-10-19 06:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tests_test_db", "0006_trackedtestmodel"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VersionedTestModel",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("version", models.PositiveIntegerField(default=0)),
+                ("state", models.CharField(blank=True, default="", max_length=100)),
+                ("counter", models.IntegerField(default=0)),
+            ],
+        ),
+    ]
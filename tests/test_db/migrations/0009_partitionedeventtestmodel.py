@@ -0,0 +1,44 @@
+# Generated by Django 5.1.7 on 2026-10-19 06:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+import django_infra.db.partitioning
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tests_test_db", "0008_usertrackedtestmodel"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PartitionedEventTestModel",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("modified_time", models.DateTimeField(auto_now=True, null=True)),
+                ("created_time", models.DateTimeField(auto_now_add=True)),
+                ("kind", models.CharField(db_index=True, default="", max_length=32)),
+                (
+                    "customer",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="tests_test_db.customer",
+                    ),
+                ),
+            ],
+        ),
+        django_infra.db.partitioning.PartitionByCreatedTime(
+            "PartitionedEventTestModel"
+        ),
+    ]
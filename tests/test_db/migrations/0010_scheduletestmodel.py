@@ -0,0 +1,62 @@
+# Generated by Django 5.1.7 on 2026-10-19 06:25
+
+import django.contrib.postgres.fields.ranges
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tests_test_db", "0009_partitionedeventtestmodel"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ScheduleTestModel",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("start_date", models.DateTimeField(db_index=True, null=True)),
+                ("end_date", models.DateTimeField(db_index=True, null=True)),
+                (
+                    "period",
+                    models.GeneratedField(
+                        db_persist=True,
+                        expression=models.Func(
+                            models.F("start_date"),
+                            models.F("end_date"),
+                            models.Value("[)"),
+                            function="tstzrange",
+                        ),
+                        output_field=django.contrib.postgres.fields.ranges.DateTimeRangeField(),
+                    ),
+                ),
+                ("room", models.CharField(blank=True, default="", max_length=32)),
+            ],
+            options={
+                "ordering": ["start_date", "end_date"],
+                "abstract": False,
+                "indexes": [
+                    django.contrib.postgres.indexes.GistIndex(
+                        fields=["period"], name="schedtest_gist_period"
+                    ),
+                    models.Index(
+                        models.Func(models.F("period"), function="upper"),
+                        name="schedtest_idx_period_upper",
+                    ),
+                    models.Index(
+                        models.Func(models.F("period"), function="lower"),
+                        name="schedtest_idx_period_lower",
+                    ),
+                ],
+            },
+        ),
+    ]
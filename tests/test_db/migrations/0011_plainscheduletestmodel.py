@@ -0,0 +1,34 @@
+# Generated by Django 5.1.7 on 2026-10-19 06:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tests_test_db", "0010_scheduletestmodel"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PlainScheduleTestModel",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("start_date", models.DateTimeField(db_index=True, null=True)),
+                ("end_date", models.DateTimeField(db_index=True, null=True)),
+                ("seats", models.IntegerField(default=0)),
+            ],
+            options={
+                "ordering": ["start_date", "end_date"],
+                "abstract": False,
+            },
+        ),
+    ]
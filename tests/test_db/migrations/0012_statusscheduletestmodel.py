@@ -0,0 +1,46 @@
+# Generated by Django 5.1.7 on 2026-10-19 06:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tests_test_db", "0011_plainscheduletestmodel"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StatusScheduleTestModel",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("start_date", models.DateTimeField(db_index=True, null=True)),
+                ("end_date", models.DateTimeField(db_index=True, null=True)),
+                (
+                    "schedule_status",
+                    models.CharField(
+                        choices=[
+                            ("ACTIVE", "Active"),
+                            ("FUTURE", "Inactive Pre"),
+                            ("EXPIRED", "Inactive Post"),
+                        ],
+                        db_index=True,
+                        max_length=16,
+                        null=True,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["start_date", "end_date"],
+                "abstract": False,
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.7 on 2026-10-19 06:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tests_test_db", "0012_statusscheduletestmodel"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TrackedScheduleTestModel",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("start_date", models.DateTimeField(db_index=True, null=True)),
+                ("end_date", models.DateTimeField(db_index=True, null=True)),
+                ("created_time", models.DateTimeField(auto_now_add=True, null=True)),
+                ("modified_time", models.DateTimeField(auto_now=True, null=True)),
+                ("room", models.CharField(blank=True, default="", max_length=32)),
+            ],
+            options={
+                "ordering": ["start_date", "end_date"],
+                "abstract": False,
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-19 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tests_test_db", "0013_trackedscheduletestmodel"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="scheduletestmodel",
+            name="room",
+            field=models.CharField(blank=True, default="", max_length=32, null=True),
+        ),
+    ]
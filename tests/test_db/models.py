@@ -1,7 +1,18 @@
+import uuid
+
 from django.db import models as dm
 
 from django_infra.db import enum
-from django_infra.db.models import UpdatableModel
+from django_infra.db.models import (
+    PeriodScheduleMixin,
+    ScheduleMixin,
+    ScheduleStatusMixin,
+    TimeTrackingModel,
+    UpdatableModel,
+    UserTrackingMixin,
+    VersionedMixin,
+)
+from django_infra.db.querysets import PeriodScheduleQuerySet, ScheduleQuerySet
 
 
 class UpdatableTestModel(UpdatableModel):
@@ -12,6 +23,78 @@ class UpdatableTestModel(UpdatableModel):
         app_label = __package__.replace(".", "_")
 
 
+class TrackedTestModel(TimeTrackingModel, UpdatableModel):
+    track_changes = True
+
+    name = dm.CharField(max_length=100, default="", blank=True)
+    value = dm.IntegerField(default=0)
+    payload = dm.JSONField(default=dict)
+
+    class Meta:
+        app_label = __package__.replace(".", "_")
+
+
+class VersionedTestModel(VersionedMixin):
+    state = dm.CharField(max_length=100, default="", blank=True)
+    counter = dm.IntegerField(default=0)
+
+    class Meta:
+        app_label = __package__.replace(".", "_")
+
+
+class UserTrackedTestModel(UserTrackingMixin):
+    name = dm.CharField(max_length=100, default="", blank=True)
+
+    class Meta:
+        app_label = __package__.replace(".", "_")
+
+
+class PartitionedEventTestModel(TimeTrackingModel):
+    """Range partitioned on created_time by its migration."""
+
+    created_time = dm.DateTimeField(auto_now_add=True)
+    customer = dm.ForeignKey("Customer", on_delete=dm.CASCADE, null=True)
+    kind = dm.CharField(max_length=32, db_index=True, default="")
+
+    class Meta:
+        app_label = __package__.replace(".", "_")
+
+
+class ScheduleTestModel(PeriodScheduleMixin):
+    room = dm.CharField(max_length=32, default="", blank=True, null=True)
+
+    objects = PeriodScheduleQuerySet.as_manager()
+
+    class Meta(PeriodScheduleMixin.Meta):
+        app_label = __package__.replace(".", "_")
+        indexes = PeriodScheduleMixin.get_default_indexes(class_name_abbr="schedtest")
+
+
+class PlainScheduleTestModel(ScheduleMixin):
+    seats = dm.IntegerField(default=0)
+
+    objects = ScheduleQuerySet.as_manager()
+
+    class Meta(ScheduleMixin.Meta):
+        app_label = __package__.replace(".", "_")
+
+
+class TrackedScheduleTestModel(TimeTrackingModel, ScheduleMixin):
+    room = dm.CharField(max_length=32, default="", blank=True)
+
+    objects = ScheduleQuerySet.as_manager()
+
+    class Meta(ScheduleMixin.Meta):
+        app_label = __package__.replace(".", "_")
+
+
+class StatusScheduleTestModel(ScheduleStatusMixin):
+    objects = ScheduleQuerySet.as_manager()
+
+    class Meta(ScheduleStatusMixin.Meta):
+        app_label = __package__.replace(".", "_")
+
+
 # -------------- BULK OPS MODELS ----------------------
 class BulkOpsTestModel(UpdatableModel):
     value = dm.IntegerField(default=0)
@@ -21,6 +104,35 @@ class BulkOpsTestModel(UpdatableModel):
         app_label = __package__.replace(".", "_")
 
 
+class CharKeyTestModel(UpdatableModel):
+    key = dm.CharField(max_length=32, primary_key=True)
+    value = dm.IntegerField(default=0)
+    updated_value = dm.IntegerField(null=True)
+
+    class Meta:
+        app_label = __package__.replace(".", "_")
+
+
+class UUIDKeyTestModel(UpdatableModel):
+    id = dm.UUIDField(primary_key=True, default=uuid.uuid4)
+    value = dm.IntegerField(default=0)
+    updated_value = dm.IntegerField(null=True)
+
+    class Meta:
+        app_label = __package__.replace(".", "_")
+
+
+class CompositeKeyTestModel(UpdatableModel):
+    tenant = dm.IntegerField()
+    number = dm.IntegerField()
+    value = dm.IntegerField(default=0)
+    updated_value = dm.IntegerField(null=True)
+
+    class Meta:
+        app_label = __package__.replace(".", "_")
+        unique_together = [("tenant", "number")]
+
+
 # A somewhat complex scenario for testing bulk operations.
 
 
@@ -39,6 +151,15 @@ class Product(UpdatableModel):
         app_label = __package__.replace(".", "_")
 
 
+class CustomerReport(dm.Model):
+    customer_key = dm.IntegerField(unique=True)
+    name = dm.CharField(max_length=100)
+    order_count = dm.IntegerField(default=0)
+
+    class Meta:
+        app_label = __package__.replace(".", "_")
+
+
 class OrderQuerySet(dm.QuerySet):
     def with_computed_total(self):
         return self.annotate(
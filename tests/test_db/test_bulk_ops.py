@@ -1,10 +1,29 @@
+import asyncio
+from unittest.mock import patch
+
 import pytest
 from django.db import models as dm
 from django.db import transaction
+from django.db.models.expressions import RawSQL
 from model_bakery import baker
 
-from django_infra.db.bulk_ops import bulk_update_queryset
-from tests.test_db.models import BulkOpsTestModel, Customer, Order, OrderItem, Product
+from django_infra.db.bulk_ops import (
+    BulkOpProgress,
+    ChangedRow,
+    abulk_update_queryset,
+    bulk_delete_queryset,
+    bulk_update_queryset,
+    sync_queryset_into,
+)
+from tests.test_db.models import (
+    BulkOpsTestModel,
+    CompositeKeyTestModel,
+    Customer,
+    CustomerReport,
+    Order,
+    OrderItem,
+    Product,
+)
 
 
 @pytest.fixture(scope="class")
@@ -113,3 +132,355 @@ class TestBulkUpdateQueryset:
             assert obj.updated_value == obj.value + 10
 
         Order.objects.all().update()
+
+
+class TestBulkDeleteQueryset:
+    def test_raw_delete_in_batches(self, db):
+        keep = baker.make(BulkOpsTestModel, value=0, _quantity=3)
+        delete = baker.make(BulkOpsTestModel, value=1, _quantity=7)
+        progress = bulk_delete_queryset(
+            qs=BulkOpsTestModel.objects.filter(pk__in=[obj.pk for obj in delete]),
+            batch_size=3,
+            lock_timeout="1s",
+        )
+        assert progress.processed == 7
+        assert progress.batches == 3
+        remaining = BulkOpsTestModel.objects.filter(
+            pk__in=[obj.pk for obj in keep + delete]
+        )
+        assert set(remaining.values_list("pk", flat=True)) == {obj.pk for obj in keep}
+
+    @pytest.mark.parametrize(
+        "qs",
+        [
+            lambda: BulkOpsTestModel.objects.none(),
+            lambda: BulkOpsTestModel.objects.filter(pk__in=[]),
+        ],
+    )
+    def test_raw_delete_empty_queryset(self, db, qs):
+        baker.make(BulkOpsTestModel)
+        progress = bulk_delete_queryset(qs=qs(), raw=True)
+        assert (progress.processed, progress.batches) == (0, 0)
+        assert BulkOpsTestModel.objects.exists()
+
+    def test_orm_delete_cascades(self, db):
+        customers = baker.make(Customer, _quantity=5)
+        for customer in customers:
+            baker.make(Order, customer=customer, _quantity=2)
+        qs = Customer.objects.filter(pk__in=[customer.pk for customer in customers])
+        progress = bulk_delete_queryset(qs=qs, batch_size=2)
+        assert progress.processed == 5
+        assert not qs.exists()
+        assert not Order.objects.filter(customer__in=customers).exists()
+
+    def test_raw_delete_refused_with_cascades(self, db):
+        baker.make(Customer)
+        with pytest.raises(ValueError):
+            bulk_delete_queryset(qs=Customer.objects.all(), raw=True)
+        assert Customer.objects.exists()
+
+
+class TestBulkUpdateSkipUnchanged:
+    def test_only_changed_rows_are_written(self, db):
+        baker.make(BulkOpsTestModel, value=1, updated_value=11, _quantity=6)
+        baker.make(BulkOpsTestModel, value=1, _quantity=4)
+        qs = BulkOpsTestModel.objects.annotate(_value_plus_ten=dm.F("value") + 10)
+        pairs = [("_value_plus_ten", "updated_value")]
+
+        progress = bulk_update_queryset(
+            qs=qs, annotation_field_pairs=pairs, batch_size=3, skip_unchanged=True
+        )
+        assert progress.processed == 10
+        assert progress.changed == 4
+        assert not BulkOpsTestModel.objects.exclude(updated_value=11).exists()
+
+        progress = bulk_update_queryset(
+            qs=qs, annotation_field_pairs=pairs, batch_size=3, skip_unchanged=True
+        )
+        assert progress.processed == 10
+        assert progress.changed == 0
+
+    def test_changed_defaults_to_scanned(self, db):
+        baker.make(BulkOpsTestModel, value=1, updated_value=11, _quantity=3)
+        progress = bulk_update_queryset(
+            qs=BulkOpsTestModel.objects.annotate(_value_plus_ten=dm.F("value") + 10),
+            annotation_field_pairs=[("_value_plus_ten", "updated_value")],
+        )
+        assert progress.changed == progress.processed == 3
+
+
+class TestBulkUpdateOnChanged:
+    def test_changed_keys_per_batch(self, db, django_capture_on_commit_callbacks):
+        unchanged = baker.make(BulkOpsTestModel, value=1, updated_value=11, _quantity=2)
+        changed = baker.make(BulkOpsTestModel, value=2, _quantity=3)
+        batches = []
+        with django_capture_on_commit_callbacks(execute=True):
+            bulk_update_queryset(
+                qs=BulkOpsTestModel.objects.filter(
+                    pk__in=[obj.pk for obj in unchanged + changed]
+                ).annotate(_value_plus_ten=dm.F("value") + 10),
+                annotation_field_pairs=[("_value_plus_ten", "updated_value")],
+                batch_size=2,
+                skip_unchanged=True,
+                on_changed=batches.append,
+            )
+        # the all unchanged first batch is not reported.
+        assert batches == [
+            [ChangedRow(key=(changed[0].pk,)), ChangedRow(key=(changed[1].pk,))],
+            [ChangedRow(key=(changed[2].pk,))],
+        ]
+
+    def test_changed_values(self, db, django_capture_on_commit_callbacks):
+        obj = baker.make(BulkOpsTestModel, value=2, updated_value=5)
+        batches = []
+        with django_capture_on_commit_callbacks(execute=True):
+            bulk_update_queryset(
+                qs=BulkOpsTestModel.objects.filter(pk=obj.pk).annotate(
+                    _value_plus_ten=dm.F("value") + 10,
+                    _value_plus_one=dm.F("value") + 1,
+                ),
+                annotation_field_pairs=[
+                    ("_value_plus_ten", "updated_value"),
+                    ("_value_plus_one", "value"),
+                ],
+                on_changed=batches.append,
+                changed_values=True,
+            )
+        assert batches == [
+            [
+                ChangedRow(
+                    key=(obj.pk,),
+                    old={"updated_value": 5, "value": 2},
+                    new={"updated_value": 12, "value": 3},
+                )
+            ]
+        ]
+
+    def test_changed_values_without_on_changed(self, db):
+        with pytest.raises(ValueError):
+            bulk_update_queryset(
+                qs=BulkOpsTestModel.objects.annotate(
+                    _value_plus_ten=dm.F("value") + 10
+                ),
+                annotation_field_pairs=[("_value_plus_ten", "updated_value")],
+                changed_values=True,
+            )
+
+    def test_not_reported_before_commit(self, db, django_capture_on_commit_callbacks):
+        obj = baker.make(BulkOpsTestModel, value=2)
+        batches = []
+        with django_capture_on_commit_callbacks() as callbacks:
+            bulk_update_queryset(
+                qs=BulkOpsTestModel.objects.filter(pk=obj.pk).annotate(
+                    _value_plus_ten=dm.F("value") + 10
+                ),
+                annotation_field_pairs=[("_value_plus_ten", "updated_value")],
+                on_changed=batches.append,
+            )
+        assert batches == []
+        assert len(callbacks) == 1
+
+
+class TestBulkUpdateServerSide:
+    def test_server_side_batches(self, transactional_db):
+        objs = baker.make(BulkOpsTestModel, value=1, _quantity=7)
+        qs = BulkOpsTestModel.objects.filter(pk__in=[obj.pk for obj in objs])
+        progress = bulk_update_queryset(
+            qs=qs.annotate(_value_plus_ten=dm.F("value") + 10),
+            annotation_field_pairs=[("_value_plus_ten", "updated_value")],
+            batch_size=3,
+            skip_unchanged=True,
+            server_side=True,
+        )
+        assert (progress.processed, progress.changed, progress.batches) == (7, 7, 3)
+        assert progress.last_key == (objs[-1].pk,)
+        assert not qs.exclude(updated_value=11).exists()
+
+    def test_server_side_resumes_composite_key(self, transactional_db):
+        for i in range(6):
+            baker.make(CompositeKeyTestModel, tenant=i % 2, number=i, value=i)
+        progress = bulk_update_queryset(
+            qs=CompositeKeyTestModel.objects.annotate(
+                _value_plus_ten=dm.F("value") + 10
+            ),
+            annotation_field_pairs=[("_value_plus_ten", "updated_value")],
+            batch_size=2,
+            key_fields=["tenant", "number"],
+            progress=BulkOpProgress(last_key=(0, 4)),
+            server_side=True,
+        )
+        assert progress.processed == 3
+        assert progress.last_key == (1, 5)
+        assert (
+            CompositeKeyTestModel.objects.filter(updated_value__isnull=True).count()
+            == 3
+        )
+
+    def test_server_side_heartbeat(self, transactional_db):
+        objs = baker.make(BulkOpsTestModel, value=1, _quantity=2)
+        qs = BulkOpsTestModel.objects.filter(pk__in=[obj.pk for obj in objs])
+        progress = BulkOpProgress()
+        with (
+            patch("django_infra.db.bulk_ops.SERVER_SIDE_HEARTBEAT", 0.01),
+            patch.object(progress, "heartbeat") as heartbeat,
+        ):
+            bulk_update_queryset(
+                qs=qs.annotate(
+                    _slow_value=dm.F("value")
+                    + RawSQL(
+                        "(SELECT 0 FROM pg_sleep(0.1))",
+                        [],
+                        output_field=dm.IntegerField(),
+                    )
+                ),
+                annotation_field_pairs=[("_slow_value", "updated_value")],
+                batch_size=1,
+                progress=progress,
+                server_side=True,
+            )
+        assert heartbeat.called
+        assert progress.processed == 2
+
+    def test_server_side_refused_in_transaction(self, db):
+        with pytest.raises(RuntimeError):
+            bulk_update_queryset(
+                qs=BulkOpsTestModel.objects.annotate(_value=dm.F("value")),
+                annotation_field_pairs=[("_value", "updated_value")],
+                server_side=True,
+            )
+
+
+class TestBulkUpdateUsing:
+    def test_explicit_alias(self, db):
+        objs = baker.make(BulkOpsTestModel, value=2, _quantity=3)
+        qs = BulkOpsTestModel.objects.filter(pk__in=[obj.pk for obj in objs])
+        progress = bulk_update_queryset(
+            qs=qs.annotate(_value_plus_ten=dm.F("value") + 10),
+            annotation_field_pairs=[("_value_plus_ten", "updated_value")],
+            using="default",
+        )
+        assert progress.processed == 3
+        assert not qs.exclude(updated_value=12).exists()
+
+    @staticmethod
+    def router_elsewhere():
+        # the router points to an alias that does not exist here.
+        return patch(
+            "django_infra.db.bulk_ops.router.db_for_write",
+            return_value="replica_primary",
+        )
+
+    def test_queryset_alias(self, db):
+        objs = baker.make(BulkOpsTestModel, value=2, _quantity=3)
+        qs = BulkOpsTestModel.objects.using("default").filter(
+            pk__in=[obj.pk for obj in objs]
+        )
+        with self.router_elsewhere():
+            updated = bulk_update_queryset(
+                qs=qs.annotate(_value_plus_ten=dm.F("value") + 10),
+                annotation_field_pairs=[("_value_plus_ten", "updated_value")],
+            )
+            assert not qs.exclude(updated_value=12).exists()
+            deleted = bulk_delete_queryset(qs=qs, batch_size=2)
+        assert (updated.processed, updated.using) == (3, "default")
+        assert (deleted.processed, deleted.using) == (3, "default")
+
+    def test_sync_queryset_alias(self, db):
+        customers = baker.make(Customer, _quantity=2)
+        with self.router_elsewhere():
+            progress = sync_queryset_into(
+                CustomerReport,
+                Customer.objects.using("default").filter(
+                    pk__in=[c.pk for c in customers]
+                ),
+                key_fields=["customer_key"],
+                field_map={
+                    "customer_key": "pk",
+                    "name": "name",
+                    "order_count": dm.Value(0),
+                },
+            )
+        assert progress.using == "default"
+        assert CustomerReport.objects.count() == len(customers)
+
+    def test_async_concurrent_batches(self, transactional_db):
+        objs = baker.make(BulkOpsTestModel, value=1, _quantity=8)
+        pks = [obj.pk for obj in objs]
+        halves = [
+            BulkOpsTestModel.objects.filter(pk__in=pks[:4]),
+            BulkOpsTestModel.objects.filter(pk__in=pks[4:]),
+        ]
+
+        async def run():
+            return await asyncio.gather(
+                *[
+                    abulk_update_queryset(
+                        qs=qs.annotate(_value_plus_ten=dm.F("value") + 10),
+                        annotation_field_pairs=[("_value_plus_ten", "updated_value")],
+                        batch_size=3,
+                        skip_unchanged=True,
+                    )
+                    for qs in halves
+                ]
+            )
+
+        results = asyncio.run(run())
+        assert [(p.total, p.processed, p.changed, p.batches) for p in results] == [
+            (4, 4, 4, 2),
+            (4, 4, 4, 2),
+        ]
+        assert results[1].last_key == (pks[-1],)
+        assert (
+            not BulkOpsTestModel.objects.filter(pk__in=pks)
+            .exclude(updated_value=11)
+            .exists()
+        )
+
+
+@pytest.mark.parametrize("use_merge", [True, False])
+class TestSyncQuerysetInto:
+    def sync(self, customers, use_merge, **kwargs):
+        return sync_queryset_into(
+            CustomerReport,
+            Customer.objects.filter(pk__in=[c.pk for c in customers]).annotate(
+                n_orders=dm.Count("orders")
+            ),
+            key_fields=["customer_key"],
+            field_map={"customer_key": "pk", "name": "name", "order_count": "n_orders"},
+            batch_size=2,
+            use_merge=use_merge,
+            **kwargs,
+        )
+
+    def report(self):
+        return {
+            r.customer_key: (r.name, r.order_count)
+            for r in CustomerReport.objects.all()
+        }
+
+    def test_sync_writes_only_differences(self, db, use_merge):
+        customers = baker.make(Customer, _quantity=5)
+        baker.make(Order, customer=customers[0], _quantity=2)
+        progress = self.sync(customers, use_merge)
+        assert (progress.processed, progress.changed, progress.batches) == (5, 5, 3)
+        assert self.report() == {
+            c.pk: (c.name, 2 if c == customers[0] else 0) for c in customers
+        }
+
+        customers[1].update(name="renamed")
+        removed = customers.pop(2)
+        customers.append(baker.make(Customer))
+        progress = self.sync(customers, use_merge, delete_missing=True)
+        assert (progress.changed, progress.deleted) == (2, 1)
+        assert removed.pk not in self.report()
+        assert self.report()[customers[1].pk] == ("renamed", 0)
+
+        progress = self.sync(customers, use_merge, delete_missing=True)
+        assert (progress.processed, progress.changed, progress.deleted) == (5, 0, 0)
+
+    def test_sync_empty_source_deletes_everything(self, db, use_merge):
+        customers = baker.make(Customer, _quantity=3)
+        self.sync(customers, use_merge)
+        progress = self.sync([], use_merge, delete_missing=True)
+        assert progress.deleted == 3
+        assert not CustomerReport.objects.exists()
@@ -0,0 +1,43 @@
+import datetime
+
+import pytest
+from model_bakery import baker
+
+from django_infra.db.change_feed import (
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+    iter_changes,
+)
+from tests.test_db.models import TrackedTestModel
+
+
+class TestChangeFeed:
+    def test_cursor_round_trip_keeps_microseconds(self):
+        key = (datetime.datetime(2024, 1, 2, 3, 4, 5, 123456, datetime.UTC), 42)
+        assert decode_cursor(TrackedTestModel, encode_cursor(key)) == key
+
+    # empty, `{}` and `["x",1]`
+    @pytest.mark.parametrize("cursor", ["", "e30", "WyJ4IiwxXQ"])
+    def test_invalid_cursor(self, cursor):
+        with pytest.raises(InvalidCursor):
+            decode_cursor(TrackedTestModel, cursor)
+
+    def test_iter_changes(self, db):
+        objs = baker.make(TrackedTestModel, _quantity=5)
+        baker.make(TrackedTestModel, modified_time=None)
+        TrackedTestModel.objects.filter(pk=objs[-1].pk).update(modified_time=None)
+        pages = list(iter_changes(TrackedTestModel.objects.all(), batch_size=2))
+        assert [[obj.pk for obj in page.objects] for page in pages] == [
+            [objs[0].pk, objs[1].pk],
+            [objs[2].pk, objs[3].pk],
+        ]
+        # resuming from the last cursor only sees rows changed since.
+        objs[1].update(name="changed")
+        (page,) = iter_changes(TrackedTestModel.objects.all(), cursor=pages[-1].cursor)
+        assert page.objects == [objs[1]]
+
+    def test_settle(self, db):
+        baker.make(TrackedTestModel)
+        qs = TrackedTestModel.objects.all()
+        assert list(iter_changes(qs, settle=datetime.timedelta(hours=1))) == []
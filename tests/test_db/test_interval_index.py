@@ -0,0 +1,103 @@
+import datetime
+
+import pytest
+from model_bakery import baker
+
+from django_infra.db.models import ScheduleCode
+from tests.test_db.models import TrackedScheduleTestModel
+
+np = pytest.importorskip("numpy")
+
+from django_infra.db.interval_index import ScheduleIntervalIndex  # noqa: E402
+
+T0 = datetime.datetime(2024, 1, 1, tzinfo=datetime.UTC)
+HOUR = datetime.timedelta(hours=1)
+
+SCHEDULES = {
+    "early": (0, 2),
+    "late": (2, 4),
+    "empty": (3, 3),
+    "open_start": (None, 1),
+    "open_end": (3, None),
+}
+
+
+@pytest.fixture
+def schedules(db):
+    return {
+        name: baker.make(
+            TrackedScheduleTestModel,
+            room="a",
+            start_date=None if start is None else T0 + start * HOUR,
+            end_date=None if end is None else T0 + end * HOUR,
+        )
+        for name, (start, end) in SCHEDULES.items()
+    }
+
+
+def names(schedules, pks):
+    by_pk = {obj.pk: name for name, obj in schedules.items()}
+    return {by_pk[pk] for pk in pks}
+
+
+class TestScheduleIntervalIndex:
+    @pytest.mark.parametrize("offset", [-1, 0, 1, 2, 3, 3.5, 5])
+    def test_matches_database(self, schedules, offset):
+        qs = TrackedScheduleTestModel.objects.all()
+        index = ScheduleIntervalIndex(qs)
+        moment = T0 + offset * HOUR
+        expected = {
+            obj.pk: obj.within_schedule_code for obj in qs.with_within_schedule(moment)
+        }
+        assert dict(zip(index.pks, index.codes_at(moment))) == expected
+        assert set(index.active_at(moment)) == {
+            pk for pk, code in expected.items() if code == ScheduleCode.ACTIVE
+        }
+        for pk, code in expected.items():
+            assert index.code_of(pk, moment) == code
+
+    @pytest.mark.parametrize(
+        "start, end, expected",
+        [
+            (0, 1, {"early", "open_start"}),
+            (2, 3, {"late"}),
+            (3, 10, {"late", "open_end"}),
+            (None, None, {"early", "late", "open_start", "open_end"}),
+            (1, 1, set()),
+        ],
+    )
+    def test_overlapping(self, schedules, start, end, expected):
+        index = ScheduleIntervalIndex(TrackedScheduleTestModel.objects.all())
+        start = None if start is None else T0 + start * HOUR
+        end = None if end is None else T0 + end * HOUR
+        assert names(schedules, index.overlapping(start, end)) == expected
+
+    def test_refresh(self, schedules):
+        index = ScheduleIntervalIndex(TrackedScheduleTestModel.objects.filter(room="a"))
+        assert len(index) == len(SCHEDULES)
+        schedules["early"].start_date = T0 + 10 * HOUR
+        schedules["early"].end_date = T0 + 11 * HOUR
+        schedules["early"].save()
+        schedules["late"].room = "b"
+        schedules["late"].save()
+        new = baker.make(
+            TrackedScheduleTestModel, room="a", start_date=T0, end_date=T0 + HOUR
+        )
+        assert index.refresh() == 3
+        assert index.refresh() == 0
+        assert len(index) == len(SCHEDULES)
+        assert (index.lo[:-1] <= index.lo[1:]).all()
+        assert set(index.active_at(T0 + HOUR / 2)) == {new.pk}
+        assert index.code_of(schedules["early"].pk, T0) == ScheduleCode.FUTURE
+        with pytest.raises(KeyError):
+            index.code_of(schedules["late"].pk, T0)
+
+    def test_refresh_within_settle(self, schedules):
+        index = ScheduleIntervalIndex(
+            TrackedScheduleTestModel.objects.filter(room="a"), settle=HOUR
+        )
+        # rows within settle of the watermark are read again, not applied again.
+        assert index.refresh() == 0
+        schedules["early"].save()
+        assert index.refresh() == 1
+        assert index.refresh() == 0
@@ -0,0 +1,82 @@
+import pytest
+from django.db import models as dm
+from model_bakery import baker
+
+from django_infra.db.bulk_ops import bulk_delete_queryset, bulk_update_queryset
+from django_infra.db.keyset import Keyset
+from tests.test_db.models import (
+    BulkOpsTestModel,
+    CharKeyTestModel,
+    CompositeKeyTestModel,
+    UUIDKeyTestModel,
+)
+
+
+class TestKeyset:
+    def test_for_model_defaults_to_pk(self):
+        keyset = Keyset.for_model(CharKeyTestModel)
+        assert keyset.names == ("key",)
+        assert keyset.columns == ("key",)
+
+    def test_for_model_with_explicit_fields(self):
+        keyset = Keyset.for_model(CompositeKeyTestModel, ["tenant", "number"])
+        assert keyset.names == ("tenant", "number")
+
+    def test_iter_batches_handles_falsy_keys(self, db):
+        for key in ["", "a", "b", "c"]:
+            baker.make(CharKeyTestModel, key=key)
+        keyset = Keyset.for_model(CharKeyTestModel)
+        batches = list(keyset.iter_batches(CharKeyTestModel.objects.all(), 2))
+        assert [[row["key"] for row in rows] for rows in batches] == [
+            ["", "a"],
+            ["b", "c"],
+        ]
+
+    def test_iter_batches_composite(self, db):
+        for tenant in range(3):
+            for number in range(3):
+                baker.make(CompositeKeyTestModel, tenant=tenant, number=number)
+        keyset = Keyset.for_model(CompositeKeyTestModel, ["tenant", "number"])
+        rows = [
+            keyset.key_of(row)
+            for batch in keyset.iter_batches(CompositeKeyTestModel.objects.all(), 2)
+            for row in batch
+        ]
+        assert rows == [(t, n) for t in range(3) for n in range(3)]
+
+
+@pytest.mark.parametrize(
+    ["model", "make_kwargs", "key_fields"],
+    [
+        (BulkOpsTestModel, lambda i: {}, None),
+        (CharKeyTestModel, lambda i: {"key": str(i)}, None),
+        (UUIDKeyTestModel, lambda i: {}, None),
+        (
+            CompositeKeyTestModel,
+            lambda i: {"tenant": i % 3, "number": i},
+            ["tenant", "number"],
+        ),
+    ],
+)
+class TestKeysetBulkOps:
+    def test_bulk_update(self, db, model, make_kwargs, key_fields):
+        for i in range(10):
+            baker.make(model, value=i, **make_kwargs(i))
+        progress = bulk_update_queryset(
+            qs=model.objects.annotate(_value_plus_ten=dm.F("value") + 10),
+            annotation_field_pairs=[("_value_plus_ten", "updated_value")],
+            batch_size=3,
+            key_fields=key_fields,
+        )
+        assert progress.processed == progress.changed == 10
+        assert progress.batches == 4
+        assert not model.objects.exclude(updated_value=dm.F("value") + 10).exists()
+
+    def test_bulk_delete(self, db, model, make_kwargs, key_fields):
+        for i in range(10):
+            baker.make(model, value=i, **make_kwargs(i))
+        progress = bulk_delete_queryset(
+            qs=model.objects.filter(value__gte=3), batch_size=3, key_fields=key_fields
+        )
+        assert progress.processed == 7
+        assert model.objects.count() == 3
@@ -1,11 +1,24 @@
 from unittest.mock import MagicMock, call, patch
 
 import pytest
-from django.db import DEFAULT_DB_ALIAS
+from django.contrib.auth.models import User
+from django.db import DEFAULT_DB_ALIAS, connection, transaction
 from django.db.models import signals
+from django.test.utils import CaptureQueriesContext
+from django.utils.connection import ConnectionDoesNotExist
 from model_bakery import baker
 
-from tests.test_db.models import UpdatableTestModel
+from django_infra.db.models import (
+    VersionConflictError,
+    VersionedMixin,
+    coalesce_updates,
+)
+from tests.test_db.models import (
+    TrackedTestModel,
+    UpdatableTestModel,
+    UserTrackedTestModel,
+    VersionedTestModel,
+)
 
 
 class TestUpdatableModel:
@@ -100,11 +113,15 @@ class TestUpdatableModel:
             fake_filter.update = MagicMock()
             using_patch.return_value.filter.return_value = fake_filter
 
-            inst.update(field1=new_value, bypass_orm=True, databases=databases)
+            results = inst.update(
+                field1=new_value, bypass_orm=True, databases=databases
+            )
 
-            # Ensure 'using' is called with each database alias.
+            # Ensure 'using' is called with each database alias, concurrently.
             expected_calls = [call("db1"), call("db2")]
-            assert using_patch.call_args_list == expected_calls
+            assert sorted(using_patch.call_args_list) == expected_calls
+            assert [result.alias for result in results] == databases
+            assert all(result.ok for result in results)
 
             # Ensure update is called once per database with correct arguments.
             assert fake_filter.update.call_count == len(databases)
@@ -116,6 +133,29 @@ class TestUpdatableModel:
         # In bypass_orm mode, in-memory instance remains unchanged.
         assert inst.field1 == old_value
 
+    def test_update_databases_collects_errors(self, db):
+        inst = baker.make(UpdatableTestModel, field1="old_value", field2="10")
+        results = inst.update(
+            field1="new_value", bypass_orm=True, databases=["default", "missing"]
+        )
+        assert [(r.alias, r.rows, r.ok) for r in results] == [
+            ("default", 1, True),
+            ("missing", 0, False),
+        ]
+        assert isinstance(results[1].error, ConnectionDoesNotExist)
+        # default is inside the test transaction, so it was updated in this thread.
+        inst.refresh_from_db()
+        assert inst.field1 == "new_value"
+
+    def test_update_databases_in_threads(self, transactional_db):
+        inst = baker.make(UpdatableTestModel, field1="old_value", field2="10")
+        (result,) = inst.update(
+            field1="new_value", bypass_orm=True, databases=["default"]
+        )
+        assert (result.rows, result.ok) == (1, True)
+        inst.refresh_from_db()
+        assert inst.field1 == "new_value"
+
     def test_update_databases_without_bypass(self, db):
         # Test branch: if databases is provided but bypass_orm is False,
         # a RuntimeError should be raised.
@@ -125,3 +165,341 @@ class TestUpdatableModel:
             match="Please set bypass_orm to True when specifying databases",
         ):
             inst.update(field1="new_value", databases=["db1"])
+
+
+class TestUpdatableModelTrackChanges:
+    def saved_sql(self, inst, **kwargs):
+        with CaptureQueriesContext(connection) as queries:
+            inst.save(**kwargs)
+        return [query["sql"] for query in queries.captured_queries]
+
+    def test_unchanged_save_is_skipped(self, db):
+        baker.make(TrackedTestModel, name="a")
+        inst = TrackedTestModel.objects.get()
+        with patch.object(signals.pre_save, "send") as pre_save:
+            assert self.saved_sql(inst) == []
+            pre_save.assert_not_called()
+
+    def test_only_changed_and_auto_now_fields_are_written(self, db):
+        baker.make(TrackedTestModel, name="a", value=1)
+        inst = TrackedTestModel.objects.get()
+        inst.value = 2
+        (sql,) = self.saved_sql(inst)
+        assert '"value" = 2' in sql
+        assert '"modified_time"' in sql
+        assert '"name"' not in sql
+        assert inst.get_dirty_fields() == []
+        inst.refresh_from_db()
+        assert inst.value == 2
+
+    def test_mutable_values_are_always_written(self, db):
+        baker.make(TrackedTestModel, payload={"a": 1})
+        inst = TrackedTestModel.objects.get()
+        inst.payload["a"] = 2
+        assert inst.get_dirty_fields() == ["payload"]
+        self.saved_sql(inst)
+        assert TrackedTestModel.objects.get().payload == {"a": 2}
+
+    def test_deferred_fields(self, db):
+        baker.make(TrackedTestModel, name="a", value=1)
+        inst = TrackedTestModel.objects.only("id", "value").get()
+        assert inst.get_dirty_fields() == []
+        # loading a deferred field refreshes its snapshot.
+        assert inst.name == "a"
+        assert inst.get_dirty_fields() == []
+        inst.name = "b"
+        assert inst.get_dirty_fields() == ["name"]
+
+    def test_explicit_update_fields_refresh_snapshot(self, db):
+        baker.make(TrackedTestModel, name="a", value=1)
+        inst = TrackedTestModel.objects.get()
+        inst.name, inst.value = "b", 2
+        inst.save(update_fields=["name"])
+        assert inst.get_dirty_fields() == ["value"]
+        inst.update(value=3)
+        assert inst.get_dirty_fields() == []
+        assert TrackedTestModel.objects.filter(name="b", value=3).exists()
+
+    def test_created_instance_is_tracked(self, db):
+        inst = TrackedTestModel(name="a")
+        inst.save()
+        assert inst.get_dirty_fields() == []
+        assert self.saved_sql(inst) == []
+
+    def test_untracked_model_writes_every_field(self, db):
+        inst = baker.make(UpdatableTestModel, field1="a", field2="b")
+        inst = UpdatableTestModel.objects.get(pk=inst.pk)
+        (sql,) = self.saved_sql(inst)
+        assert '"field1"' in sql and '"field2"' in sql
+
+
+class TestUpdatableModelBulkApply:
+    def test_one_statement_per_changed_field_set(self, db):
+        insts = baker.make(UpdatableTestModel, field1="a", field2="b", _quantity=5)
+        changes = [
+            (insts[0], {"field1": "x"}),
+            (insts[1], {"field1": "y"}),
+            (insts[2], {"field1": "z", "field2": "w"}),
+            (insts[3], {"field1": "a"}),  # unchanged
+            (insts[4], {}),
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            assert UpdatableTestModel.bulk_apply(changes) == 3
+        updates = [q for q in queries.captured_queries if "UPDATE" in q["sql"]]
+        assert len(updates) == 2
+        assert insts[0].field1 == "x"
+        rows = UpdatableTestModel.objects.filter(pk__in=[i.pk for i in insts])
+        assert sorted(rows.values_list("field1", "field2")) == [
+            ("a", "b"),
+            ("a", "b"),
+            ("x", "b"),
+            ("y", "b"),
+            ("z", "w"),
+        ]
+
+    def test_batches_and_auto_now(self, db):
+        insts = baker.make(TrackedTestModel, value=1, payload={"a": 1}, _quantity=3)
+        modified_time = insts[0].modified_time
+        with CaptureQueriesContext(connection) as queries:
+            TrackedTestModel.bulk_apply(
+                [
+                    (inst, {"value": 2, "payload": {"b": i}})
+                    for i, inst in enumerate(insts)
+                ],
+                batch_size=2,
+            )
+        assert len([q for q in queries.captured_queries if "UPDATE" in q["sql"]]) == 2
+        assert insts[0].get_dirty_fields() == []
+        stored = TrackedTestModel.objects.get(pk=insts[2].pk)
+        assert (stored.value, stored.payload) == (2, {"b": 2})
+        assert stored.modified_time > modified_time
+        assert stored.modified_time == insts[2].modified_time
+
+    def test_without_commit_sends_pre_save(self, db):
+        inst = baker.make(UpdatableTestModel, field1="a")
+        with patch.object(signals.pre_save, "send") as pre_save:
+            UpdatableTestModel.bulk_apply([(inst, {"field1": "b"})], commit=False)
+        assert pre_save.call_args.kwargs["update_fields"] == ["field1"]
+        assert inst.field1 == "b"
+        inst.refresh_from_db()
+        assert inst.field1 == "a"
+
+    def test_databases(self, db):
+        inst = baker.make(UpdatableTestModel, field1="a")
+        with (
+            patch.object(UpdatableTestModel, "_bulk_apply_batch") as apply_batch,
+            patch("django_infra.db.models.updatable.transaction"),
+        ):
+            UpdatableTestModel.bulk_apply(
+                [(inst, {"field1": "b"})], databases=["default", "other"]
+            )
+        assert [c.args[2] for c in apply_batch.call_args_list] == ["default", "other"]
+
+
+class TestCoalesceUpdates:
+    def updates(self, queries):
+        return [q["sql"] for q in queries.captured_queries if "UPDATE" in q["sql"]]
+
+    def test_updates_are_merged_per_row(self, db):
+        inst = baker.make(UpdatableTestModel, field1="a", field2="b")
+        with CaptureQueriesContext(connection) as queries:
+            with coalesce_updates():
+                inst.update(field1="x")
+                inst.update(field2="y")
+                inst.update(field1="z")
+                assert inst.field1 == "z"
+                assert self.updates(queries) == []
+                # another instance of the same row joins its buffered changes.
+                UpdatableTestModel.objects.get(pk=inst.pk).update(field2="w")
+        (sql,) = self.updates(queries)
+        inst.refresh_from_db()
+        assert (inst.field1, inst.field2) == ("z", "w")
+
+    def test_batched_one_statement_per_model(self, db):
+        insts = baker.make(UpdatableTestModel, field1="a", _quantity=3)
+        with CaptureQueriesContext(connection) as queries:
+            with coalesce_updates(batched=True):
+                for i, inst in enumerate(insts):
+                    inst.update(field1=f"x{i}")
+                    inst.update(field2="y")
+        assert len(self.updates(queries)) == 1
+        assert sorted(
+            UpdatableTestModel.objects.filter(
+                pk__in=[inst.pk for inst in insts]
+            ).values_list("field1", "field2")
+        ) == [("x0", "y"), ("x1", "y"), ("x2", "y")]
+
+    def test_flushed_on_commit(self, db, django_capture_on_commit_callbacks):
+        inst = baker.make(UpdatableTestModel, field1="a")
+        with django_capture_on_commit_callbacks() as callbacks:
+            with coalesce_updates(on_commit=True):
+                inst.update(field1="b")
+        assert UpdatableTestModel.objects.get(pk=inst.pk).field1 == "a"
+        (flush,) = callbacks
+        flush()
+        assert UpdatableTestModel.objects.get(pk=inst.pk).field1 == "b"
+
+    def test_dropped_on_error(self, db):
+        inst = baker.make(UpdatableTestModel, field1="a")
+        with pytest.raises(ValueError):
+            with coalesce_updates():
+                inst.update(field1="b")
+                raise ValueError
+        assert UpdatableTestModel.objects.get(pk=inst.pk).field1 == "a"
+
+    def test_nested_and_decorator(self, db):
+        inst = baker.make(UpdatableTestModel, field1="a")
+
+        @coalesce_updates()
+        def handler():
+            with coalesce_updates():
+                inst.update(field1="b")
+            assert UpdatableTestModel.objects.get(pk=inst.pk).field1 == "a"
+            inst.update(field2="c")
+
+        handler()
+        inst.refresh_from_db()
+        assert (inst.field1, inst.field2) == ("b", "c")
+
+
+class TestVersionedMixin:
+    def test_update_increments_version(self, db):
+        inst = baker.make(VersionedTestModel)
+        inst.update(state="done")
+        assert inst.version == 1
+        stored = VersionedTestModel.objects.get(pk=inst.pk)
+        assert (stored.state, stored.version) == ("done", 1)
+
+    def test_stale_save_conflicts(self, db):
+        inst = baker.make(VersionedTestModel)
+        VersionedTestModel.objects.get(pk=inst.pk).update(state="other")
+        inst.state = "mine"
+        with pytest.raises(VersionConflictError), transaction.atomic():
+            inst.save()
+        assert VersionedTestModel.objects.get(pk=inst.pk).state == "other"
+
+    def test_update_retries_after_refresh(self, db):
+        inst = baker.make(VersionedTestModel, counter=1)
+        VersionedTestModel.objects.get(pk=inst.pk).update(counter=5)
+        with patch.object(
+            VersionedTestModel,
+            "on_version_conflict",
+            autospec=True,
+            side_effect=VersionedMixin.on_version_conflict,
+        ) as on_conflict:
+            inst.update(counter=lambda inst: inst.counter + 1)
+        on_conflict.assert_called_once()
+        stored = VersionedTestModel.objects.get(pk=inst.pk)
+        assert (stored.counter, stored.version) == (6, 2)
+
+    def test_update_gives_up_after_retries(self, db):
+        inst = baker.make(VersionedTestModel)
+        VersionedTestModel.objects.get(pk=inst.pk).update(state="other")
+        with patch.object(VersionedTestModel, "on_version_conflict") as on_conflict:
+            with pytest.raises(VersionConflictError):
+                inst.update(state="mine")
+        assert on_conflict.call_count == VersionedTestModel.version_retries
+
+    def test_bulk_apply_increments_version(self, db):
+        instances = baker.make(VersionedTestModel, _quantity=2)
+        stale = VersionedTestModel.objects.get(pk=instances[0].pk)
+        VersionedTestModel.bulk_apply([(inst, {"counter": 3}) for inst in instances])
+        assert [inst.version for inst in instances] == [1, 1]
+        assert set(VersionedTestModel.objects.values_list("version", flat=True)) == {1}
+        stale.state = "mine"
+        with pytest.raises(VersionConflictError), transaction.atomic():
+            stale.save()
+
+    def test_queryset_update_increments_version(self, db):
+        inst = baker.make(VersionedTestModel)
+        inst.update(bypass_orm=True, state="other")
+        VersionedTestModel.objects.filter(pk=inst.pk).update(counter=2)
+        stored = VersionedTestModel.objects.get(pk=inst.pk)
+        assert (stored.state, stored.counter, stored.version) == ("other", 2, 2)
+        inst.update(state="mine")
+        assert (inst.state, inst.counter, inst.version) == ("mine", 2, 3)
+
+    def test_coalesced_updates_keep_version_check(self, db):
+        inst = baker.make(VersionedTestModel)
+        other = VersionedTestModel.objects.get(pk=inst.pk)
+        with coalesce_updates():
+            inst.update(counter=lambda inst: inst.counter + 1)
+            other.update(counter=lambda inst: inst.counter + 1)
+            VersionedTestModel.objects.get(pk=inst.pk).update(state="a")
+            with patch.object(VersionedTestModel, "on_version_conflict"):
+                with pytest.raises(VersionConflictError):
+                    inst.update(state="b")
+        stored = VersionedTestModel.objects.get(pk=inst.pk)
+        assert (stored.state, stored.counter, stored.version) == ("a", 2, 3)
+
+
+class TestUserTrackingMixin:
+    @pytest.fixture
+    def users(self, db):
+        return baker.make(User, _quantity=2)
+
+    @pytest.fixture
+    def current_user(self, users):
+        with patch(
+            "django_infra.db.models.tracking.get_current_user_id",
+            return_value=users[0].pk,
+        ):
+            yield users[0]
+
+    def test_save_sets_ids_without_loading_users(self, users, current_user):
+        inst = UserTrackedTestModel.objects.create(name="a")
+        assert (inst.created_by_id, inst.modified_by_id) == (current_user.pk,) * 2
+        inst = UserTrackedTestModel.objects.get(pk=inst.pk)
+        inst.modified_by_id = users[1].pk
+        with CaptureQueriesContext(connection) as queries:
+            inst.save(update_fields=["name"])
+        (sql,) = [q["sql"] for q in queries.captured_queries]
+        assert '"modified_by_id"' in sql
+        assert inst.modified_by_id == current_user.pk
+
+    @pytest.mark.parametrize(
+        "update_fields", [["name", "modified_by"], ["name", "modified_by_id"]]
+    )
+    def test_save_keeps_update_fields_with_modified_by(
+        self, users, current_user, update_fields
+    ):
+        inst = baker.make(UserTrackedTestModel)
+        with patch("django.db.models.Model.save") as save:
+            inst.save(update_fields=update_fields)
+        assert save.call_args.kwargs["update_fields"] == update_fields
+
+    def test_save_with_empty_update_fields(self, users, current_user):
+        inst = baker.make(UserTrackedTestModel)
+        with CaptureQueriesContext(connection) as queries:
+            inst.save(update_fields=[])
+        assert queries.captured_queries == []
+
+    def test_bulk_create(self, current_user, users):
+        objs = UserTrackedTestModel.objects.bulk_create(
+            [UserTrackedTestModel(), UserTrackedTestModel(created_by=users[1])]
+        )
+        assert [(o.created_by_id, o.modified_by_id) for o in objs] == [
+            (current_user.pk, current_user.pk),
+            (users[1].pk, current_user.pk),
+        ]
+
+    def test_bulk_update_and_update(self, users):
+        objs = baker.make(UserTrackedTestModel, modified_by=users[1], _quantity=2)
+        qs = UserTrackedTestModel.objects.filter(pk__in=[o.pk for o in objs])
+        with patch(
+            "django_infra.db.models.tracking.get_current_user_id",
+            return_value=users[0].pk,
+        ):
+            for obj in objs:
+                obj.name = "b"
+            UserTrackedTestModel.objects.bulk_update(objs, ["name"])
+            assert set(qs.values_list("name", "modified_by")) == {("b", users[0].pk)}
+            qs.update(name="c", modified_by=users[1])
+            assert set(qs.values_list("modified_by", flat=True)) == {users[1].pk}
+            qs.update(name="d")
+            assert set(qs.values_list("modified_by", flat=True)) == {users[0].pk}
+
+    def test_without_current_user(self, db):
+        inst = UserTrackedTestModel.objects.create()
+        assert (inst.created_by_id, inst.modified_by_id) == (None, None)
+        UserTrackedTestModel.objects.filter(pk=inst.pk).update(name="x")
@@ -0,0 +1,142 @@
+import datetime
+
+import pytest
+from django.db import connection
+from django.db.migrations.exceptions import IrreversibleError
+from django.utils import timezone
+from model_bakery import baker
+
+from django_infra.db.partitioning import (
+    create_partitions,
+    floor_to_interval,
+    next_interval,
+    partition_table,
+    retire_partitions,
+    unpartition_table,
+)
+from tests.test_db.models import Customer, PartitionedEventTestModel, TrackedTestModel
+
+TABLE = PartitionedEventTestModel._meta.db_table
+
+
+def at(*args):
+    return datetime.datetime(*args, tzinfo=datetime.UTC)
+
+
+def partition_of(event):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT tableoid::regclass::text FROM {TABLE} WHERE id = %s", [event.pk]
+        )
+        return cursor.fetchone()[0]
+
+
+def relkind():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE relname = %s", [TABLE])
+        return cursor.fetchone()[0]
+
+
+def make_event(created_time, **kwargs):
+    event = baker.make(PartitionedEventTestModel, **kwargs)
+    PartitionedEventTestModel.objects.filter(pk=event.pk).update(
+        created_time=created_time
+    )
+    return event
+
+
+class TestPartitioning:
+    @pytest.mark.parametrize(
+        ["interval", "lower", "upper"],
+        [
+            ("day", at(2024, 2, 29), at(2024, 3, 1)),
+            ("week", at(2024, 2, 26), at(2024, 3, 4)),
+            ("month", at(2024, 2, 1), at(2024, 3, 1)),
+            ("year", at(2024, 1, 1), at(2025, 1, 1)),
+        ],
+    )
+    def test_intervals(self, interval, lower, upper):
+        assert floor_to_interval(at(2024, 2, 29, 13, 30), interval) == lower
+        assert next_interval(lower, interval) == upper
+
+    def test_unknown_interval(self):
+        with pytest.raises(ValueError):
+            floor_to_interval(timezone.now(), "fortnight")
+
+    def test_partitioned_table_keeps_keys_and_indexes(self, db):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, TABLE)
+        (pk,) = [c for c in constraints.values() if c["primary_key"]]
+        assert pk["columns"] == ["id", "created_time"]
+        assert [c["columns"] for c in constraints.values() if c["foreign_key"]] == [
+            ["customer_id"]
+        ]
+        indexed = [c["columns"] for c in constraints.values() if c["index"]]
+        assert ["kind"] in indexed
+        assert ["customer_id"] in indexed
+
+    def test_rows_are_routed_and_pruned(self, db):
+        created = create_partitions(
+            PartitionedEventTestModel, ahead=1, start=at(2024, 1, 15)
+        )
+        assert created == [f"{TABLE}_p20240101", f"{TABLE}_p20240201"]
+        assert (
+            create_partitions(PartitionedEventTestModel, ahead=1, start=at(2024, 1, 15))
+            == []
+        )
+
+        customer = baker.make(Customer)
+        january = make_event(at(2024, 1, 20), customer=customer, kind="a")
+        later = make_event(at(2030, 1, 1))
+        assert partition_of(january) == f"{TABLE}_p20240101"
+        assert partition_of(later) == f"{TABLE}_default"
+
+        plan = PartitionedEventTestModel.objects.filter(
+            created_time__gte=at(2024, 1, 1), created_time__lt=at(2024, 2, 1)
+        ).explain()
+        assert f"{TABLE}_p20240101" in plan
+        assert f"{TABLE}_p20240201" not in plan
+        assert f"{TABLE}_default" not in plan
+
+    def test_retire_partitions(self, db):
+        create_partitions(PartitionedEventTestModel, ahead=2, start=at(2024, 1, 1))
+        january = make_event(at(2024, 1, 20))
+        february = make_event(at(2024, 2, 20))
+        with connection.cursor() as cursor:
+            # deferred foreign key checks of the test transaction block DROP TABLE.
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        retired = retire_partitions(
+            PartitionedEventTestModel, older_than=at(2024, 2, 1)
+        )
+        assert retired == [f"{TABLE}_p20240101"]
+        assert not PartitionedEventTestModel.objects.filter(pk=january.pk).exists()
+        assert PartitionedEventTestModel.objects.filter(pk=february.pk).exists()
+
+        retired = retire_partitions(
+            PartitionedEventTestModel, older_than=at(2024, 3, 1), drop=False
+        )
+        assert retired == [f"{TABLE}_p20240201"]
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM {TABLE}_p20240201")
+            assert cursor.fetchone() == (1,)
+
+    def test_nullable_partition_key_is_rejected(self, db):
+        with connection.schema_editor() as editor:
+            with pytest.raises(ValueError, match="nullable"):
+                partition_table(editor, TrackedTestModel)
+
+    def test_unpartition(self, db):
+        create_partitions(PartitionedEventTestModel, ahead=0, start=at(2024, 1, 1))
+        with connection.schema_editor() as editor:
+            unpartition_table(editor, PartitionedEventTestModel)
+        assert relkind() == "r"
+        with connection.schema_editor() as editor:
+            partition_table(editor, PartitionedEventTestModel)
+        assert relkind() == "p"
+
+    def test_unpartition_with_rows(self, db):
+        make_event(at(2024, 1, 20))
+        with connection.schema_editor() as editor:
+            with pytest.raises(IrreversibleError):
+                unpartition_table(editor, PartitionedEventTestModel)
+        assert relkind() == "p"
@@ -0,0 +1,486 @@
+import datetime
+import logging
+import random
+import time
+from unittest import mock
+
+import pytest
+from django.db import connection
+from django.db import models as dm
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from model_bakery import baker
+
+from django_infra.db.models import (
+    DatabaseNow,
+    ScheduleCode,
+    ScheduleCodeCase,
+    ScheduleCodeSeries,
+)
+from django_infra.db.querysets.schedule import OVERLAP_STRATEGIES
+from tests.test_db.models import (
+    PlainScheduleTestModel,
+    ScheduleTestModel,
+    StatusScheduleTestModel,
+)
+
+T0 = datetime.datetime(2024, 1, 1, tzinfo=datetime.UTC)
+HOUR = datetime.timedelta(hours=1)
+MICROSECOND = datetime.timedelta(microseconds=1)
+
+ACTIVE = ScheduleCode.ACTIVE.value
+FUTURE = ScheduleCode.FUTURE.value
+EXPIRED = ScheduleCode.EXPIRED.value
+
+
+def hours(*offsets):
+    return [T0 + offset * HOUR for offset in offsets]
+
+
+class TestScheduleCodesAt:
+    @pytest.fixture
+    def schedules(self, db):
+        return {
+            "early": baker.make(ScheduleTestModel, start_date=T0, end_date=T0 + HOUR),
+            "late": baker.make(
+                ScheduleTestModel, start_date=T0 + 2 * HOUR, end_date=T0 + 4 * HOUR
+            ),
+            "open": baker.make(ScheduleTestModel, start_date=None, end_date=None),
+        }
+
+    def codes(self, qs):
+        return {obj.pk: obj.schedule_codes for obj in qs}
+
+    def test_timestamps_in_one_query(self, schedules):
+        timestamps = hours(3, 0, 1, 2)
+        with CaptureQueriesContext(connection) as ctx:
+            codes = self.codes(
+                ScheduleTestModel.objects.with_schedule_codes_at(timestamps)
+            )
+        assert len(ctx.captured_queries) == 1
+        assert codes == {
+            schedules["early"].pk: [EXPIRED, ACTIVE, EXPIRED, EXPIRED],
+            schedules["late"].pk: [ACTIVE, FUTURE, FUTURE, ACTIVE],
+            schedules["open"].pk: [EXPIRED] * 4,
+        }
+
+    def test_matches_schedule_code_case(self, schedules):
+        timestamps = hours(0, 1, 2, 3, 4)
+        codes = self.codes(ScheduleTestModel.objects.with_schedule_codes_at(timestamps))
+        for i, moment in enumerate(timestamps):
+            expected = {
+                obj.pk: obj.within_schedule_code
+                for obj in ScheduleTestModel.objects.with_within_schedule(moment)
+            }
+            assert {pk: row[i] for pk, row in codes.items()} == expected
+
+    def test_generate_series(self, schedules):
+        qs = ScheduleTestModel.objects.with_schedule_codes_at(
+            start=T0, end=T0 + 4 * HOUR, step=HOUR
+        )
+        assert self.codes(qs)[schedules["late"].pk] == [
+            FUTURE,
+            FUTURE,
+            ACTIVE,
+            ACTIVE,
+            EXPIRED,
+        ]
+
+    def test_overlapping_only(self, schedules):
+        qs = ScheduleTestModel.objects.with_schedule_codes_at(
+            hours(3, 2), overlapping_only=True
+        )
+        assert self.codes(qs) == {schedules["late"].pk: [ACTIVE, ACTIVE]}
+        assert not ScheduleTestModel.objects.with_schedule_codes_at(
+            [], overlapping_only=True
+        ).exists()
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [{}, {"start": T0, "end": T0}, {"timestamps": [T0], "step": HOUR}],
+    )
+    def test_requires_timestamps_or_series(self, kwargs):
+        with pytest.raises(ValueError):
+            ScheduleCodeSeries(**kwargs)
+
+
+class TestHasOverlap:
+    @pytest.fixture
+    def schedules(self, db):
+        def make(room, start, end):
+            return baker.make(
+                ScheduleTestModel,
+                room=room,
+                start_date=None if start is None else T0 + start * HOUR,
+                end_date=None if end is None else T0 + end * HOUR,
+            )
+
+        return {
+            make("a", 0, 2): True,
+            make("a", 1, 3): True,
+            make("a", 3, 4): False,  # only touches [1, 3)
+            make("a", 5, 10): True,
+            make("a", 6, 7): True,  # contained in [5, 10)
+            make("a", 8, 8): False,  # empty
+            make("b", None, 1): True,
+            make("b", 0, 2): True,
+            make("b", 2, None): False,
+            make("c", None, None): False,  # alone in its room
+        }
+
+    @pytest.mark.parametrize("strategy", OVERLAP_STRATEGIES)
+    def test_strategies(self, schedules, strategy):
+        qs = ScheduleTestModel.objects.with_has_overlap(
+            partition_by="room", strategy=strategy
+        )
+        assert {obj: obj.has_overlap for obj in qs} == schedules
+        assert set(qs.filter(has_overlap=True)) == {
+            obj for obj, overlap in schedules.items() if overlap
+        }
+
+    @pytest.mark.parametrize("strategy", OVERLAP_STRATEGIES)
+    def test_null_partition_never_overlaps(self, db, strategy):
+        for _ in range(2):
+            baker.make(ScheduleTestModel, room=None, start_date=T0, end_date=T0 + HOUR)
+        qs = ScheduleTestModel.objects.with_has_overlap(
+            partition_by="room", strategy=strategy
+        )
+        assert [obj.has_overlap for obj in qs] == [False, False]
+
+    def test_window_without_partition(self, schedules):
+        qs = ScheduleTestModel.objects.with_has_overlap(strategy="window")
+        exists = ScheduleTestModel.objects.with_has_overlap()
+        assert {obj: obj.has_overlap for obj in qs} == {
+            obj: obj.has_overlap for obj in exists
+        }
+
+    def test_unknown_strategy(self):
+        with pytest.raises(ValueError):
+            ScheduleTestModel.objects.with_has_overlap(strategy="merge")
+
+
+@pytest.fixture(scope="module")
+def overlap_benchmark_data(django_db_setup, django_db_blocker):
+    rng = random.Random(0)
+    with django_db_blocker.unblock():
+        objs = []
+        for _ in range(200_000):
+            start = T0 + rng.randrange(24 * 365) * HOUR
+            objs.append(
+                ScheduleTestModel(
+                    room=str(rng.randrange(100)),
+                    start_date=start,
+                    end_date=start + rng.randrange(1, 48) * HOUR,
+                )
+            )
+        ScheduleTestModel.objects.bulk_create(objs, batch_size=10000)
+    yield
+    # created outside of the test transactions, so not rolled back.
+    with django_db_blocker.unblock():
+        ScheduleTestModel.objects.all().delete()
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+class TestHasOverlapPerformance:
+    def test_window_vs_exists(self, overlap_benchmark_data):
+        results = {}
+        for strategy in OVERLAP_STRATEGIES:
+            qs = ScheduleTestModel.objects.with_has_overlap(
+                partition_by="room", strategy=strategy
+            ).values_list("pk", "has_overlap")
+            started = time.perf_counter()
+            results[strategy] = dict(qs)
+            logging.info(f"{strategy}: {time.perf_counter() - started:.2f}s")
+        assert results["window"] == results["exists"]
+
+
+class TestCoalesced:
+    @pytest.fixture
+    def schedules(self, db):
+        for room, start, end in [
+            ("a", 0, 2),
+            ("a", 1, 3),
+            ("a", 3, 4),  # adjacent to [1, 3)
+            ("a", 6, 7),
+            ("a", 5, 10),
+            ("a", 5, 10),
+            ("a", 12, 12),  # empty
+            ("b", None, 1),
+            ("b", 0, 2),
+            ("b", 4, None),
+        ]:
+            baker.make(
+                ScheduleTestModel,
+                room=room,
+                start_date=None if start is None else T0 + start * HOUR,
+                end_date=None if end is None else T0 + end * HOUR,
+            )
+
+    def bounds(self, rows):
+        def offset(moment):
+            return None if moment is None else (moment - T0) / HOUR
+
+        return [
+            (key, offset(period.lower), offset(period.upper)) for key, period in rows
+        ]
+
+    @pytest.mark.parametrize("use_range_agg", [True, False])
+    def test_coalesced(self, schedules, use_range_agg):
+        rows = ScheduleTestModel.objects.coalesced(
+            "room", chunk_size=2, use_range_agg=use_range_agg
+        )
+        assert self.bounds(rows) == [
+            ("a", 0, 4),
+            ("a", 5, 10),
+            ("b", None, 2),
+            ("b", 4, None),
+        ]
+
+    @pytest.mark.parametrize("partition_by", ["room", ""])
+    @pytest.mark.parametrize("use_range_agg", [True, False])
+    def test_coalesced_empty_queryset(self, schedules, use_range_agg, partition_by):
+        qs = ScheduleTestModel.objects.filter(pk__in=[])
+        assert list(qs.coalesced(partition_by, use_range_agg=use_range_agg)) == []
+
+    @pytest.mark.parametrize("use_range_agg", [True, False])
+    def test_coalesced_without_partition(self, schedules, use_range_agg):
+        qs = ScheduleTestModel.objects.filter(room="a")
+        rows = qs.coalesced(use_range_agg=use_range_agg)
+        assert self.bounds(rows) == [(None, 0, 4), (None, 5, 10)]
+
+
+class TestFreeSlots:
+    @pytest.fixture
+    def schedules(self, db):
+        for room, start, end in [
+            ("a", 1, 2),
+            ("a", 2, 3),
+            ("a", 5, 6),
+            ("a", 9, 20),
+            ("b", None, 4),
+            ("c", 20, 30),  # outside of the window
+        ]:
+            baker.make(
+                ScheduleTestModel,
+                room=room,
+                start_date=None if start is None else T0 + start * HOUR,
+                end_date=None if end is None else T0 + end * HOUR,
+            )
+
+    def bounds(self, rows):
+        return [
+            (key, (slot.lower - T0) / HOUR, (slot.upper - T0) / HOUR)
+            for key, slot in rows
+        ]
+
+    def test_free_slots(self, schedules):
+        rows = ScheduleTestModel.objects.free_slots(
+            T0, T0 + 10 * HOUR, partition_by="room"
+        )
+        assert self.bounds(rows) == [
+            ("a", 0, 1),
+            ("a", 3, 5),
+            ("a", 6, 9),
+            ("b", 4, 10),
+            ("c", 0, 10),
+        ]
+
+    def test_empty_queryset(self, schedules):
+        qs = ScheduleTestModel.objects.none()
+        assert list(qs.free_slots(T0, T0 + 10 * HOUR, partition_by="room")) == []
+        assert self.bounds(qs.free_slots(T0, T0 + 10 * HOUR)) == [(None, 0, 10)]
+
+    def test_min_duration(self, schedules):
+        rows = ScheduleTestModel.objects.filter(room="a").free_slots(
+            T0, T0 + 10 * HOUR, min_duration=2 * HOUR
+        )
+        assert self.bounds(rows) == [(None, 3, 5), (None, 6, 9)]
+
+
+class TestOccupancy:
+    SCHEDULES = [
+        (0, 2, 1),
+        (1, 3, 2),
+        (1, 1, 4),
+        (2, None, 8),
+        (None, 1, 16),
+        (5, 6, 32),
+    ]
+
+    def make(self, model, **kwargs):
+        for start, end, seats in self.SCHEDULES:
+            if model is PlainScheduleTestModel:
+                kwargs["seats"] = seats
+            baker.make(
+                model,
+                start_date=None if start is None else T0 + start * HOUR,
+                end_date=None if end is None else T0 + end * HOUR,
+                **kwargs,
+            )
+
+    @pytest.mark.parametrize("model", [ScheduleTestModel, PlainScheduleTestModel])
+    def test_count(self, db, model):
+        self.make(model)
+        rows = model.objects.occupancy(T0, T0 + 4 * HOUR, HOUR)
+        # [1, 1) is empty, [5, 6) outside of the window and null dates never active.
+        assert rows == list(zip(hours(0, 1, 2, 3), [1, 2, 1, 0]))
+
+    @pytest.mark.parametrize("model", [ScheduleTestModel, PlainScheduleTestModel])
+    @pytest.mark.parametrize("offset", [-1, 0, 0.5, 1, 2, 3, 5.5])
+    def test_matches_within_schedule(self, db, model, offset):
+        self.make(model)
+        moment = T0 + offset * HOUR
+        ((_, count),) = model.objects.occupancy(
+            moment, moment + MICROSECOND, MICROSECOND
+        )
+        within = model.objects.with_within_schedule(moment)
+        assert count == within.filter(within_schedule=True).count()
+
+    @pytest.mark.parametrize("sum_field", [None, "seats"])
+    def test_empty_queryset(self, db, sum_field):
+        self.make(PlainScheduleTestModel)
+        rows = PlainScheduleTestModel.objects.none().occupancy(
+            T0, T0 + 2 * HOUR, HOUR, sum_field=sum_field
+        )
+        assert rows == list(zip(hours(0, 1), [0, 0]))
+
+    def test_sum(self, db):
+        self.make(PlainScheduleTestModel)
+        rows = PlainScheduleTestModel.objects.occupancy(
+            T0 - HOUR, T0 + 4 * HOUR, 2 * HOUR, sum_field="seats"
+        )
+        assert rows == [
+            (T0 - HOUR, 1),
+            (T0 + HOUR, 1 + 2),
+            (T0 + 3 * HOUR, 0),
+        ]
+
+
+class TestScheduleStatus:
+    @pytest.fixture(autouse=True)
+    def now(self):
+        with mock.patch("django.utils.timezone.now", return_value=T0):
+            yield
+
+    def make(self, start, end):
+        return StatusScheduleTestModel.objects.create(
+            start_date=None if start is None else T0 + start * HOUR,
+            end_date=None if end is None else T0 + end * HOUR,
+        )
+
+    def statuses(self):
+        return dict(
+            StatusScheduleTestModel.objects.values_list("pk", "schedule_status")
+        )
+
+    def test_computed_on_save(self, db):
+        objs = [self.make(-1, 1), self.make(1, 2), self.make(None, None)]
+        assert [obj.schedule_status for obj in objs] == [ACTIVE, FUTURE, EXPIRED]
+        objs[1].start_date = T0
+        objs[1].save(update_fields=["start_date"])
+        assert self.statuses()[objs[1].pk] == ACTIVE
+
+    def test_refresh_transitions(self, db):
+        objs = [self.make(1, 3), self.make(2, 5), self.make(-1, 2)]
+        assert set(self.statuses().values()) == {FUTURE, ACTIVE}
+
+        qs = StatusScheduleTestModel.objects.all()
+        progress = qs.refresh_schedule_status(since=T0, now=T0 + 3 * HOUR)
+        # [-1, 2) expired and [2, 5) started, [1, 3) both started and expired.
+        assert progress.changed == 3
+        assert self.statuses() == {
+            objs[0].pk: EXPIRED,
+            objs[1].pk: ACTIVE,
+            objs[2].pk: EXPIRED,
+        }
+
+    def test_refresh_only_reads_crossed_rows(self, db):
+        obj = self.make(1, 3)
+        # a bulk update bypassing save leaves the status stale.
+        StatusScheduleTestModel.objects.update(start_date=T0 - HOUR)
+        qs = StatusScheduleTestModel.objects.all()
+        assert qs.refresh_schedule_status(since=T0, now=T0 + HOUR / 2).processed == 0
+        assert qs.refresh_schedule_status(now=T0 + HOUR / 2).changed == 1
+        assert self.statuses() == {obj.pk: ACTIVE}
+
+    def test_refresh_on_queryset_alias(self, db):
+        obj = self.make(1, 3)
+        qs = StatusScheduleTestModel.objects.using("default")
+        # the router points to an alias that does not exist here.
+        with mock.patch(
+            "django.db.router.db_for_write", return_value="replica_primary"
+        ):
+            progress = qs.refresh_schedule_status(now=T0 + 2 * HOUR)
+        assert (progress.using, progress.changed) == ("default", 1)
+        assert self.statuses() == {obj.pk: ACTIVE}
+
+    def test_aggregate_stored_status(self, db):
+        self.make(-1, 1)
+        self.make(-1, 2)
+        self.make(1, 2)
+        counts = StatusScheduleTestModel.objects.values("schedule_status").annotate(
+            count=dm.Count("pk")
+        )
+        assert {row["schedule_status"]: row["count"] for row in counts} == {
+            ACTIVE: 2,
+            FUTURE: 1,
+        }
+
+
+class TestDatabaseNow:
+    @pytest.fixture
+    def schedules(self, db):
+        now = timezone.now()
+        return {
+            baker.make(
+                ScheduleTestModel, start_date=now - HOUR, end_date=now + HOUR
+            ): ACTIVE,
+            baker.make(
+                ScheduleTestModel, start_date=now + HOUR, end_date=now + 2 * HOUR
+            ): FUTURE,
+            baker.make(
+                ScheduleTestModel, start_date=now - 2 * HOUR, end_date=now - HOUR
+            ): EXPIRED,
+        }
+
+    def sql(self, qs):
+        return qs.query.get_compiler(using=qs.db).as_sql()
+
+    @pytest.mark.parametrize("granularity", [None, "minute"])
+    def test_same_query_and_codes(self, schedules, granularity):
+        qs = ScheduleTestModel.objects.with_within_schedule(
+            db_now=True, granularity=granularity
+        )
+        sql, params = self.sql(qs)
+        assert "statement_timestamp()" in sql
+        assert not any(isinstance(param, datetime.datetime) for param in params)
+        assert self.sql(
+            ScheduleTestModel.objects.with_within_schedule(
+                db_now=True, granularity=granularity
+            )
+        ) == (sql, params)
+        assert {obj: obj.within_schedule_code for obj in qs} == schedules
+
+    @pytest.mark.parametrize("code", [ACTIVE, FUTURE, EXPIRED])
+    def test_rewritten_lookups(self, schedules, code):
+        qs = ScheduleTestModel.objects.with_within_schedule(
+            db_now=True, granularity="hour"
+        )
+        exact = qs.filter(within_schedule_code=code)
+        where = self.sql(exact)[0].split("WHERE")[-1]
+        assert "CASE" not in where and "date_trunc" in where
+        # truncated to the hour, now - 1h might be in the same hour as now.
+        expected = ScheduleTestModel.objects.with_within_schedule(
+            timezone.now().replace(minute=0, second=0, microsecond=0)
+        ).filter(within_schedule_code=code)
+        assert set(exact) == set(expected)
+        assert set(qs.filter(within_schedule_code__in=[code])) == set(expected)
+
+    def test_arguments(self):
+        with pytest.raises(ValueError):
+            DatabaseNow("fortnight")
+        with pytest.raises(ValueError):
+            ScheduleCodeCase(granularity="hour")
+        with pytest.raises(ValueError):
+            ScheduleCodeCase(current_date=T0, db_now=True)
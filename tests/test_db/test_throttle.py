@@ -0,0 +1,58 @@
+import logging
+
+from django.db import connection
+from django.db import models as dm
+from model_bakery import baker
+
+from django_infra.db.bulk_ops import bulk_update_queryset
+from django_infra.db.throttle import LoadThrottle
+from tests.test_db.models import BulkOpsTestModel
+
+
+class TestLoadThrottle:
+    def test_idle_database_has_no_pressure(self, db):
+        throttle = LoadThrottle(max_dead_tuples=10**9)
+        assert throttle.pressure(using="default", model=BulkOpsTestModel) == []
+
+    def test_pressure_reports_exceeded_thresholds(self, db):
+        throttle = LoadThrottle(max_replication_lag=-1, max_lock_waits=-1)
+        assert throttle.pressure(using="default", model=BulkOpsTestModel) == [
+            "replication lag 0.0s",
+            "0 lock waits",
+        ]
+
+    def test_hidden_replication_lag_is_reported(self, db, caplog):
+        with connection.cursor() as cursor:
+            # what a role without pg_monitor sees of a lagging standby.
+            cursor.execute(
+                "CREATE TEMP VIEW pg_stat_replication AS "
+                "SELECT 1 AS pid, NULL::text AS state, NULL::interval AS replay_lag"
+            )
+        throttle = LoadThrottle(max_replication_lag=0, max_lock_waits=None)
+        with caplog.at_level(logging.WARNING):
+            for _ in range(2):
+                assert throttle.pressure(using="default", model=BulkOpsTestModel) == []
+        (record,) = caplog.records
+        assert "pg_monitor" in record.message
+
+    def test_wait_gives_up_after_max_wait(self, db):
+        throttle = LoadThrottle(max_lock_waits=-1, poll_interval=0.01, max_wait=0.05)
+        throttle.wait(using="default", model=BulkOpsTestModel)
+        assert 0.05 <= throttle.paused < 1
+
+    def test_waited_between_batches(self, db, monkeypatch):
+        objs = baker.make(BulkOpsTestModel, value=1, _quantity=5)
+        throttle = LoadThrottle()
+        calls = []
+        monkeypatch.setattr(
+            throttle, "pressure", lambda **kwargs: calls.append(kwargs) or []
+        )
+        bulk_update_queryset(
+            qs=BulkOpsTestModel.objects.filter(
+                pk__in=[obj.pk for obj in objs]
+            ).annotate(_value_plus_ten=dm.F("value") + 10),
+            annotation_field_pairs=[("_value_plus_ten", "updated_value")],
+            batch_size=2,
+            throttle=throttle,
+        )
+        assert calls == [{"using": "default", "model": BulkOpsTestModel}] * 3